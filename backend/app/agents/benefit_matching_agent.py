@@ -83,15 +83,12 @@ class BenefitMatchingAgent(BaseAgent):
             return f"To apply for {policy.name}, please visit your local government office."
         
         try:
-            from langchain.prompts import ChatPromptTemplate
-            
-            prompt = ChatPromptTemplate.from_messages([
+            messages = [
                 ("system", "You are a helpful government benefits advisor. Provide clear, step-by-step guidance for citizens applying for government benefits."),
-                ("user", f"Policy: {policy.name}\nDescription: {policy.description}\nBenefits: {policy.benefits}\n\nProvide a brief 2-3 sentence guidance on how to apply for this benefit.")
-            ])
+                ("human", f"Policy: {policy.name}\nDescription: {policy.description}\nBenefits: {policy.benefits}\n\nProvide a brief 2-3 sentence guidance on how to apply for this benefit.")
+            ]
             
-            chain = prompt | self.llm
-            response = chain.invoke({})
+            response = self.llm.invoke(messages)
             return response.content
         
         except Exception:
@@ -8,6 +8,7 @@ import json
 
 from app.agents.base_agent import BaseAgent
 from app.infra.p3ai_client import get_p3ai_client
+from app.infra.llm_router import LLMTask
 
 
 class ChatMessage:
@@ -128,10 +129,16 @@ Provide a helpful, concise response:"""
             
             # Get response from LLM
             p3ai_client = get_p3ai_client()
+            llm = p3ai_client.get_llm_for(LLMTask.CHAT, prompt) if p3ai_client else None
             
-            if p3ai_client and p3ai_client.llm:
-                response = await p3ai_client.llm.ainvoke(prompt)
-                response_text = response.content if hasattr(response, 'content') else str(response)
+            if llm:
+                try:
+                    response = await llm.ainvoke(prompt)
+                    response_text = response.content if hasattr(response, 'content') else str(response)
+                except Exception as llm_error:
+                    # Circuit open or upstream failure - answer from keyword fallback
+                    print(f"⚠ Chat LLM unavailable, using fallback: {llm_error}")
+                    response_text = await self._generate_fallback_response(message, user_context)
             else:
                 # Fallback response without LLM
                 response_text = await self._generate_fallback_response(message, user_context)
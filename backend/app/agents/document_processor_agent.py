@@ -2,16 +2,14 @@
 Document Processor Agent - Handles OCR and document text extraction
 """
 
+import asyncio
 import os
-import io
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Callable, Awaitable
 from pathlib import Path
-import tempfile
 
 try:
     import pytesseract
-    from PIL import Image
-    from pdf2image import convert_from_path, convert_from_bytes
+    from pdf2image import pdfinfo_from_path
     import PyPDF2
     import docx
     DOCUMENT_LIBS_AVAILABLE = True
@@ -20,6 +18,30 @@ except ImportError:
     print("⚠️  Document processing libraries not installed. Run: pip install pytesseract pdf2image PyPDF2 python-docx Pillow")
 
 from app.agents.base_agent import BaseAgent
+from app.agents.ocr_worker import get_ocr_pool, ocr_image_file, ocr_pdf_page
+from app.agents.ocr_preprocess import OCR_PREPROCESS, OCR_TARGET_TEXT_HEIGHT
+from app.agents.script_detection import OCR_DEFAULT_LANG, SCRIPT_PACKS, text_language
+
+
+# Bump when extraction changes in a way that alters its output (invalidates cached extractions)
+EXTRACTOR_VERSION = "3"
+# Rasterization resolution for OCR (of the second pass when two-pass OCR is on)
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+# First, fast OCR pass resolution; lines below OCR_MIN_CONFIDENCE are re-read at
+# OCR_DPI. Set it to OCR_DPI (or 0) for a single pass
+OCR_FAST_DPI = int(os.getenv("OCR_FAST_DPI", "150"))
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "70"))
+# Tesseract language(s) for OCR; 'auto' detects each page's script (Tesseract
+# OSD) and reads it with that script's packs only (see script_detection)
+OCR_LANG = os.getenv("OCR_LANG", "auto")
+# Pages of one document rendered/OCR'd at once; bounds peak memory per document
+OCR_WINDOW_PAGES = max(1, int(os.getenv("OCR_WINDOW_PAGES", "4")))
+# on_page(page, total_pages) - called as each page is extracted, in completion order;
+# page is {'page', 'method', 'characters', 'language', 'text'[, 'error']}
+PageCallback = Callable[[Dict[str, Any], int], Awaitable[None]]
+
+# Letters/digits a PDF page's text layer needs before OCR is skipped for it
+PDF_TEXT_MIN_CHARS = int(os.getenv("PDF_TEXT_MIN_CHARS", "20"))
 
 
 class DocumentProcessorAgent(BaseAgent):
@@ -46,20 +68,28 @@ class DocumentProcessorAgent(BaseAgent):
     
     async def process_document(
         self,
-        file_content: bytes,
+        file_path: str,
         filename: str,
-        extract_method: str = "auto"
+        extract_method: str = "auto",
+        first_page: Optional[int] = None,
+        last_page: Optional[int] = None,
+        on_page: Optional[PageCallback] = None
     ) -> Dict[str, Any]:
         """
         Process a document and extract text
         
         Args:
-            file_content: Binary content of the file
-            filename: Name of the file
+            file_path: Path of the file (read in place, never loaded whole)
+            filename: Name of the file (its extension selects the backend)
             extract_method: 'auto', 'ocr', or 'native'
+            first_page: First PDF page to extract (1-based, default first)
+            last_page: Last PDF page to extract (inclusive, default last)
+            on_page: Optional progress callback (DOCX and images count as one page)
         
         Returns:
-            Dictionary with extracted text and metadata
+            Dictionary with extracted text and metadata, including 'language'
+            (code from the text's script, e.g. 'hi'; None for Latin script or
+            too little text, left to detect_document_language)
         """
         if not DOCUMENT_LIBS_AVAILABLE:
             return {
@@ -80,37 +110,46 @@ class DocumentProcessorAgent(BaseAgent):
             }
         
         try:
-            # Try native text extraction first for PDFs and DOCX
-            if extract_method in ["auto", "native"]:
-                if file_ext == '.pdf':
-                    text = await self._extract_pdf_native(file_content)
-                    if text.strip():
-                        return {
-                            "success": True,
-                            "text": text,
-                            "method": "native_pdf",
-                            "filename": filename,
-                            "format": file_ext
-                        }
-                
-                elif file_ext == '.docx':
-                    text = await self._extract_docx(file_content)
-                    if text.strip():
-                        return {
-                            "success": True,
-                            "text": text,
-                            "method": "native_docx",
-                            "filename": filename,
-                            "format": file_ext
-                        }
+            # PDFs decide native text vs OCR page by page
+            if file_ext == '.pdf':
+                pdf = await self._extract_pdf(file_path, extract_method, first_page, last_page, on_page)
+                if pdf["text"].strip() or extract_method != "native":
+                    return {
+                        "success": True,
+                        "text": pdf["text"],
+                        "method": pdf["method"],
+                        "pages": pdf["pages"],
+                        "language": pdf["language"],
+                        "filename": filename,
+                        "format": file_ext
+                    }
+            
+            # Try native text extraction first for DOCX
+            elif extract_method in ["auto", "native"] and file_ext == '.docx':
+                text = await self._extract_docx(file_path)
+                if text.strip():
+                    page = self._page_entry(1, "native", text, language=text_language(text))
+                    if on_page:
+                        await on_page(page, 1)
+                    return {
+                        "success": True,
+                        "text": text,
+                        "method": "native_docx",
+                        "language": page["language"],
+                        "filename": filename,
+                        "format": file_ext
+                    }
             
             # Fall back to OCR for images or if native extraction failed
-            if extract_method in ["auto", "ocr"]:
-                text = await self._extract_with_ocr(file_content, file_ext)
+            if extract_method in ["auto", "ocr"] and file_ext != '.pdf':
+                ocr = await self._extract_with_ocr(file_path)
+                if on_page:
+                    await on_page(self._page_entry(1, "ocr", ocr["text"], language=ocr["language"]), 1)
                 return {
                     "success": True,
-                    "text": text,
+                    "text": ocr["text"],
                     "method": "ocr",
+                    "language": ocr["language"],
                     "filename": filename,
                     "format": file_ext
                 }
@@ -130,53 +169,201 @@ class DocumentProcessorAgent(BaseAgent):
                 "method": "error"
             }
     
-    async def _extract_pdf_native(self, file_content: bytes) -> str:
-        """Extract text from PDF using native PDF reader"""
-        try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    def extraction_settings(self) -> Dict[str, Any]:
+        """Settings that shape extracted text (part of the extraction cache key)"""
+        return {
+            "version": EXTRACTOR_VERSION,
+            "ocr_lang": OCR_LANG,
+            "ocr_default_lang": OCR_DEFAULT_LANG,
+            "ocr_script_packs": SCRIPT_PACKS if OCR_LANG == "auto" else None,
+            "ocr_dpi": OCR_DPI,
+            "ocr_fast_dpi": OCR_FAST_DPI,
+            "ocr_min_confidence": OCR_MIN_CONFIDENCE,
+            "ocr_preprocess": OCR_PREPROCESS,
+            "ocr_target_text_height": OCR_TARGET_TEXT_HEIGHT,
+            "pdf_text_min_chars": PDF_TEXT_MIN_CHARS
+        }
+    
+    @staticmethod
+    def _page_numbers(page_count: int, first_page: Optional[int], last_page: Optional[int]) -> List[int]:
+        """1-based page numbers of the requested range, clamped to the document"""
+        first = max(1, first_page or 1)
+        last = min(page_count, last_page or page_count)
+        return list(range(first, last + 1))
+    
+    @staticmethod
+    def _has_text_layer(text: str) -> bool:
+        """Whether a page's native text is usable (enough real characters, not extraction debris)"""
+        stripped = "".join(text.split())
+        if not stripped:
+            return False
+        alnum = sum(ch.isalnum() for ch in stripped)
+        return alnum >= PDF_TEXT_MIN_CHARS and alnum / len(stripped) >= 0.5
+    
+    @staticmethod
+    def _page_entry(number: int, method: str, text: str, error: Optional[str] = None, **details) -> Dict[str, Any]:
+        """Per-page result passed to on_page (details: e.g. OCR confidence and DPI)"""
+        page = {"page": number, "method": method, "characters": len(text), **details, "text": text}
+        if error:
+            page["error"] = error
+        return page
+    
+    @staticmethod
+    def _document_language(pages: List[Dict[str, Any]]) -> Optional[str]:
+        """Language of most of the text across pages (weighted by characters; None when
+        most of it is in Latin script or undetermined, for langdetect to decide)"""
+        weights: Dict[Optional[str], int] = {}
+        for page in pages:
+            weights[page.get("language")] = weights.get(page.get("language"), 0) + page["characters"]
+        return max(weights, key=weights.get) if any(weights.values()) else None
+    
+    async def _extract_pdf(
+        self,
+        pdf_path: str,
+        extract_method: str = "auto",
+        first_page: Optional[int] = None,
+        last_page: Optional[int] = None,
+        on_page: Optional[PageCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract text from a PDF, choosing native text or OCR for each page
+        
+        With 'auto', pages with a usable text layer keep their native text and
+        only the rest are OCR'd. 'native' never OCRs and 'ocr' OCRs every page.
+        
+        Returns:
+            Dict with 'text', 'method' ('native_pdf', 'ocr' or 'hybrid_pdf'),
+            'pages' (list of {'page', 'method', 'characters', 'language'[, 'error']})
+            and 'language' (see _document_language)
+        """
+        layer = []
+        if extract_method != "ocr":
+            layer = await asyncio.to_thread(self._read_text_layer, pdf_path)
+        page_count = len(layer) or await asyncio.to_thread(self._pdf_page_count, pdf_path)
+        numbers = self._page_numbers(page_count, first_page, last_page)
+        
+        entries = {}
+        for number in numbers:
+            page_text = layer[number - 1] if layer else ""
+            if extract_method == "native" or (layer and self._has_text_layer(page_text)):
+                entries[number] = self._page_entry(number, "native", page_text, language=text_language(page_text))
+                if on_page:
+                    await on_page(entries[number], len(numbers))
+        
+        ocr_numbers = [number for number in numbers if number not in entries]
+        if ocr_numbers:
+            entries.update(await self._ocr_pdf_pages(pdf_path, ocr_numbers, len(numbers), on_page))
+        
+        pages = [{k: v for k, v in entries[number].items() if k != "text"} for number in numbers]
+        if not ocr_numbers:
+            text = "\n".join(entries[number]["text"] for number in numbers).strip()
+            method = "native_pdf"
+        else:
             text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
+            for number in numbers:
+                text += f"\n--- Page {number} ---\n{entries[number]['text']}"
+            text = text.strip()
+            method = "ocr" if len(ocr_numbers) == len(numbers) else "hybrid_pdf"
+        
+        return {"text": text, "method": method, "pages": pages, "language": self._document_language(pages)}
+    
+    @staticmethod
+    def _read_text_layer(pdf_path: str) -> List[str]:
+        """Native text of every page ([] if the PDF cannot be read)"""
+        try:
+            pdf_reader = PyPDF2.PdfReader(pdf_path)
         except Exception as e:
             print(f"Native PDF extraction failed: {e}")
-            return ""
+            return []
+        
+        texts = []
+        for page in pdf_reader.pages:
+            try:
+                texts.append((page.extract_text() or "").strip())
+            except Exception as e:
+                print(f"Native PDF extraction failed on a page: {e}")
+                texts.append("")
+        return texts
     
-    async def _extract_docx(self, file_content: bytes) -> str:
+    async def _extract_docx(self, file_path: str) -> str:
         """Extract text from DOCX file"""
         try:
-            doc = docx.Document(io.BytesIO(file_content))
+            doc = await asyncio.to_thread(docx.Document, file_path)
             text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
             return text.strip()
         except Exception as e:
             print(f"DOCX extraction failed: {e}")
             return ""
     
-    async def _extract_with_ocr(self, file_content: bytes, file_ext: str) -> str:
-        """Extract text using OCR"""
+    async def _extract_with_ocr(self, file_path: str) -> Dict[str, Any]:
+        """Extract text from an image using OCR (on the OCR process pool); returns {'text', 'language'}"""
         try:
-            if file_ext == '.pdf':
-                # Convert PDF to images then OCR
-                images = convert_from_bytes(file_content)
-                text = ""
-                for i, image in enumerate(images):
-                    page_text = pytesseract.image_to_string(image, lang='eng')
-                    text += f"\n--- Page {i+1} ---\n{page_text}"
-                return text.strip()
-            else:
-                # Direct OCR for images
-                image = Image.open(io.BytesIO(file_content))
-                text = pytesseract.image_to_string(image, lang='eng')
-                return text.strip()
+            loop = asyncio.get_running_loop()
+            ocr = await loop.run_in_executor(get_ocr_pool(), ocr_image_file, file_path, OCR_LANG)
+            return {"text": ocr["text"].strip(), "language": ocr["language"]}
         except Exception as e:
             # In hosted environments (like Render) Tesseract may not be installed.
             # Failing hard here turns every upload into a 500 error, so instead
             # we log and return empty text to allow graceful fallback.
             print(f"OCR extraction failed: {e}")
-            return ""
+            return {"text": "", "language": None}
+    
+    async def _ocr_pdf_pages(
+        self,
+        pdf_path: str,
+        numbers: List[int],
+        total_pages: int,
+        on_page: Optional[PageCallback] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        OCR PDF pages in a sliding window
+        
+        Workers render their own page from the PDF file, so at most
+        OCR_WINDOW_PAGES page images of this document exist at any time,
+        however long it is. A failed page gets empty text and its error.
+        
+        Returns:
+            Page number -> page entry (see _page_entry)
+        """
+        loop = asyncio.get_running_loop()
+        pool = get_ocr_pool()
+        window = asyncio.Semaphore(OCR_WINDOW_PAGES)
+        
+        async def ocr_page(number: int) -> Dict[str, Any]:
+            async with window:
+                try:
+                    ocr = await loop.run_in_executor(
+                        pool, ocr_pdf_page, pdf_path, number, OCR_DPI, OCR_LANG, '', OCR_FAST_DPI, OCR_MIN_CONFIDENCE
+                    )
+                    entry = self._page_entry(
+                        number, "ocr", ocr["text"].strip(),
+                        confidence=ocr["confidence"], dpi=ocr["dpi"], reocr=ocr["reocr"],
+                        lang=ocr["lang"], language=ocr["language"]
+                    )
+                except Exception as e:
+                    # Tesseract may be missing (see _extract_with_ocr); keep the other pages
+                    print(f"OCR extraction failed on page {number}: {e}")
+                    entry = self._page_entry(number, "ocr", "", str(e), language=None)
+            if on_page:
+                await on_page(entry, total_pages)
+            return entry
+        
+        results = await asyncio.gather(*[ocr_page(number) for number in numbers])
+        return dict(zip(numbers, results))
+    
+    @staticmethod
+    def _pdf_page_count(pdf_path: str) -> int:
+        """Number of pages in a PDF (PyPDF2, falling back to poppler's pdfinfo)"""
+        try:
+            return len(PyPDF2.PdfReader(pdf_path).pages)
+        except Exception:
+            return int(pdfinfo_from_path(pdf_path)["Pages"])
     
     async def detect_document_language(self, text: str) -> str:
-        """Detect the language of extracted text"""
+        """Detect the language of extracted text (from an Indic script when possible, else langdetect)"""
+        language = text_language(text)
+        if language:
+            return language
         try:
             from langdetect import detect
             return detect(text)
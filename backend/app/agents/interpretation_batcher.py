@@ -0,0 +1,194 @@
+"""
+Interpretation Batcher - Micro-batches policy rule extraction
+Collects interpretation requests that arrive within a short window, packs
+several policy texts into one structured prompt (so the long system prompt
+is sent once), and splits the per-policy rule arrays back out to callers.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import json
+import os
+import re
+import threading
+import time
+
+from app.agents.policy_interpreter_agent import RULE_EXTRACTION_SYSTEM_PROMPT, request_rule_data
+from app.infra.llm_cache import cached_llm_invoke
+from app.infra.llm_router import LLMTask
+
+
+BATCH_EXTRACTION_SYSTEM_PROMPT = RULE_EXTRACTION_SYSTEM_PROMPT + """
+
+You will receive several policies, each starting with a header line "### Policy <id>".
+Extract the rules of each policy independently and return ONE JSON object that maps
+every policy id to its rule array, e.g. {"1": [{"key": "...", "operator": "...", "value": ...}], "2": []}"""
+
+
+class InterpretationBatcher:
+    """Groups concurrent rule-extraction requests into shared LLM calls."""
+
+    def __init__(
+        self,
+        llm_provider: Callable[[str, Optional[int]], Any],
+        window_ms: float = 50,
+        max_batch_size: int = 8,
+        max_batch_chars: int = 12000,
+        max_concurrent_batches: int = 4,
+        tokens_per_policy: int = 400,
+        max_output_tokens: int = 4096,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            llm_provider: Returns an LLM for a prompt text and output token budget
+                (None = the task default); lets the router size the model
+            window_ms: How long to wait for more requests after the first one arrives
+            max_batch_size: Maximum policies per LLM call
+            max_batch_chars: Maximum combined policy text per LLM call
+            max_concurrent_batches: Batches that may be in flight at once
+            tokens_per_policy: Output tokens reserved for each policy's rules in a batch
+            max_output_tokens: Largest output budget of one call; caps the batch size
+        """
+        self.llm_provider = llm_provider
+        self.window = window_ms / 1000
+        self.tokens_per_policy = tokens_per_policy
+        # A truncated reply loses every policy in the batch, so the whole
+        # batch's rules must fit in one output budget
+        self.max_batch_size = max(1, min(max_batch_size, max_output_tokens // tokens_per_policy))
+        self.max_batch_chars = max_batch_chars
+        self._queue: List[Tuple[str, Future, float]] = []
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_batches, thread_name_prefix="interp-batch"
+        )
+        self._worker: Optional[threading.Thread] = None
+        self.batches_sent = 0
+        self.policies_batched = 0
+
+    def extract(self, raw_text: str, timeout: float = 120) -> Optional[List[Dict[str, Any]]]:
+        """
+        Extract raw rule dicts for one policy, sharing an LLM call with concurrent requests.
+
+        Args:
+            raw_text: Policy text
+            timeout: Seconds to wait for the batch result
+
+        Returns:
+            List of {"key", "operator", "value"} dicts, or None if extraction failed
+        """
+        return self.submit(raw_text).result(timeout=timeout)
+
+    def submit(self, raw_text: str) -> Future:
+        """Queue a policy text and get a future for its rule dicts."""
+        future: Future = Future()
+
+        # Texts that would fill a batch on their own are not worth waiting for
+        if len(raw_text) > self.max_batch_chars // 2:
+            self._executor.submit(self._dispatch, [(raw_text, future, time.monotonic())])
+            return future
+
+        with self._cond:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="interp-batcher", daemon=True)
+                self._worker.start()
+            self._queue.append((raw_text, future, time.monotonic()))
+            self._cond.notify()
+        return future
+
+    def _run(self):
+        """Collect queued requests into batches and hand them to the executor."""
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+
+                deadline = self._queue[0][2] + self.window
+                while len(self._queue) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch, chars = [], 0
+                while self._queue and len(batch) < self.max_batch_size:
+                    text = self._queue[0][0]
+                    if batch and chars + len(text) > self.max_batch_chars:
+                        break
+                    batch.append(self._queue.pop(0))
+                    chars += len(text)
+
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: List[Tuple[str, Future, float]]):
+        """Send one batch to the LLM and resolve each caller's future."""
+        try:
+            if len(batch) == 1:
+                text = batch[0][0]
+                results = [request_rule_data(self.llm_provider(text, None), text)]
+            else:
+                results = self._extract_batch([text for text, _, _ in batch])
+                self.batches_sent += 1
+                self.policies_batched += len(batch)
+        except Exception as e:
+            print(f"⚠ Batched rule extraction failed: {e}")
+            results = [None] * len(batch)
+
+        for (_, future, _), rules in zip(batch, results):
+            future.set_result(rules)
+
+    def _extract_batch(self, texts: List[str]) -> List[Optional[List[Dict[str, Any]]]]:
+        """Extract rules for several policies in one call."""
+        body = "\n\n".join(f"### Policy {i}\n{text.strip()}" for i, text in enumerate(texts, 1))
+        llm = self.llm_provider(body, self.tokens_per_policy * len(texts))
+        messages = [
+            ("system", BATCH_EXTRACTION_SYSTEM_PROMPT),
+            ("human", f"{body}\n\nExtract eligibility rules for every policy:"),
+        ]
+        content = cached_llm_invoke(llm, messages)
+
+        json_match = re.search(r'\{.*\}', content, re.DOTALL)
+        if not json_match:
+            return [None] * len(texts)
+
+        by_id = json.loads(json_match.group())
+        results = []
+        for i in range(1, len(texts) + 1):
+            rules = by_id.get(str(i))
+            results.append(rules if isinstance(rules, list) else None)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Get batching counters."""
+        return {
+            "batches_sent": self.batches_sent,
+            "policies_batched": self.policies_batched,
+            "queued": len(self._queue),
+        }
+
+
+# Singleton instance
+_batcher_instance: Optional[InterpretationBatcher] = None
+
+
+def get_interpretation_batcher() -> Optional[InterpretationBatcher]:
+    """Get or create the singleton batcher (None unless POLICY_BATCHING_ENABLED is set)."""
+    global _batcher_instance
+
+    if os.getenv("POLICY_BATCHING_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        return None
+
+    if _batcher_instance is None:
+        from app.infra.p3ai_client import get_p3ai_client
+
+        client = get_p3ai_client()
+        _batcher_instance = InterpretationBatcher(
+            llm_provider=lambda text, max_tokens: client.get_llm_for(LLMTask.RULE_EXTRACTION, text, max_tokens),
+            window_ms=float(os.getenv("POLICY_BATCH_WINDOW_MS", "50")),
+            max_batch_size=int(os.getenv("POLICY_BATCH_MAX_SIZE", "8")),
+            max_batch_chars=int(os.getenv("POLICY_BATCH_MAX_CHARS", "12000")),
+            tokens_per_policy=int(os.getenv("POLICY_BATCH_TOKENS_PER_POLICY", "400")),
+            max_output_tokens=int(os.getenv("POLICY_BATCH_MAX_OUTPUT_TOKENS", "4096")),
+        )
+
+    return _batcher_instance
@@ -0,0 +1,152 @@
+"""
+OCR Preprocessing - Image cleanup before Tesseract
+Phone photos and 300-DPI scans reach Tesseract at full size, skewed and
+unevenly lit. Each page is converted to grayscale, straightened, downscaled
+so text is about OCR_TARGET_TEXT_HEIGHT pixels tall, and binarized
+with a local (adaptive) threshold. The work is done with Pillow and numpy,
+so it runs in the OCR worker processes without extra dependencies.
+"""
+from typing import Optional, Tuple
+import os
+
+import numpy as np
+
+try:
+    from PIL import Image, ImageFilter, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "true").lower() in ("1", "true", "yes")
+# Height (pixels) of the dense band of a text line, roughly x-height to cap
+# height, that large text is scaled down to; Tesseract reads best around here
+OCR_TARGET_TEXT_HEIGHT = int(os.getenv("OCR_TARGET_TEXT_HEIGHT", "28"))
+# Images above this many pixels are rejected (decompression bomb guard)
+OCR_MAX_IMAGE_PIXELS = int(os.getenv("OCR_MAX_IMAGE_PIXELS", str(60_000_000)))
+
+# Work on a small copy when estimating skew and text height
+_ANALYSIS_WIDTH = 800
+_MAX_SKEW_DEGREES = 10.0
+
+
+class ImageTooLargeError(ValueError):
+    """Raised for images whose pixel count exceeds OCR_MAX_IMAGE_PIXELS."""
+    pass
+
+
+def check_image_size(image: "Image.Image", max_pixels: Optional[int] = None):
+    """
+    Reject oversized images before their pixels are decoded.
+
+    Image.open only reads the header, so calling this first keeps a small
+    file that declares a huge canvas from being expanded in memory.
+
+    Raises:
+        ImageTooLargeError: If width * height exceeds the limit
+    """
+    max_pixels = max_pixels or OCR_MAX_IMAGE_PIXELS
+    pixels = image.width * image.height
+    if pixels > max_pixels:
+        raise ImageTooLargeError(
+            f"Image of {image.width}x{image.height} pixels exceeds the {max_pixels} pixel limit"
+        )
+
+
+def binarize(gray: "Image.Image", offset: float = 0.15) -> np.ndarray:
+    """
+    Adaptive threshold: a pixel is ink when it is darker than its neighbourhood mean by `offset`.
+
+    Args:
+        gray: Grayscale ('L') image
+        offset: Fraction below the local mean that counts as ink
+
+    Returns:
+        Boolean array, True for ink
+    """
+    radius = max(4, min(gray.size) // 32)
+    local_mean = np.asarray(gray.filter(ImageFilter.BoxBlur(radius)), dtype=np.float32)
+    return np.asarray(gray, dtype=np.float32) < local_mean * (1.0 - offset)
+
+
+def estimate_skew(ink: np.ndarray) -> float:
+    """
+    Estimate the rotation (degrees, counter-clockwise) that makes text lines horizontal.
+
+    Rotates the ink mask over a range of angles, coarse then fine, and keeps
+    the angle whose row profile is sharpest (text rows and gaps alternate).
+    """
+    mask = Image.fromarray((ink * 255).astype(np.uint8))
+
+    def sharpness(angle: float) -> float:
+        rows = np.asarray(mask.rotate(angle, resample=Image.NEAREST), dtype=np.float32).sum(axis=1)
+        return float(np.square(np.diff(rows)).sum())
+
+    # Ties (e.g. a blank page) go to the smallest rotation
+    coarse = sorted(np.arange(-_MAX_SKEW_DEGREES, _MAX_SKEW_DEGREES + 0.01, 1.0), key=abs)
+    best = max(coarse, key=sharpness)
+    fine = sorted(np.arange(best - 1.0, best + 1.01, 0.1), key=abs)
+    return round(float(max(fine, key=sharpness)), 1)
+
+
+def estimate_text_height(ink: np.ndarray) -> Optional[float]:
+    """Median height (pixels) of the dense runs of text rows, or None if there are none."""
+    # Page edges and scan borders put ink in every row; look at the middle
+    # columns only and count a row as text relative to the densest rows
+    width = ink.shape[1]
+    profile = ink[:, width // 10:width - width // 10].mean(axis=1)
+    if not profile.any():
+        return None
+    text_rows = profile > max(0.01, 0.15 * float(np.percentile(profile, 95)))
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], text_rows.astype(np.int8), [0]))))
+    heights = edges[1::2] - edges[0::2]
+    heights = heights[heights >= 2]
+    return float(np.median(heights)) if len(heights) else None
+
+
+def preprocess(
+    image: "Image.Image",
+    target_text_height: Optional[int] = None,
+    skew: Optional[float] = None,
+) -> Tuple["Image.Image", dict]:
+    """
+    Prepare a page image for Tesseract.
+
+    Args:
+        image: Page image (any mode)
+        target_text_height: Text height to downscale to (default OCR_TARGET_TEXT_HEIGHT);
+            images with smaller text are never upscaled
+        skew: Known rotation to apply instead of estimating it (e.g. from a
+            lower-resolution rendering of the same page)
+
+    Returns:
+        (binarized 'L' image, info dict with 'skew', 'text_height' and 'scale')
+    """
+    check_image_size(image)
+    target = target_text_height or OCR_TARGET_TEXT_HEIGHT
+
+    # Phone photos carry their rotation in EXIF
+    gray = ImageOps.exif_transpose(image).convert("L")
+
+    ratio = min(1.0, _ANALYSIS_WIDTH / gray.width)
+    thumb = gray.resize((max(1, round(gray.width * ratio)), max(1, round(gray.height * ratio))))
+    thumb_ink = binarize(thumb)
+
+    if skew is None:
+        skew = estimate_skew(thumb_ink)
+    if abs(skew) >= 0.2:
+        gray = gray.rotate(skew, resample=Image.BILINEAR, expand=True, fillcolor=255)
+        thumb = thumb.rotate(skew, resample=Image.BILINEAR, expand=True, fillcolor=255)
+        thumb_ink = binarize(thumb)
+
+    text_height = estimate_text_height(thumb_ink)
+    scale = 1.0
+    if text_height:
+        text_height /= ratio
+        if text_height > target * 1.25:
+            scale = target / text_height
+            gray = gray.resize((max(1, round(gray.width * scale)), max(1, round(gray.height * scale))), Image.LANCZOS)
+
+    ink = binarize(gray)
+    cleaned = Image.fromarray(np.where(ink, 0, 255).astype(np.uint8), mode="L")
+    return cleaned, {"skew": round(skew, 2), "text_height": text_height and round(text_height, 1), "scale": round(scale, 3)}
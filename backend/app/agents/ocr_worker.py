@@ -0,0 +1,344 @@
+"""
+OCR Worker - Tesseract calls executed in a bounded process pool
+Functions here run in worker processes, so they take and return plain
+picklable values and import nothing from the rest of the app apart from
+the standalone preprocessing module.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import multiprocessing
+import os
+
+try:
+    import pytesseract
+    from PIL import Image
+    from pdf2image import convert_from_path
+    import PyPDF2
+    OCR_LIBS_AVAILABLE = True
+except ImportError:
+    OCR_LIBS_AVAILABLE = False
+
+from app.agents.ocr_preprocess import OCR_MAX_IMAGE_PIXELS, OCR_PREPROCESS, check_image_size, preprocess
+from app.agents.script_detection import detect_script, script_language, tesseract_langs
+
+
+def ocr_image(image: "Image.Image", lang: str = "auto", config: str = "") -> Dict[str, Any]:
+    """
+    Run Tesseract on one page image (executed in a worker process).
+
+    The image is cleaned up first (see ocr_preprocess) unless OCR_PREPROCESS is off.
+
+    Args:
+        image: Page image
+        lang: Tesseract language(s), e.g. 'eng' or 'hin+eng'; 'auto' picks
+            the packs for the script Tesseract OSD finds on the image
+        config: Extra Tesseract options
+
+    Returns:
+        Dict with 'text', 'lang' (packs used), 'script' and 'language'
+    """
+    try:
+        if OCR_PREPROCESS:
+            cleaned, _ = preprocess(image)
+            image.close()
+            image = cleaned
+        lang, script = _select_lang(image, lang)
+        text = pytesseract.image_to_string(image, lang=lang, config=config)
+    except Exception as e:
+        # Some pytesseract errors cannot be unpickled in the parent, which
+        # would break the whole pool; send a plain error across instead
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    finally:
+        image.close()
+    return {"text": text, "lang": lang, **_text_script(text, script)}
+
+
+def ocr_image_file(image_path: str, lang: str = "auto", config: str = "") -> Dict[str, Any]:
+    """
+    Run Tesseract on an image file (executed in a worker process).
+
+    Args:
+        image_path: Image file readable by the worker
+        lang: Tesseract language(s) or 'auto'
+        config: Extra Tesseract options
+
+    Returns:
+        Dict with 'text', 'lang', 'script' and 'language' (see ocr_image)
+    """
+    try:
+        # Header only; the size check runs before any pixels are decoded
+        image = Image.open(image_path)
+        check_image_size(image)
+    except Exception as e:
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    return ocr_image(image, lang=lang, config=config)
+
+
+def ocr_pdf_page(
+    pdf_path: str,
+    page_number: int,
+    dpi: int = 300,
+    lang: str = "auto",
+    config: str = "",
+    fast_dpi: Optional[int] = None,
+    min_confidence: float = 70.0,
+) -> Dict[str, Any]:
+    """
+    Render one PDF page and run Tesseract on it (executed in a worker process).
+
+    Rendering happens in the worker, so only the path and page number cross
+    the process boundary and a page image never outlives its OCR call.
+
+    With a fast_dpi below dpi, the page is read at fast_dpi first. Lines whose
+    word confidence is below min_confidence are then re-read from a dpi
+    rendering: just their regions, or the whole page when most lines (or all,
+    if nothing was found) are weak. A re-read only replaces text when its
+    confidence is higher. If the dpi rendering fails, the first-pass text is kept.
+
+    Args:
+        pdf_path: PDF file readable by the worker
+        page_number: 1-based page number
+        dpi: Rasterization resolution (of the second pass when fast_dpi is set)
+        lang: Tesseract language(s); 'auto' picks the packs for the script
+            Tesseract OSD finds on the first-pass image
+        config: Extra Tesseract options
+        fast_dpi: Resolution of the first pass (None = single pass at dpi)
+        min_confidence: Mean word confidence (0-100) a line needs to keep its first-pass text
+
+    Returns:
+        Dict with 'text', 'confidence' (mean word confidence or None), 'dpi'
+        (resolution of the final text), 'reocr' (None, 'regions' or 'page'),
+        'lang' (packs used), 'script' and 'language' (of the recognized text)
+    """
+    two_pass = bool(fast_dpi) and fast_dpi < dpi
+    result = {
+        "text": "", "confidence": None, "dpi": fast_dpi if two_pass else dpi, "reocr": None,
+        "lang": lang, "script": None, "language": None,
+    }
+    try:
+        image = _render(pdf_path, page_number, result["dpi"])
+        if image is None:
+            return result
+        image, info = _prepare(image)
+        # Both passes read with the packs chosen here
+        lang, script = _select_lang(image, lang)
+        lines = _read_lines(image, lang, config)
+
+        weak = [i for i, line in enumerate(lines) if line["confidence"] < min_confidence]
+        # Text the first pass already had to shrink gains nothing from more pixels
+        if two_pass and (weak or not lines) and info.get("scale", 1.0) >= 1.0:
+            try:
+                sharp = _render(pdf_path, page_number, dpi)
+            except Exception:
+                sharp = None
+            # Without the sharper rendering the first-pass text stands
+            if sharp is not None:
+                fast_size = image.size
+                sharp, _ = _prepare(sharp, skew=info.get("skew"))
+                if not lines or len(weak) > len(lines) / 2:
+                    sharp_lines = _read_lines(sharp, lang, config)
+                    if _confidence(sharp_lines) is not None and (
+                        not lines or _confidence(sharp_lines) > _confidence(lines)
+                    ):
+                        lines = sharp_lines
+                        result.update(dpi=dpi, reocr="page")
+                else:
+                    lines = _reread_regions(lines, weak, sharp, fast_size, lang, config)
+                    result["reocr"] = "regions"
+                sharp.close()
+        image.close()
+    except Exception as e:
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+    text = _lines_text(lines)
+    result.update(text=text, confidence=_confidence(lines), lang=lang, **_text_script(text, script))
+    return result
+
+
+# Installed Tesseract packs, looked up once per worker process
+_installed_langs: Optional[List[str]] = None
+
+
+def _select_lang(image: "Image.Image", lang: str) -> Tuple[str, Optional[str]]:
+    """
+    Resolve lang='auto' from the script Tesseract OSD finds on the image.
+
+    Reading with only the packs of the page's script is faster and more
+    accurate than loading every Indian language at once.
+
+    Returns:
+        (Tesseract language string, OSD script name or None)
+    """
+    global _installed_langs
+
+    if lang != "auto":
+        return lang, None
+    try:
+        script = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT).get("script")
+    except Exception:
+        # OSD needs the 'osd' pack and enough text on the page
+        script = None
+    if _installed_langs is None:
+        try:
+            _installed_langs = pytesseract.get_languages(config="")
+        except Exception:
+            pass
+    return tesseract_langs(script, _installed_langs), script
+
+
+def _text_script(text: str, osd_script: Optional[str]) -> Dict[str, Optional[str]]:
+    """Script and language of recognized text, trusting its characters over OSD."""
+    script = detect_script(text) or osd_script
+    return {"script": script, "language": script_language(script, text)}
+
+
+def _render(pdf_path: str, page_number: int, dpi: int) -> Optional["Image.Image"]:
+    images = convert_from_path(
+        pdf_path, dpi=_bounded_dpi(pdf_path, page_number, dpi),
+        first_page=page_number, last_page=page_number, grayscale=True,
+    )
+    return images[0] if images else None
+
+
+def _prepare(image: "Image.Image", skew: Optional[float] = None) -> Tuple["Image.Image", Dict[str, Any]]:
+    """Preprocess a rendered page (reusing a known skew so both passes share geometry)."""
+    if not OCR_PREPROCESS:
+        return image, {}
+    cleaned, info = preprocess(image, skew=skew)
+    image.close()
+    return cleaned, info
+
+
+def _read_lines(image: "Image.Image", lang: str, config: str) -> List[Dict[str, Any]]:
+    """
+    Words recognized by Tesseract, grouped into lines in reading order.
+
+    Returns:
+        List of {'paragraph', 'text', 'confidence', 'box': (left, top, right, bottom)}
+    """
+    data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+    lines: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+    for i, word in enumerate(data["text"]):
+        confidence = float(data["conf"][i])
+        if confidence < 0 or not word.strip():
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        left, top = data["left"][i], data["top"][i]
+        right, bottom = left + data["width"][i], top + data["height"][i]
+        line = lines.setdefault(key, {"paragraph": key[:2], "words": [], "weighted": 0.0, "box": (left, top, right, bottom)})
+        line["words"].append(word)
+        line["weighted"] += confidence * len(word)
+        box = line["box"]
+        line["box"] = (min(box[0], left), min(box[1], top), max(box[2], right), max(box[3], bottom))
+
+    result = []
+    for line in lines.values():
+        characters = sum(len(word) for word in line["words"])
+        result.append({
+            "paragraph": line["paragraph"],
+            "text": " ".join(line["words"]),
+            "confidence": line["weighted"] / characters,
+            "box": line["box"],
+        })
+    return result
+
+
+def _confidence(lines: List[Dict[str, Any]]) -> Optional[float]:
+    """Character-weighted mean confidence of lines (None if there are none)."""
+    characters = sum(len(line["text"]) for line in lines)
+    if not characters:
+        return None
+    return round(sum(line["confidence"] * len(line["text"]) for line in lines) / characters, 1)
+
+
+def _lines_text(lines: List[Dict[str, Any]]) -> str:
+    text, paragraph = "", None
+    for line in lines:
+        if text:
+            text += "\n\n" if line["paragraph"] != paragraph else "\n"
+        text += line["text"]
+        paragraph = line["paragraph"]
+    return text
+
+
+def _reread_regions(
+    lines: List[Dict[str, Any]],
+    weak: List[int],
+    sharp: "Image.Image",
+    fast_size: Tuple[int, int],
+    lang: str,
+    config: str,
+) -> List[Dict[str, Any]]:
+    """Re-read runs of consecutive weak lines from the sharper image."""
+    runs: List[List[int]] = []
+    for index in weak:
+        if runs and runs[-1][-1] == index - 1:
+            runs[-1].append(index)
+        else:
+            runs.append([index])
+
+    scale_x, scale_y = sharp.width / fast_size[0], sharp.height / fast_size[1]
+    block_config = f"{config} --psm 6".strip()
+    # Replace from the end so earlier indexes stay valid
+    for run in reversed(runs):
+        old = lines[run[0]:run[-1] + 1]
+        left = min(line["box"][0] for line in old)
+        top = min(line["box"][1] for line in old)
+        right = max(line["box"][2] for line in old)
+        bottom = max(line["box"][3] for line in old)
+        pad = (bottom - top) / len(old) * 0.3
+        region = sharp.crop((
+            max(0, int((left - pad) * scale_x)), max(0, int((top - pad) * scale_y)),
+            min(sharp.width, int((right + pad) * scale_x)), min(sharp.height, int((bottom + pad) * scale_y)),
+        ))
+        new = _read_lines(region, lang, block_config)
+        region.close()
+        if new and _confidence(new) > _confidence(old):
+            for line in new:
+                line["paragraph"] = old[0]["paragraph"]
+            lines[run[0]:run[-1] + 1] = new
+    return lines
+
+
+def _bounded_dpi(pdf_path: str, page_number: int, dpi: int) -> int:
+    """Lower the DPI for pages so large that rendering would exceed OCR_MAX_IMAGE_PIXELS."""
+    try:
+        stat = os.stat(pdf_path)
+        points = _page_areas(pdf_path, stat.st_mtime_ns, stat.st_size)[page_number - 1]
+    except Exception:
+        return dpi
+    pixels = points * (dpi / 72) ** 2
+    if pixels <= OCR_MAX_IMAGE_PIXELS:
+        return dpi
+    return max(1, int(dpi * (OCR_MAX_IMAGE_PIXELS / pixels) ** 0.5))
+
+
+@lru_cache(maxsize=8)
+def _page_areas(pdf_path: str, mtime_ns: int, size: int) -> Tuple[float, ...]:
+    """Mediabox area (points²) of every page, parsed once per file version in each worker."""
+    return tuple(float(page.mediabox.width) * float(page.mediabox.height) for page in PyPDF2.PdfReader(pdf_path).pages)
+
+
+# Singleton pool
+_pool_instance: Optional[ProcessPoolExecutor] = None
+
+
+def get_ocr_pool() -> ProcessPoolExecutor:
+    """Get or create the OCR process pool (OCR_WORKERS processes)."""
+    global _pool_instance
+
+    if _pool_instance is not None and getattr(_pool_instance, "_broken", False):
+        # A worker died (e.g. killed for memory); start a fresh pool
+        _pool_instance.shutdown(wait=False)
+        _pool_instance = None
+
+    if _pool_instance is None:
+        workers = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+        # spawn: forking a process that runs an event loop and thread pools is unsafe
+        _pool_instance = ProcessPoolExecutor(
+            max_workers=max(1, workers),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    return _pool_instance
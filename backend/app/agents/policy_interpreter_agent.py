@@ -1,21 +1,261 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from difflib import SequenceMatcher
 from .base_agent import BaseAgent
 from app.schemas import Policy, PolicyRule, OperatorEnum
+from app.agents.rule_merger import merge_rules, same_value
+from app.agents.regex_rule_scanner import regex_coverage, rule_scanner
+from app.agents.rule_stream_parser import IncrementalRuleParser, POLICY_RULES_JSON_SCHEMA
+from app.infra.interpretation_cache import get_interpretation_cache, make_interpretation_key
+from app.infra.policy_dedup import diff_sentences, get_policy_index, split_sentences
+from app.infra.policy_versions import get_policy_version_store
+from app.infra.llm_cache import cached_llm_invoke, describe_llm, get_llm_cache, make_cache_key
+from app.infra.prompt_compaction import compact_for_prompt, count_tokens, strip_boilerplate
+import json
+import os
 import re
+import threading
+
+
+# Bump whenever prompts, patterns or merging change: cached interpretations
+# are keyed by it, so old results stop being served
+INTERPRETER_VERSION = "9"
+
+RULE_EXTRACTION_SYSTEM_PROMPT = """You are a policy analysis expert. Extract eligibility rules from policy text.
+For each rule, identify:
+- key: the attribute name (e.g., 'income', 'state', 'is_student', 'age')
+- operator: comparison operator (==, !=, <, <=, >, >=)
+- value: the threshold or required value
+
+Common patterns:
+- "below X" or "less than X" → use <= operator
+- "above X" or "more than X" → use >= operator  
+- "must be X" → use == operator
+- "resident of X" → key='state', operator='==', value='X'
+- "enrolled student" → key='is_student', operator='==', value=True
+
+Return rules in JSON format: [{"key": "...", "operator": "...", "value": ...}]"""
+
+RULE_EXTRACTION_USER_PROMPT = "Policy text: {text}\n\nExtract eligibility rules:"
+
+# 'function' (function calling), 'json_schema' (structured outputs, newer models only)
+# or 'text' (free-form reply scanned for a JSON array)
+RULE_OUTPUT_MODE = os.getenv("RULE_OUTPUT_MODE", "function").lower()
+
+# 'hybrid' runs the regex scanner first and calls the LLM only when the scanner
+# left too much eligibility language unexplained; 'llm' always uses the LLM
+INTERPRETER_MODE = os.getenv("INTERPRETER_MODE", "hybrid").lower()
+HYBRID_COVERAGE_THRESHOLD = float(os.getenv("HYBRID_COVERAGE_THRESHOLD", "0.8"))
+
+# Long documents are split into sections of this size and extracted in parallel
+POLICY_SECTION_TOKENS = int(os.getenv("POLICY_SECTION_TOKENS", "1500"))
+POLICY_MAX_SECTIONS = int(os.getenv("POLICY_MAX_SECTIONS", "24"))
+
+# Shared across requests so concurrent documents cannot multiply the LLM fan-out
+_section_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("POLICY_SECTION_CONCURRENCY", "4")),
+    thread_name_prefix="interp-section",
+)
+
+# Year changes between editions of a scheme do not affect its rules, unless
+# the sentence is about dates (e.g. "born after 2005")
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+_DATE_CONTEXT_RE = re.compile(r"\b(?:born|birth|before|after|since|until|till)\b", re.IGNORECASE)
+
+
+def _bound(operator: Any) -> str:
+    """Direction of a rule's operator ('<' and '<=' both bound from above)."""
+    return {"<": "upper", "<=": "upper", ">": "lower", ">=": "lower"}.get(OperatorEnum(operator).value, OperatorEnum(operator).value)
+
+
+def _same_attribute(stored_key: str, scanned_key: str) -> bool:
+    """Whether a stored rule key names the scanner's attribute ('annual_income' for 'income')."""
+    stored = set(stored_key.lower().split("_")) - {"is"}
+    scanned = set(scanned_key.lower().split("_")) - {"is"}
+    return bool(scanned) and (scanned <= stored or stored <= scanned)
+
+
+def _edition_key(sentence: str) -> str:
+    """Sentence form used when diffing near-duplicate policies."""
+    if _DATE_CONTEXT_RE.search(sentence):
+        return sentence
+    return _YEAR_RE.sub("<year>", sentence)
+
+
+# How interpretations were produced: cache, near_duplicate (patched from a
+# similar policy), regex (no LLM configured), fast_path (hybrid, regex was
+# enough), llm, incremental (amendment of a stored policy version) or
+# pipelined (sections extracted while the document was still being read)
+_path_counts: Dict[str, int] = {
+    "cache": 0, "near_duplicate": 0, "regex": 0, "fast_path": 0, "llm": 0, "incremental": 0, "pipelined": 0
+}
+_path_lock = threading.Lock()
+
+
+def _count_path(path: str):
+    with _path_lock:
+        _path_counts[path] += 1
+
+
+def interpretation_stats() -> Dict[str, Any]:
+    """Get interpretation path counters and path rates (over interpretations not served from cache)."""
+    with _path_lock:
+        counts = dict(_path_counts)
+    computed = sum(count for path, count in counts.items() if path != "cache")
+    
+    def rate(path: str) -> float:
+        return round(counts[path] / computed, 4) if computed else 0.0
+    
+    return {
+        "mode": INTERPRETER_MODE,
+        "coverage_threshold": HYBRID_COVERAGE_THRESHOLD,
+        "paths": counts,
+        "fast_path_rate": rate("fast_path"),
+        "near_duplicate_rate": rate("near_duplicate"),
+        "llm_path_rate": rate("llm"),
+    }
+
+
+def request_rule_data(llm: Any, raw_text: str) -> Optional[list]:
+    """
+    Ask the LLM for the rules of a single policy.
+    
+    Args:
+        llm: LLM instance
+        raw_text: Policy text
+    
+    Returns:
+        List of raw rule dicts, or None if the response held no JSON array
+    """
+    messages = [
+        ("system", RULE_EXTRACTION_SYSTEM_PROMPT),
+        ("human", RULE_EXTRACTION_USER_PROMPT.format(text=raw_text)),
+    ]
+    content = cached_llm_invoke(
+        llm,
+        messages,
+        template=RULE_EXTRACTION_SYSTEM_PROMPT + RULE_EXTRACTION_USER_PROMPT,
+        variables={"text": raw_text},
+    )
+    
+    # Try to extract JSON from the response
+    json_match = re.search(r'\[.*\]', content, re.DOTALL)
+    if json_match:
+        return json.loads(json_match.group())
+    return None
+
+
+def structured_output_kwargs(mode: str) -> Dict[str, Any]:
+    """Request arguments that constrain the model's output to the rule schema."""
+    if mode == "json_schema":
+        return {
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": "policy_rules", "strict": True, "schema": POLICY_RULES_JSON_SCHEMA},
+            }
+        }
+    return {
+        "tools": [{
+            "type": "function",
+            "function": {
+                "name": "record_eligibility_rules",
+                "description": "Record the eligibility rules extracted from the policy text",
+                "parameters": POLICY_RULES_JSON_SCHEMA,
+            },
+        }],
+        "tool_choice": {"type": "function", "function": {"name": "record_eligibility_rules"}},
+    }
+
+
+def _chunk_text(chunk: Any, mode: str) -> str:
+    """Pull the JSON text out of a streamed chunk (tool-call arguments or content)."""
+    if mode == "function":
+        return "".join(part.get("args") or "" for part in getattr(chunk, "tool_call_chunks", None) or [])
+    content = getattr(chunk, "content", "")
+    return content if isinstance(content, str) else ""
+
+
+def stream_rule_data(llm: Any, raw_text: str, mode: str = RULE_OUTPUT_MODE) -> list:
+    """
+    Extract rules with schema-constrained output, parsing the stream incrementally.
+    
+    The stream is closed as soon as the output stops matching the schema,
+    so a bad generation costs only the tokens produced up to that point.
+    
+    Args:
+        llm: LLM instance exposing stream()
+        raw_text: Policy text
+        mode: 'function' or 'json_schema'
+    
+    Returns:
+        List of validated raw rule dicts
+    
+    Raises:
+        RuleStreamError: If the output does not match the rule schema
+    """
+    messages = [
+        ("system", RULE_EXTRACTION_SYSTEM_PROMPT),
+        ("human", RULE_EXTRACTION_USER_PROMPT.format(text=raw_text)),
+    ]
+    
+    cache = get_llm_cache()
+    if cache is not None:
+        info = describe_llm(llm)
+        key = make_cache_key(
+            info["model"],
+            info["temperature"],
+            template=f"{RULE_EXTRACTION_SYSTEM_PROMPT}{RULE_EXTRACTION_USER_PROMPT}#{mode}",
+            variables={"text": raw_text},
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            return json.loads(cached)["rules"]
+    
+    parser = IncrementalRuleParser()
+    stream = llm.stream(messages, **structured_output_kwargs(mode))
+    try:
+        for chunk in stream:
+            parser.feed(_chunk_text(chunk, mode))
+            if parser.complete:
+                break
+    finally:
+        # Stops generation early when the parser rejected the output
+        stream.close()
+    
+    rules = parser.close()
+    if cache is not None:
+        cache.set(key, json.dumps({"rules": rules}), info["model"])
+    return rules
 
 
 class PolicyInterpreterAgent(BaseAgent):
     """Agent responsible for interpreting natural language policy text into structured rules."""
     
+    def __init__(self, llm: Optional[Any] = None, batcher: Optional[Any] = None):
+        """
+        Initialize the interpreter.
+        
+        Args:
+            llm: Optional language model for rule extraction
+            batcher: Optional InterpretationBatcher that groups LLM extraction calls
+        """
+        super().__init__(llm)
+        self.batcher = batcher
+    
     def handle(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Interpret policy text and extract structured rules.
         
         Args:
-            context: Dict with 'raw_text' (str) and 'policy_name' (str)
+            context: Dict with 'raw_text' (str), 'policy_name' (str) and
+                optionally 'policy_id' (str) to interpret the text as a new
+                version of a stored policy
         
         Returns:
-            Dict with 'policy' (Policy), 'rules_count' (int), or 'error'
+            Dict with 'policy' (Policy), 'rules_count' (int), 'sections' (int),
+            'truncated' (bool), 'cached' (bool), 'path' (str), 'coverage'
+            (float or None), or 'error'. Versioned interpretations also
+            return 'version' and 'segments_reextracted'
         """
         try:
             raw_text: str = context.get("raw_text", "")
@@ -24,182 +264,388 @@ class PolicyInterpreterAgent(BaseAgent):
             if not raw_text:
                 return {"error": "raw_text is required"}
             
-            # Extract rules using LLM if available, otherwise use regex
-            if self.llm:
-                rules = self._extract_rules_with_llm(raw_text)
-            else:
-                rules = self._extract_rules_with_regex(raw_text)
+            if context.get("policy_id"):
+                return self._handle_versioned(context["policy_id"], raw_text, policy_name)
             
-            policy = Policy(
-                name=policy_name,
-                raw_text=raw_text,
-                rules=rules,
-                description=self._extract_description(raw_text),
-                benefits=self._extract_benefits(raw_text)
-            )
+            # Same text, same interpreter version and mode -> same result
+            mode = f"{INTERPRETER_MODE}:{RULE_OUTPUT_MODE}" if self.llm else "regex"
+            cache = get_interpretation_cache()
+            key = make_interpretation_key(raw_text, INTERPRETER_VERSION, mode) if cache is not None else None
+            entry = cache.get(key) if cache is not None else None
+            cached = entry is not None
             
-            return {
-                "policy": policy,
-                "rules_count": len(rules)
-            }
+            if entry is None:
+                entry, complete = self._interpret(raw_text)
+                # Results degraded by a regex fallback are not worth keeping
+                if cache is not None and complete:
+                    cache.set(key, entry)
+            _count_path("cache" if cached else entry["path"])
+            return self._result(entry, raw_text, policy_name, cached)
         
         except Exception as e:
             return {"error": f"Error interpreting policy: {str(e)}"}
     
+    def start_paged(self, first_page: int = 1, document_key: Optional[str] = None) -> "PagedInterpretation":
+        """
+        Start interpreting a document whose pages are still being extracted.
+        
+        Args:
+            first_page: Number of the first page that will be fed
+            document_key: Stable key of the source document and extraction
+                settings (e.g. the extraction cache key); lets a repeat upload
+                be answered from cache before any section is sent (the lookup
+                blocks, so call this from a thread when on the event loop)
+        
+        Returns:
+            PagedInterpretation to feed pages to and finish
+        """
+        return PagedInterpretation(self, first_page, document_key)
+    
+    def _result(self, entry: Dict[str, Any], raw_text: str, policy_name: str, cached: bool) -> Dict[str, Any]:
+        """Build the handle() result from a (cacheable) interpretation entry."""
+        rules = [PolicyRule(**rule) for rule in entry["rules"]]
+        policy = Policy(
+            name=policy_name,
+            raw_text=raw_text,
+            rules=rules,
+            description=entry["description"],
+            benefits=entry["benefits"]
+        )
+        
+        return {
+            "policy": policy,
+            "rules_count": len(rules),
+            "sections": entry["sections"],
+            "truncated": entry["truncated"],
+            "cached": cached,
+            "path": entry["path"],
+            "coverage": entry["coverage"]
+        }
+    
+    def _handle_versioned(self, policy_id: str, raw_text: str, policy_name: str) -> Dict[str, Any]:
+        """
+        Interpret a policy as an amendment of its stored version.
+        
+        The text is split into units (paragraphs, or sentences for single-block
+        text) packed into segments. Stored segments whose units are all still
+        present keep their rules; the remaining units are re-packed and
+        re-extracted, and the result becomes the new stored version.
+        """
+        store = get_policy_version_store()
+        previous = store.get(policy_id)
+        if previous is not None and previous.get("interpreter_version") != INTERPRETER_VERSION:
+            previous = None
+        
+        units = self._split_units(raw_text)
+        old_segments = previous["segments"] if previous else []
+        old_units = [(index, unit) for index, segment in enumerate(old_segments) for unit in segment["units"]]
+        
+        # Map new units onto unchanged old units
+        owner: Dict[int, int] = {}
+        matcher = SequenceMatcher(None, [unit for _, unit in old_units], units, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                for offset in range(i2 - i1):
+                    owner[j1 + offset] = old_units[i1 + offset][0]
+        
+        # A stored segment survives only if all of its units map, contiguously, onto the new text
+        positions: Dict[int, List[int]] = {}
+        for j, segment_index in sorted(owner.items()):
+            positions.setdefault(segment_index, []).append(j)
+        intact = {
+            index for index, segment in enumerate(old_segments)
+            if len(positions.get(index, [])) == len(segment["units"])
+            and positions[index][-1] - positions[index][0] == len(segment["units"]) - 1
+        }
+        
+        # Walk the new text in order: keep intact segments, collect runs of changed units
+        segments: List[Tuple[int, Dict[str, Any]]] = []  # (position of first unit, segment)
+        dirty_runs: List[List[Tuple[int, str]]] = []
+        run: List[Tuple[int, str]] = []
+        for j, unit in enumerate(units):
+            segment_index = owner.get(j)
+            if segment_index in intact:
+                if run:
+                    dirty_runs.append(run)
+                    run = []
+                if positions[segment_index][0] == j:
+                    segments.append((j, old_segments[segment_index]))
+            else:
+                run.append((j, unit))
+        if run:
+            dirty_runs.append(run)
+        
+        new_segments: List[Tuple[int, List[str]]] = []
+        for run in dirty_runs:
+            offset = 0
+            for packed in self._pack_units([unit for _, unit in run]):
+                new_segments.append((run[offset][0], packed))
+                offset += len(packed)
+        
+        extracted = list(_section_executor.map(
+            self._extract_segment, ["\n\n".join(segment_units) for _, segment_units in new_segments]
+        ))
+        
+        complete = True
+        for (position, segment_units), (rules, ok) in zip(new_segments, extracted):
+            complete = complete and ok
+            segments.append((position, {
+                "units": segment_units,
+                "rules": [rule.model_dump(mode="json") for rule in rules],
+            }))
+        segments.sort(key=lambda item: item[0])
+        ordered = [segment for _, segment in segments]
+        
+        rules = merge_rules([PolicyRule(**rule) for rule in segment["rules"]] for segment in ordered)
+        # Segments that fell back to regex are not stored, so the next amendment retries them
+        if previous is not None and previous["raw_text"] == raw_text:
+            version = previous["version"]
+        elif complete:
+            record = store.put(policy_id, {
+                "interpreter_version": INTERPRETER_VERSION,
+                "raw_text": raw_text,
+                "segments": ordered,
+            })
+            version = record["version"]
+        else:
+            version = previous["version"] if previous else 0
+        path = "incremental" if previous else ("llm" if self.llm else "regex")
+        _count_path(path)
+        
+        policy = Policy(
+            id=policy_id,
+            name=policy_name,
+            raw_text=raw_text,
+            rules=rules,
+            description=self._extract_description(raw_text),
+            benefits=self._extract_benefits(raw_text)
+        )
+        return {
+            "policy": policy,
+            "rules_count": len(rules),
+            "sections": len(ordered),
+            "truncated": False,
+            "cached": False,
+            "path": path,
+            "coverage": None,
+            "version": version,
+            "segments_reextracted": len(new_segments),
+        }
+    
+    def _split_units(self, raw_text: str) -> List[str]:
+        """Split text into diffable units: paragraphs, or sentences when there is one block."""
+        text = strip_boilerplate(raw_text)
+        paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+        if len(paragraphs) > 1:
+            return paragraphs
+        return [sentence for sentence, _ in split_sentences(text)]
+    
+    def _pack_units(self, units: List[str]) -> List[List[str]]:
+        """Pack consecutive units into segments of at most POLICY_SECTION_TOKENS."""
+        segments: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        for unit in units:
+            tokens = count_tokens(unit)
+            if current and current_tokens + tokens > POLICY_SECTION_TOKENS:
+                segments.append(current)
+                current, current_tokens = [], 0
+            current.append(unit)
+            current_tokens += tokens
+        if current:
+            segments.append(current)
+        return segments
+    
+    def _extract_segment(self, text: str) -> Tuple[list[PolicyRule], bool]:
+        """Extract the rules of one segment (regex first in hybrid mode)."""
+        if not self.llm:
+            return self._extract_rules_with_regex(text), True
+        if INTERPRETER_MODE == "hybrid":
+            scan = rule_scanner.scan(text)
+            if scan["rules"] and regex_coverage(text, scan["spans"])["score"] >= HYBRID_COVERAGE_THRESHOLD:
+                return scan["rules"], True
+        return self._try_llm_extraction(text)
+    
+    def _interpret(self, raw_text: str, paged: Optional["PagedInterpretation"] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run extraction for a policy text.
+        
+        Args:
+            raw_text: Policy text
+            paged: Pipelined section extraction of the same text; used in place
+                of sectioning raw_text when the LLM step is reached, and
+                cancelled when a cheaper path answers first
+        
+        Returns:
+            Cacheable entry (rules as plain dicts, description, benefits,
+            sections, truncated, path, coverage) and whether every section was
+            extracted as intended (False when the LLM path fell back to regex)
+        """
+        truncated = False
+        sections = 1
+        complete = True
+        coverage = None
+        path = "llm" if self.llm else "regex"
+        rules = None
+        
+        # Near-duplicate of an interpreted policy: patch its rules from the diff
+        index = get_policy_index()
+        if index is not None:
+            rules = self._rules_from_near_duplicate(index, raw_text)
+            if rules is not None:
+                path = "near_duplicate"
+        
+        # Hybrid: keep the regex result when it explains the eligibility language
+        if rules is None and self.llm and INTERPRETER_MODE == "hybrid":
+            scan = rule_scanner.scan(raw_text)
+            coverage = regex_coverage(raw_text, scan["spans"])["score"]
+            if scan["rules"] and coverage >= HYBRID_COVERAGE_THRESHOLD:
+                rules = scan["rules"]
+                path = "fast_path"
+        
+        # Otherwise extract rules using LLM if available, or regex
+        if rules is None and self.llm and paged is not None:
+            rules, complete, sections, truncated = paged.collect()
+            path = "pipelined"
+        elif rules is None and self.llm:
+            # Drop OCR boilerplate and split long documents into prompt-sized sections
+            prepared = compact_for_prompt(raw_text, budget_tokens=POLICY_SECTION_TOKENS)
+            section_texts = prepared["sections"][:POLICY_MAX_SECTIONS]
+            truncated = len(prepared["sections"]) > POLICY_MAX_SECTIONS
+            sections = len(section_texts)
+            rules, complete = self._extract_rules_from_sections(section_texts)
+        elif rules is None:
+            rules = self._extract_rules_with_regex(raw_text)
+        if paged is not None and path != "pipelined":
+            paged.cancel()
+        
+        entry = {
+            "rules": [rule.model_dump(mode="json") for rule in rules],
+            "description": self._extract_description(raw_text),
+            "benefits": self._extract_benefits(raw_text),
+            "sections": sections,
+            "truncated": truncated,
+            "path": path,
+            "coverage": coverage,
+        }
+        if index is not None and complete:
+            index.add(raw_text, rules=entry["rules"])
+        return entry, complete
+    
+    def _rules_from_near_duplicate(self, index: Any, raw_text: str) -> Optional[list[PolicyRule]]:
+        """
+        Reuse the rules of the closest already-interpreted policy.
+        
+        The two texts are compared sentence by sentence, ignoring edition
+        years. Rules the scanner finds in removed sentences are matched to
+        stored rules by attribute and bound direction (stored rules may come
+        from the LLM, with other key names and value types) and dropped; rules
+        it finds in added sentences are merged in under the stored key names.
+        If the scanner cannot explain every changed sentence that reads like an
+        eligibility condition, or a removed rule matches no stored rule, the
+        patch is not trusted.
+        
+        Returns:
+            Patched rules, or None when there is no usable match
+        """
+        match = index.find(raw_text, require="rules")
+        if match is None:
+            return None
+        record, _ = match
+        
+        diff = diff_sentences(record["text"], raw_text, key=_edition_key)
+        removed_text = "\n".join(diff["removed"])
+        added_text = "\n".join(diff["added"])
+        removed = rule_scanner.scan(removed_text)
+        added = rule_scanner.scan(added_text)
+        for text, scan in ((removed_text, removed), (added_text, added)):
+            if regex_coverage(text, scan["spans"])["score"] < 1.0:
+                return None
+        
+        def same_rule(a: PolicyRule, b: PolicyRule) -> bool:
+            return _same_attribute(a.key, b.key) and _bound(a.operator) == _bound(b.operator) and same_value(a.value, b.value)
+        
+        stored = [PolicyRule(**data) for data in record["rules"]]
+        # A rule stated again in an unchanged sentence still holds
+        still_stated = rule_scanner.scan("\n".join(diff["unchanged"]))["rules"]
+        dropped = set()
+        renamed: Dict[Tuple[str, str], str] = {}  # (scanner key, bound) -> stored key
+        for rule in removed["rules"]:
+            if any(same_rule(rule, other) for other in still_stated):
+                continue
+            candidates = [
+                i for i, old in enumerate(stored)
+                if _same_attribute(old.key, rule.key) and _bound(old.operator) == _bound(rule.operator)
+            ]
+            exact = [i for i in candidates if same_value(stored[i].value, rule.value)]
+            if len(exact) == 1 or (not exact and len(candidates) == 1):
+                match_index = (exact or candidates)[0]
+            else:
+                # The stored rules do not show which one this sentence stated
+                return None
+            dropped.add(match_index)
+            renamed[(rule.key, _bound(rule.operator))] = stored[match_index].key
+        
+        kept = [rule for i, rule in enumerate(stored) if i not in dropped]
+        added_rules = [
+            rule.model_copy(update={"key": renamed.get((rule.key, _bound(rule.operator)), rule.key)})
+            for rule in added["rules"]
+        ]
+        return merge_rules([kept, added_rules])
+    
+    def _extract_rules_from_sections(self, sections: list[str]) -> Tuple[list[PolicyRule], bool]:
+        """Extract rules from each section concurrently and merge them."""
+        if len(sections) <= 1:
+            return self._try_llm_extraction(sections[0] if sections else "")
+        
+        # map() keeps document order, so equality conflicts resolve to the earliest section
+        results = list(_section_executor.map(self._try_llm_extraction, sections))
+        rules = merge_rules(rules for rules, _ in results)
+        return rules, all(used_llm for _, used_llm in results)
+    
     def _extract_rules_with_llm(self, raw_text: str) -> list[PolicyRule]:
-        """Extract rules using LLM."""
+        """Extract rules using LLM (through the micro-batcher when one is configured)."""
+        return self._try_llm_extraction(raw_text)[0]
+    
+    def _try_llm_extraction(self, raw_text: str) -> Tuple[list[PolicyRule], bool]:
+        """Extract rules using LLM; returns the rules and False if regex had to be used."""
         try:
-            from langchain.prompts import ChatPromptTemplate
-            from langchain.output_parsers import PydanticOutputParser
-            
-            # Create a prompt for rule extraction
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", """You are a policy analysis expert. Extract eligibility rules from policy text.
-For each rule, identify:
-- key: the attribute name (e.g., 'income', 'state', 'is_student', 'age')
-- operator: comparison operator (==, !=, <, <=, >, >=)
-- value: the threshold or required value
-
-Common patterns:
-- "below X" or "less than X" → use <= operator
-- "above X" or "more than X" → use >= operator  
-- "must be X" → use == operator
-- "resident of X" → key='state', operator='==', value='X'
-- "enrolled student" → key='is_student', operator='==', value=True
-
-Return rules in JSON format: [{"key": "...", "operator": "...", "value": ...}]"""),
-                ("user", "Policy text: {text}\n\nExtract eligibility rules:")
-            ])
-            
-            chain = prompt | self.llm
-            response = chain.invoke({"text": raw_text})
-            
-            # Parse the response to extract rules
-            import json
-            content = response.content
+            if self.batcher is not None:
+                rules_data = self.batcher.extract(raw_text)
+            elif RULE_OUTPUT_MODE in ("function", "json_schema"):
+                rules_data = stream_rule_data(self.llm, raw_text)
+            else:
+                rules_data = request_rule_data(self.llm, raw_text)
             
-            # Try to extract JSON from the response
-            json_match = re.search(r'\[.*\]', content, re.DOTALL)
-            if json_match:
-                rules_data = json.loads(json_match.group())
-                rules = []
-                for rule_dict in rules_data:
-                    # Map operator string to enum
-                    op_str = rule_dict.get('operator', '==')
-                    operator = self._map_operator(op_str)
-                    
-                    rules.append(PolicyRule(
-                        key=rule_dict.get('key', ''),
-                        operator=operator,
-                        value=rule_dict.get('value')
-                    ))
-                return rules
+            if rules_data is not None:
+                return self._rules_from_data(rules_data), True
             
             # Fallback to regex if LLM doesn't return proper JSON
-            return self._extract_rules_with_regex(raw_text)
+            return self._extract_rules_with_regex(raw_text), False
         
         except Exception:
-            # Fallback to regex extraction
-            return self._extract_rules_with_regex(raw_text)
+            # Fallback to regex extraction (also taken while the LLM circuit breaker is open)
+            return self._extract_rules_with_regex(raw_text), False
     
-    def _extract_rules_with_regex(self, raw_text: str) -> list[PolicyRule]:
-        """Extract rules using regex patterns."""
+    def _rules_from_data(self, rules_data: list) -> list[PolicyRule]:
+        """Convert raw rule dicts from the LLM into PolicyRule objects."""
         rules = []
-        text_lower = raw_text.lower()
-        
-        # Pattern 1: income not exceed / must not exceed
-        income_match = re.search(r'income\s+(?:must\s+)?(?:not\s+)?(?:exceed|exceeding?)\s+[₹$]?\s*(\d[\d,]+)', text_lower)
-        if income_match:
-            value = int(income_match.group(1).replace(',', ''))
-            rules.append(PolicyRule(
-                key="income",
-                operator=OperatorEnum.LESS_THAN_OR_EQUAL,
-                value=value
-            ))
-        
-        # Pattern 2: income below/less than X
-        if not income_match:
-            income_match2 = re.search(r'income\s+(?:below|less\s+than|under)\s+[₹$]?\s*(\d[\d,]+)', text_lower)
-            if income_match2:
-                value = int(income_match2.group(1).replace(',', ''))
-                rules.append(PolicyRule(
-                    key="income",
-                    operator=OperatorEnum.LESS_THAN_OR_EQUAL,
-                    value=value
-                ))
-        
-        # Pattern 3: permanent/resident of State
-        state_match = re.search(r'(?:permanent\s+)?resident\s+of\s+(\w+)', text_lower)
-        if state_match:
-            rules.append(PolicyRule(
-                key="state",
-                operator=OperatorEnum.EQUAL,
-                value=state_match.group(1).title()
-            ))
-        
-        # Pattern 4: enrolled student / must be student
-        if re.search(r'(?:enrolled|full-time)\s+student|must\s+be\s+(?:a\s+)?student', text_lower):
-            rules.append(PolicyRule(
-                key="is_student",
-                operator=OperatorEnum.EQUAL,
-                value=True
-            ))
-        
-        # Pattern 5: disability percentage should be at least X / disability of at least X
-        disability_match = re.search(r'disability\s+(?:percentage\s+)?(?:should\s+be|must\s+be|of)?\s*(?:at\s+least)\s+(\d+)\s*(?:percent|%)', text_lower)
-        if disability_match:
-            rules.append(PolicyRule(
-                key="disability_percentage",
-                operator=OperatorEnum.GREATER_THAN_OR_EQUAL,
-                value=int(disability_match.group(1))
-            ))
-        
-        # Pattern 6: age between X and Y
-        age_range_match = re.search(r'age\s+(?:must\s+be\s+)?between\s+(\d+)\s+and\s+(\d+)', text_lower)
-        if age_range_match:
-            min_age = int(age_range_match.group(1))
-            max_age = int(age_range_match.group(2))
-            rules.append(PolicyRule(
-                key="age",
-                operator=OperatorEnum.GREATER_THAN_OR_EQUAL,
-                value=min_age
-            ))
+        for rule_dict in rules_data:
+            # Map operator string to enum
+            op_str = rule_dict.get('operator', '==')
+            operator = self._map_operator(op_str)
+            
             rules.append(PolicyRule(
-                key="age",
-                operator=OperatorEnum.LESS_THAN_OR_EQUAL,
-                value=max_age
+                key=rule_dict.get('key', ''),
+                operator=operator,
+                value=rule_dict.get('value')
             ))
-        else:
-            # Pattern 7: minimum age / age at least X
-            min_age_match = re.search(r'(?:minimum\s+age|age\s+(?:at\s+least|minimum|above)).*?(\d+)\s*years?', text_lower)
-            if min_age_match:
-                rules.append(PolicyRule(
-                    key="age",
-                    operator=OperatorEnum.GREATER_THAN_OR_EQUAL,
-                    value=int(min_age_match.group(1))
-                ))
-            
-            # Pattern 8: maximum age / age below X
-            max_age_match = re.search(r'(?:maximum\s+age|age\s+(?:below|under|less\s+than|maximum)).*?(\d+)\s*years?', text_lower)
-            if max_age_match:
-                rules.append(PolicyRule(
-                    key="age",
-                    operator=OperatorEnum.LESS_THAN_OR_EQUAL,
-                    value=int(max_age_match.group(1))
-                ))
-        
-        # Pattern: age above/over X (without already matching minimum age)
-        if not min_age_match:
-            age_above = re.search(r'age\s+(?:above|over|greater\s+than)\s+(\d+)', text_lower)
-            if age_above:
-                rules.append(PolicyRule(
-                    key="age",
-                    operator=OperatorEnum.GREATER_THAN,
-                    value=int(age_above.group(1))
-                ))
-        
         return rules
     
+    def _extract_rules_with_regex(self, raw_text: str) -> list[PolicyRule]:
+        """Extract rules using regex patterns (single pass over the text)."""
+        return rule_scanner.scan(raw_text)["rules"]
+    
     def _map_operator(self, op_str: str) -> OperatorEnum:
         """Map operator string to OperatorEnum."""
         op_map = {
@@ -242,4 +688,157 @@ Return rules in JSON format: [{"key": "...", "operator": "...", "value": ...}]""
 
 
 # Global instance
-policy_interpreter_agent = PolicyInterpreterAgent()
\ No newline at end of file
+policy_interpreter_agent = PolicyInterpreterAgent()
+
+class PagedInterpretation:
+    """
+    Interpretation fed page by page while a document is being extracted.
+    
+    Construction (a cache lookup) and add_page (tokenization) block, so call
+    them from a thread when on the event loop.
+    
+    Pages may arrive in any order (OCR finishes them out of order). Runs of
+    consecutive pages are packed into sections of about POLICY_SECTION_TOKENS
+    and handed to the section executor as soon as they fill up, so rule
+    extraction of early pages overlaps with OCR of later ones.
+    
+    LLM calls are only made where handle() would make them: a repeat upload
+    (same document_key) is answered from cache before anything is sent, each
+    section is looked up in the interpretation cache and, in hybrid mode,
+    scanned with regex before it reaches the LLM, and finish() still tries the
+    whole-text cache, near-duplicate and fast paths first (cancelling the
+    sections that have not started).
+    """
+    
+    def __init__(self, agent: PolicyInterpreterAgent, first_page: int = 1, document_key: Optional[str] = None):
+        """
+        Initialize the interpretation.
+        
+        Args:
+            agent: Interpreter whose LLM and mode are used for the sections
+            first_page: Number of the first page that will be fed
+            document_key: Stable key of the source document (see start_paged)
+        """
+        self.agent = agent
+        self.next_page = first_page
+        self.pending: Dict[int, str] = {}
+        self.buffer: List[str] = []
+        self.buffer_tokens = 0
+        self.sections: List[Future] = []
+        self.truncated = False
+        self._lock = threading.Lock()
+        self.mode = f"{INTERPRETER_MODE}:{RULE_OUTPUT_MODE}" if agent.llm else "regex"
+        self.cache = get_interpretation_cache()
+        self.document_key = None
+        if self.cache is not None and document_key:
+            self.document_key = make_interpretation_key(f"document:{document_key}", INTERPRETER_VERSION, self.mode)
+        self.resolved = self.cache.get(self.document_key) if self.document_key else None
+        # Without an LLM, regex over the whole text in finish() is as fast as sections
+        self.active = agent.llm is not None and self.resolved is None
+    
+    def add_page(self, number: int, text: str):
+        """Feed one extracted page (thread-safe; never waits for section extraction)."""
+        with self._lock:
+            if not self.active:
+                return
+            self.pending[number] = text
+            while self.next_page in self.pending:
+                self._buffer(self.pending.pop(self.next_page))
+                self.next_page += 1
+            if self.buffer_tokens >= POLICY_SECTION_TOKENS:
+                self._submit()
+    
+    def finish(self, raw_text: str, policy_name: str = "Untitled Policy") -> Dict[str, Any]:
+        """
+        Wait for the section extractions and build the interpretation.
+        
+        Args:
+            raw_text: Full extracted text (for the cache key, description and benefits)
+            policy_name: Name of the policy
+        
+        Returns:
+            Same as PolicyInterpreterAgent.handle()
+        """
+        try:
+            if not raw_text:
+                self.cancel()
+                return {"error": "raw_text is required"}
+            
+            agent = self.agent
+            key = make_interpretation_key(raw_text, INTERPRETER_VERSION, self.mode) if self.cache is not None else None
+            entry = self.resolved or (self.cache.get(key) if key else None)
+            cached = entry is not None
+            
+            if cached:
+                self.cancel()
+            else:
+                entry, complete = agent._interpret(raw_text, paged=self)
+                if self.cache is not None and complete:
+                    self.cache.set(key, entry)
+                    if self.document_key:
+                        self.cache.set(self.document_key, entry)
+            _count_path("cache" if cached else entry["path"])
+            return agent._result(entry, raw_text, policy_name, cached)
+        
+        except Exception as e:
+            self.cancel()
+            return {"error": f"Error interpreting policy: {str(e)}"}
+    
+    def collect(self) -> Tuple[list[PolicyRule], bool, int, bool]:
+        """
+        Send the remaining pages and wait for every section.
+        
+        Returns:
+            (rules merged in document order, whether every section was
+            extracted as intended, number of sections, truncated)
+        """
+        with self._lock:
+            # Pages that never joined a consecutive run (e.g. after a gap)
+            for number in sorted(self.pending):
+                self._buffer(self.pending.pop(number))
+            self._submit(final=True)
+        
+        # Sections were submitted in document order, so equality conflicts
+        # resolve to the earliest section as in handle()
+        results = [section.result() for section in self.sections]
+        rules = merge_rules(section_rules for section_rules, _ in results)
+        return rules, all(ok for _, ok in results), len(results), self.truncated
+    
+    def cancel(self):
+        """Stop feeding sections and drop those that have not started."""
+        with self._lock:
+            self.active = False
+            for section in self.sections:
+                section.cancel()
+    
+    def _extract_section(self, text: str) -> Tuple[list[PolicyRule], bool]:
+        """Extract one section (executor thread), reusing the cached result for the same text."""
+        key = make_interpretation_key(text, INTERPRETER_VERSION, f"{self.mode}:section") if self.cache is not None else None
+        entry = self.cache.get(key) if key else None
+        if entry is not None:
+            return [PolicyRule(**rule) for rule in entry["rules"]], True
+        rules, ok = self.agent._extract_segment(text)
+        if key and ok:
+            self.cache.set(key, {"rules": [rule.model_dump(mode="json") for rule in rules]})
+        return rules, ok
+    
+    def _buffer(self, text: str):
+        text = text.strip()
+        if text:
+            self.buffer.append(text)
+            self.buffer_tokens += count_tokens(text)
+    
+    def _submit(self, final: bool = False):
+        """Send full sections of the buffer for extraction (all of it when final)."""
+        if not self.buffer:
+            return
+        sections = compact_for_prompt("\n\n".join(self.buffer), budget_tokens=POLICY_SECTION_TOKENS)["sections"]
+        self.buffer, self.buffer_tokens = [], 0
+        if not final and len(sections) > 1:
+            # The tail is usually short; let the next pages fill it up
+            self._buffer(sections.pop())
+        for section in sections:
+            if len(self.sections) >= POLICY_MAX_SECTIONS:
+                self.truncated = True
+                return
+            self.sections.append(_section_executor.submit(self._extract_section, section))
@@ -0,0 +1,240 @@
+"""
+Regex Rule Scanner - Single-pass, table-driven eligibility rule extraction
+All rule patterns are compiled into one alternation. A single sweep over the
+text finds the trigger words that rules start with, and the alternation is
+tried only at those positions. Quantifiers are bounded, so the scan stays
+linear on long OCR output. New patterns are added to RULE_PATTERNS; nothing
+else needs to change.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import re
+
+from app.schemas import OperatorEnum, PolicyRule
+
+
+def _amount(value: str) -> int:
+    return int(value.replace(",", ""))
+
+
+def _title(value: str) -> str:
+    return value.title()
+
+
+def _true(_: Optional[str]) -> bool:
+    return True
+
+
+# Declarative pattern table, in priority order (earlier entries win when two
+# patterns match at the same position). Gaps between a cue and its value are
+# bounded and stay on one line, but may contain dates ("as on 01.04.2024").
+#   name:     unique pattern name
+#   triggers: literal words a match can start with (lowercase)
+#   pattern:  regex, matched case-insensitively; named groups are local to the entry
+#   rules:    (key, operator, group or None, convert) for every rule a match yields
+#   unless:   names of earlier patterns that, when they yield rules, suppress this one
+#             (a match that was itself suppressed does not count)
+RULE_PATTERNS: List[Dict[str, Any]] = [
+    {
+        "name": "income_max",
+        "triggers": ["income"],
+        "pattern": r"income\s+(?:must\s+)?(?:not\s+)?(?:exceed|exceeding?)\s+[₹$]?\s*(?P<value>\d[\d,]{0,20})",
+        "rules": [("income", OperatorEnum.LESS_THAN_OR_EQUAL, "value", _amount)],
+    },
+    {
+        "name": "income_below",
+        "triggers": ["income"],
+        "pattern": r"income\s+(?:below|less\s+than|under)\s+[₹$]?\s*(?P<value>\d[\d,]{0,20})",
+        "rules": [("income", OperatorEnum.LESS_THAN_OR_EQUAL, "value", _amount)],
+        "unless": ["income_max"],
+    },
+    {
+        "name": "state",
+        "triggers": ["permanent", "resident"],
+        "pattern": r"(?:permanent\s+)?resident\s+of\s+(?P<value>\w{1,40})",
+        "rules": [("state", OperatorEnum.EQUAL, "value", _title)],
+    },
+    {
+        "name": "student",
+        "triggers": ["enrolled", "full-time", "must"],
+        "pattern": r"(?:enrolled|full-time)\s+student|must\s+be\s+(?:a\s+)?student",
+        "rules": [("is_student", OperatorEnum.EQUAL, None, _true)],
+    },
+    {
+        "name": "disability_min",
+        "triggers": ["disability"],
+        "pattern": r"disability\s+(?:percentage\s+)?(?:should\s+be|must\s+be|of)?\s*at\s+least\s+(?P<value>\d{1,3})\s*(?:percent|%)",
+        "rules": [("disability_percentage", OperatorEnum.GREATER_THAN_OR_EQUAL, "value", int)],
+    },
+    {
+        "name": "age_range",
+        "triggers": ["age"],
+        "pattern": r"age\s+(?:must\s+be\s+)?between\s+(?P<min>\d{1,3})\s+and\s+(?P<max>\d{1,3})",
+        "rules": [
+            ("age", OperatorEnum.GREATER_THAN_OR_EQUAL, "min", int),
+            ("age", OperatorEnum.LESS_THAN_OR_EQUAL, "max", int),
+        ],
+    },
+    {
+        "name": "age_min",
+        "triggers": ["minimum", "age"],
+        "pattern": r"(?:minimum\s+age|age\s+(?:at\s+least|minimum|above))[^\n]{0,60}?(?<!\d)(?P<value>\d{1,3})\s*years?",
+        "rules": [("age", OperatorEnum.GREATER_THAN_OR_EQUAL, "value", int)],
+        "unless": ["age_range"],
+    },
+    {
+        "name": "age_max",
+        "triggers": ["maximum", "age"],
+        "pattern": r"(?:maximum\s+age|age\s+(?:below|under|less\s+than|maximum))[^\n]{0,60}?(?<!\d)(?P<value>\d{1,3})\s*years?",
+        "rules": [("age", OperatorEnum.LESS_THAN_OR_EQUAL, "value", int)],
+        "unless": ["age_range"],
+    },
+    {
+        "name": "age_above",
+        "triggers": ["age"],
+        "pattern": r"age\s+(?:above|over|greater\s+than)\s+(?P<value>\d{1,3})",
+        "rules": [("age", OperatorEnum.GREATER_THAN, "value", int)],
+        "unless": ["age_min"],
+    },
+]
+
+_GROUP_RE = re.compile(r"\(\?P<(\w+)>")
+
+# Phrases that suggest a sentence states an eligibility condition. Used to
+# judge how much of a text the pattern table actually explained.
+ELIGIBILITY_CUE_RE = re.compile(
+    r"\b(?:eligib\w*|income|age[ds]?|years?\s+old|resident|domicile|student|disab\w*|"
+    r"caste|categor(?:y|ies)|bpl|poverty|widow\w*|farmers?|women|gender|minority|"
+    r"not\s+exceed|at\s+least|minimum|maximum|must\s+(?:be|have)|should\s+(?:be|have)|only\s+for)\b",
+    re.IGNORECASE,
+)
+_SENTENCE_RE = re.compile(r"[^.!?;\n]+")
+
+
+class RuleScanner:
+    """Compiles a pattern table into one regex and extracts rules in a single pass."""
+
+    def __init__(self, patterns: Sequence[Dict[str, Any]] = RULE_PATTERNS):
+        """
+        Compile the pattern table.
+
+        Args:
+            patterns: Pattern entries (see RULE_PATTERNS)
+        """
+        self.patterns = {entry["name"]: entry for entry in patterns}
+        self._slots: Dict[str, str] = {}
+
+        branches = []
+        triggers = set()
+        for i, entry in enumerate(patterns):
+            earlier = {other["name"] for other in patterns[:i]}
+            if not set(entry.get("unless", ())) <= earlier:
+                raise ValueError(f"Pattern {entry['name']}: 'unless' must name earlier patterns")
+            slot = f"p{i}"
+            self._slots[slot] = entry["name"]
+            # Prefix local group names so entries cannot collide
+            body = _GROUP_RE.sub(lambda m: f"(?P<{slot}_{m.group(1)}>", entry["pattern"])
+            branches.append(f"(?P<{slot}>{body})")
+            triggers.update(entry["triggers"])
+
+        # A plain alternation of literals lets the regex engine skip ahead on
+        # their first characters, which a case-insensitive alternation of the
+        # full patterns cannot do
+        trigger_pattern = "|".join(re.escape(t) for t in sorted(triggers, key=len, reverse=True))
+        self.regex = re.compile("|".join(branches))
+        self.trigger_regex = re.compile(trigger_pattern)
+        # For text whose lowercase form changes length (spans would not line up)
+        self._regex_ci = re.compile(self.regex.pattern, re.IGNORECASE)
+        self._trigger_regex_ci = re.compile(trigger_pattern, re.IGNORECASE)
+
+    def scan(self, text: str) -> Dict[str, Any]:
+        """
+        Extract rules from text in one sweep.
+
+        Args:
+            text: Policy text
+
+        Returns:
+            Dict with 'rules' (list of PolicyRule, at most one set per pattern,
+            first match wins) and 'spans' (list of (start, end, pattern name)
+            for every match, including ones suppressed by 'unless')
+        """
+        first: Dict[str, Tuple[re.Match, str]] = {}
+        spans: List[Tuple[int, int, str]] = []
+
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            subject, regex, triggers = lowered, self.regex, self.trigger_regex
+        else:
+            subject, regex, triggers = text, self._regex_ci, self._trigger_regex_ci
+
+        hit = triggers.search(subject)
+        while hit:
+            match = regex.match(subject, hit.start())
+            if match is None:
+                hit = triggers.search(subject, hit.start() + 1)
+                continue
+            slot = match.lastgroup
+            name = self._slots[slot]
+            spans.append((match.start(), match.end(), name))
+            first.setdefault(name, (match, slot))
+            hit = triggers.search(subject, max(match.end(), hit.start() + 1))
+
+        rules: List[PolicyRule] = []
+        # Table order: every 'unless' target is settled before the entries it suppresses
+        produced = set()
+        for name, entry in self.patterns.items():
+            if name not in first or any(other in produced for other in entry.get("unless", ())):
+                continue
+            produced.add(name)
+            match, slot = first[name]
+            for key, operator, group, convert in entry["rules"]:
+                raw = match.group(f"{slot}_{group}") if group else None
+                rules.append(PolicyRule(key=key, operator=operator, value=convert(raw)))
+
+        return {"rules": rules, "spans": spans}
+
+
+def regex_coverage(text: str, spans: Sequence[Tuple[int, int, str]], max_samples: int = 5) -> Dict[str, Any]:
+    """
+    Score how much of a text's eligibility language the scanner explained.
+
+    Every sentence containing an eligibility cue phrase counts once; it is
+    explained when a scanner match overlaps it.
+
+    Args:
+        text: Policy text that was scanned
+        spans: Match spans returned by RuleScanner.scan()
+        max_samples: Unexplained sentences to include for inspection
+
+    Returns:
+        Dict with 'score' (0-1; 1.0 when the text has no cue sentences),
+        'cue_sentences', 'explained' and 'unexplained' (sample sentences)
+    """
+    starts = sorted(span[:2] for span in spans)
+    cue_sentences = explained = 0
+    unexplained: List[str] = []
+
+    index = 0
+    for sentence in _SENTENCE_RE.finditer(text):
+        start, end = sentence.span()
+        # Spans are sorted and sentences advance, so skip spans that ended before this one
+        while index < len(starts) and starts[index][1] <= start:
+            index += 1
+        if not ELIGIBILITY_CUE_RE.search(sentence.group()):
+            continue
+        cue_sentences += 1
+        if index < len(starts) and starts[index][0] < end:
+            explained += 1
+        elif len(unexplained) < max_samples:
+            unexplained.append(sentence.group().strip()[:160])
+
+    return {
+        "score": round(explained / cue_sentences, 4) if cue_sentences else 1.0,
+        "cue_sentences": cue_sentences,
+        "explained": explained,
+        "unexplained": unexplained,
+    }
+
+
+# Global instance
+rule_scanner = RuleScanner()
@@ -0,0 +1,80 @@
+"""
+Rule Merger - Combines rule sets extracted from different parts of a policy
+Deduplicates identical rules and reconciles conflicting bounds on the same
+attribute: the tightest upper and lower limits win, and the first equality
+requirement (in document order) is kept.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.schemas import OperatorEnum, PolicyRule
+
+
+_UPPER = (OperatorEnum.LESS_THAN, OperatorEnum.LESS_THAN_OR_EQUAL)
+_LOWER = (OperatorEnum.GREATER_THAN, OperatorEnum.GREATER_THAN_OR_EQUAL)
+
+
+def _number(value: Any) -> Optional[float]:
+    """Numeric form of a rule value, or None (booleans are not bounds)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.replace(",", "").strip())
+        except ValueError:
+            return None
+    return None
+
+
+def same_value(a: Any, b: Any) -> bool:
+    """Whether two rule values are equal, numbers compared as numbers (250000 == 250000.0 == '2,50,000')."""
+    number_a, number_b = _number(a), _number(b)
+    if number_a is not None and number_b is not None:
+        return number_a == number_b
+    return str(a).strip().lower() == str(b).strip().lower()
+
+
+def _tighter(candidate: PolicyRule, current: PolicyRule, upper: bool) -> bool:
+    """Whether candidate is a stricter bound than current."""
+    new, old = _number(candidate.value), _number(current.value)
+    if new != old:
+        return new < old if upper else new > old
+    # Same limit: the strict operator excludes the boundary value
+    strict = OperatorEnum.LESS_THAN if upper else OperatorEnum.GREATER_THAN
+    return candidate.operator == strict and current.operator != strict
+
+
+def merge_rules(rule_sets: Iterable[List[PolicyRule]]) -> List[PolicyRule]:
+    """
+    Merge rule lists into one deduplicated list.
+
+    Args:
+        rule_sets: Rule lists in document order (e.g. one per section)
+
+    Returns:
+        Merged rules, ordered by first appearance
+    """
+    slots: Dict[Tuple, PolicyRule] = {}
+
+    for rules in rule_sets:
+        for rule in rules:
+            key = rule.key.strip().lower()
+            operator = OperatorEnum(rule.operator)
+
+            if operator in _UPPER and _number(rule.value) is not None:
+                slot = (key, "upper")
+            elif operator in _LOWER and _number(rule.value) is not None:
+                slot = (key, "lower")
+            elif operator == OperatorEnum.EQUAL:
+                slot = (key, "equal")
+            else:
+                slot = (key, operator.value, str(rule.value).lower())
+
+            current = slots.get(slot)
+            if current is None:
+                slots[slot] = rule
+            elif slot[1] in ("upper", "lower") and _tighter(rule, current, slot[1] == "upper"):
+                slots[slot] = rule
+
+    return list(slots.values())
@@ -0,0 +1,193 @@
+"""
+Rule Stream Parser - Incremental parser for schema-constrained rule output
+Consumes the streamed JSON document {"rules": [{"key", "operator", "value"}, ...]}
+chunk by chunk, validates each rule against PolicyRule/OperatorEnum as soon
+as its object closes, and raises as soon as the structure goes wrong so the
+caller can abort the stream instead of paying for the rest of the output.
+"""
+from typing import Any, Dict, List
+import json
+import re
+
+from app.schemas import OperatorEnum
+
+
+# JSON schema matching PolicyRule, wrapped in an object (function-calling and
+# structured-output modes both require an object at the top level)
+POLICY_RULES_JSON_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "rules": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "key": {"type": "string", "description": "Attribute name, e.g. income, state, is_student, age"},
+                    "operator": {"type": "string", "enum": [op.value for op in OperatorEnum]},
+                    "value": {"type": ["string", "number", "boolean"]},
+                },
+                "required": ["key", "operator", "value"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["rules"],
+    "additionalProperties": False,
+}
+
+_PREFIX = '{"rules":['
+_VALID_OPERATORS = {op.value for op in OperatorEnum}
+
+
+class RuleStreamError(ValueError):
+    """Raised when streamed output stops matching the rule schema."""
+    pass
+
+
+class IncrementalRuleParser:
+    """Streaming parser for {"rules": [...]} that emits each rule as soon as it is complete."""
+
+    def __init__(self, max_rules: int = 50, max_rule_chars: int = 2000):
+        """
+        Initialize the parser.
+
+        Args:
+            max_rules: Abort if the model produces more rules than this
+            max_rule_chars: Abort if a single rule object grows beyond this many characters
+        """
+        self.max_rules = max_rules
+        self.max_rule_chars = max_rule_chars
+        self.rules: List[Dict[str, Any]] = []
+        self._phase = "prefix"  # prefix -> items -> tail -> done
+        self._prefix = ""
+        self._current: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def complete(self) -> bool:
+        """Whether the closing brace of the document has been seen."""
+        return self._phase == "done"
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume a chunk of streamed text.
+
+        Args:
+            chunk: Next piece of the JSON document
+
+        Returns:
+            Rules completed by this chunk
+
+        Raises:
+            RuleStreamError: As soon as the text can no longer be a valid rule document
+        """
+        completed = []
+        for char in chunk:
+            rule = self._consume(char)
+            if rule is not None:
+                completed.append(rule)
+        return completed
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Finish parsing.
+
+        Returns:
+            All rules parsed
+
+        Raises:
+            RuleStreamError: If the document was truncated
+        """
+        if self._phase != "done":
+            raise RuleStreamError(f"Rule stream ended early (in {self._phase})")
+        return self.rules
+
+    def _consume(self, char: str):
+        if self._phase == "prefix":
+            if not char.isspace():
+                self._prefix += char
+                if not _PREFIX.startswith(self._prefix):
+                    raise RuleStreamError(f"Expected {_PREFIX!r}, got {self._prefix!r}")
+                if self._prefix == _PREFIX:
+                    self._phase = "items"
+            return None
+
+        if self._phase == "items":
+            if self._depth == 0:
+                if char.isspace() or char == ",":
+                    return None
+                if char == "]":
+                    self._phase = "tail"
+                    return None
+                if char != "{":
+                    raise RuleStreamError(f"Expected a rule object, got {char!r}")
+            return self._consume_object_char(char)
+
+        if self._phase == "tail":
+            if char.isspace():
+                return None
+            if char == "}":
+                self._phase = "done"
+                return None
+            raise RuleStreamError(f"Unexpected {char!r} after rule array")
+
+        if not char.isspace():
+            raise RuleStreamError(f"Unexpected {char!r} after end of document")
+        return None
+
+    def _consume_object_char(self, char: str):
+        self._current.append(char)
+        if len(self._current) > self.max_rule_chars:
+            raise RuleStreamError("Rule object too large")
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+            return None
+
+        if char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                text = "".join(self._current)
+                self._current = []
+                return self._accept(text)
+        return None
+
+    def _accept(self, text: str) -> Dict[str, Any]:
+        try:
+            rule = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise RuleStreamError(f"Malformed rule object: {e}") from e
+
+        validate_rule(rule)
+        self.rules.append(rule)
+        if len(self.rules) > self.max_rules:
+            raise RuleStreamError("Too many rules")
+        return rule
+
+
+def validate_rule(rule: Any):
+    """
+    Check a decoded rule against the PolicyRule schema.
+
+    Raises:
+        RuleStreamError: If the rule does not match
+    """
+    if not isinstance(rule, dict) or set(rule) != {"key", "operator", "value"}:
+        raise RuleStreamError(f"Rule must have exactly key/operator/value: {rule!r}")
+    if not isinstance(rule["key"], str) or not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", rule["key"]):
+        raise RuleStreamError(f"Invalid rule key: {rule['key']!r}")
+    if rule["operator"] not in _VALID_OPERATORS:
+        raise RuleStreamError(f"Invalid operator: {rule['operator']!r}")
+    if isinstance(rule["value"], (dict, list)) or rule["value"] is None:
+        raise RuleStreamError(f"Invalid rule value: {rule['value']!r}")
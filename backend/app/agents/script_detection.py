@@ -0,0 +1,134 @@
+"""
+Script Detection - Writing-system detection and Tesseract language selection
+Maps scripts (as named by Tesseract OSD) to the language packs to OCR them
+with and to the language reported for the document. Text that is already
+available (PDF text layers, DOCX, OCR output) is classified by counting
+characters per Unicode block, which is far cheaper than langdetect.
+Standalone, so OCR worker processes can import it.
+"""
+from typing import Dict, Iterable, Optional
+import os
+
+
+# Unicode blocks of the scripts we handle (script names follow Tesseract OSD)
+SCRIPT_RANGES = {
+    "Devanagari": (0x0900, 0x097F),
+    "Bengali": (0x0980, 0x09FF),
+    "Gurmukhi": (0x0A00, 0x0A7F),
+    "Gujarati": (0x0A80, 0x0AFF),
+    "Oriya": (0x0B00, 0x0B7F),
+    "Tamil": (0x0B80, 0x0BFF),
+    "Telugu": (0x0C00, 0x0C7F),
+    "Kannada": (0x0C80, 0x0CFF),
+    "Malayalam": (0x0D00, 0x0D7F),
+}
+
+# Language code reported for text in each script. Only scripts that identify
+# the language are listed: Latin text (English, French, romanized Hindi, ...)
+# is left to langdetect
+SCRIPT_LANGUAGES = {
+    "Devanagari": "hi",
+    "Bengali": "bn",
+    "Gurmukhi": "pa",
+    "Gujarati": "gu",
+    "Oriya": "or",
+    "Tamil": "ta",
+    "Telugu": "te",
+    "Kannada": "kn",
+    "Malayalam": "ml",
+}
+
+# Tesseract packs per script; Indian notices mix in English, hence '+eng'
+DEFAULT_SCRIPT_PACKS = {
+    "Latin": "eng",
+    "Devanagari": "hin+eng",
+    "Bengali": "ben+eng",
+    "Gurmukhi": "pan+eng",
+    "Gujarati": "guj+eng",
+    "Oriya": "ori+eng",
+    "Tamil": "tam+eng",
+    "Telugu": "tel+eng",
+    "Kannada": "kan+eng",
+    "Malayalam": "mal+eng",
+}
+
+# Pack(s) used when the script is unknown or none of its packs is installed
+OCR_DEFAULT_LANG = os.getenv("OCR_DEFAULT_LANG", "eng")
+
+# Marathi-only letter and very common Marathi words (vs Hindi, same script)
+_MARATHI_MARKERS = ("ळ", "आहे", "आणि", "च्या", "करण्यात")
+
+
+def _script_packs() -> Dict[str, str]:
+    """Default packs, overridden by OCR_SCRIPT_LANGS ('Devanagari=hin+mar+eng,Tamil=tam')."""
+    packs = dict(DEFAULT_SCRIPT_PACKS)
+    for item in os.getenv("OCR_SCRIPT_LANGS", "").split(","):
+        script, _, langs = item.partition("=")
+        if script.strip() and langs.strip():
+            packs[script.strip()] = langs.strip()
+    return packs
+
+
+SCRIPT_PACKS = _script_packs()
+
+
+def detect_script(text: str, min_letters: int = 10) -> Optional[str]:
+    """
+    Dominant script of a text by Unicode block.
+
+    Args:
+        text: Text to classify
+        min_letters: Letters needed before a script is reported
+
+    Returns:
+        Script name ('Latin', 'Devanagari', ...) or None
+    """
+    counts: Dict[str, int] = {}
+    for ch in text:
+        if not ch.isalpha():
+            continue
+        code = ord(ch)
+        if code < 0x0250:
+            script = "Latin"
+        else:
+            script = next((name for name, (low, high) in SCRIPT_RANGES.items() if low <= code <= high), None)
+            if script is None:
+                continue
+        counts[script] = counts.get(script, 0) + 1
+
+    if not counts:
+        return None
+    script, letters = max(counts.items(), key=lambda item: item[1])
+    return script if letters >= min_letters else None
+
+
+def script_language(script: Optional[str], text: str = "") -> Optional[str]:
+    """Language code for a script (Devanagari is told apart as Hindi or Marathi from the text)."""
+    if script == "Devanagari" and text:
+        markers = sum(text.count(marker) for marker in _MARATHI_MARKERS)
+        if markers and markers * 200 >= len(text):
+            return "mr"
+    return SCRIPT_LANGUAGES.get(script)
+
+
+def text_language(text: str) -> Optional[str]:
+    """Language code of a text from its script, or None (too few letters, or Latin script)."""
+    return script_language(detect_script(text), text)
+
+
+def tesseract_langs(script: Optional[str], installed: Optional[Iterable[str]] = None) -> str:
+    """
+    Tesseract language string for a script, limited to installed packs.
+
+    Args:
+        script: Script name from OSD or detect_script (None = unknown)
+        installed: Installed pack names (None = assume all are installed)
+
+    Returns:
+        e.g. 'hin+eng', or OCR_DEFAULT_LANG
+    """
+    packs = SCRIPT_PACKS.get(script or "", OCR_DEFAULT_LANG).split("+")
+    if installed is not None:
+        installed = set(installed)
+        packs = [pack for pack in packs if pack in installed]
+    return "+".join(packs) or OCR_DEFAULT_LANG
@@ -15,6 +15,7 @@ except ImportError:
     print("⚠️  Translation libraries not installed. Run: pip install deep-translator langdetect")
 
 from app.agents.base_agent import BaseAgent
+from app.infra.policy_dedup import get_policy_index, split_sentences
 
 
 class SupportedLanguage(str, Enum):
@@ -154,7 +155,8 @@ class TranslationAgent(BaseAgent):
     async def translate_policy(
         self,
         policy_data: Dict,
-        target_language: str
+        target_language: str,
+        source_language: Optional[str] = None
     ) -> Dict:
         """
         Translate a policy object to target language
@@ -162,18 +164,24 @@ class TranslationAgent(BaseAgent):
         Args:
             policy_data: Policy dictionary with text fields
             target_language: Target language code
+            source_language: Language of the policy document, used for the fields
+                taken from it (raw_text, description); defaults to its 'language'
+                field (set on upload), else detected per field. The name and
+                benefits are always detected per field
         
         Returns:
             Translated policy dictionary
         """
         try:
             translated_policy = policy_data.copy()
+            source_language = source_language or policy_data.get("language") or "auto"
             
-            # Translate policy name
+            # Translate policy name (usually the filename, so detected per field)
             if "name" in policy_data:
                 result = await self.translate_text(
                     policy_data["name"],
-                    target_language
+                    target_language,
+                    "auto"
                 )
                 translated_policy["name"] = result["translated_text"]
             
@@ -181,28 +189,32 @@ class TranslationAgent(BaseAgent):
             if "description" in policy_data:
                 result = await self.translate_text(
                     policy_data["description"],
-                    target_language
+                    target_language,
+                    source_language
                 )
                 translated_policy["description"] = result["translated_text"]
             
-            # Translate raw text
+            # Translate raw text (reusing sentences already translated for a near-duplicate)
             if "raw_text" in policy_data:
-                result = await self.translate_text(
+                translated_policy["raw_text"] = await self._translate_policy_text(
                     policy_data["raw_text"],
-                    target_language
+                    target_language,
+                    source_language
                 )
-                translated_policy["raw_text"] = result["translated_text"]
             
-            # Translate benefits
+            # Translate benefits (an English summary from the interpreter, so detected per field)
             if "benefits" in policy_data and isinstance(policy_data["benefits"], str):
                 result = await self.translate_text(
                     policy_data["benefits"],
-                    target_language
+                    target_language,
+                    "auto"
                 )
                 translated_policy["benefits"] = result["translated_text"]
             
             translated_policy["language"] = target_language
-            translated_policy["original_language"] = "en"
+            translated_policy["original_language"] = policy_data.get("original_language") or (
+                source_language if source_language != "auto" else "en"
+            )
             
             return {
                 "success": True,
@@ -216,6 +228,46 @@ class TranslationAgent(BaseAgent):
                 "error": str(e)
             }
     
+    async def _translate_policy_text(self, text: str, target_language: str, source_language: str = "auto") -> str:
+        """
+        Translate policy text sentence by sentence, reusing earlier work.
+        
+        Sentences that were already translated for this text or its closest
+        near-duplicate (with the same source and target language) are reused;
+        only the rest are sent, in one request.
+        
+        Args:
+            text: Policy text
+            target_language: Target language code
+            source_language: Source language code or 'auto' for detection
+        
+        Returns:
+            Translated text
+        """
+        index = get_policy_index()
+        sentences = split_sentences(text)
+        if index is None or not sentences:
+            return (await self.translate_text(text, target_language, source_language))["translated_text"]
+        
+        # A sentence translated from a wrong source must not be reused for another
+        translation_key = f"{source_language}>{target_language}"
+        memory: Dict[str, str] = {}
+        match = index.find(text, require=f"translations:{translation_key}")
+        if match is not None:
+            memory.update(match[0]["translations"][translation_key])
+        
+        missing = list(dict.fromkeys(sentence for sentence, _ in sentences if sentence not in memory))
+        if missing:
+            result = await self.translate_text("\n".join(missing), target_language, source_language)
+            translated = result["translated_text"].split("\n")
+            if not result["success"] or len(translated) != len(missing):
+                # Lines did not survive translation one-to-one; translate as a whole
+                return (await self.translate_text(text, target_language, source_language))["translated_text"]
+            memory.update(zip(missing, (line.strip() for line in translated)))
+        
+        index.add(text, translations={translation_key: {sentence: memory[sentence] for sentence, _ in sentences}})
+        return "".join(memory[sentence] + separator for sentence, separator in sentences)
+    
     async def get_supported_languages(self) -> List[Dict[str, str]]:
         """Get list of supported languages"""
         return [
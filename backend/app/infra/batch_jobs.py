@@ -0,0 +1,210 @@
+"""
+Batch Jobs - In-memory tracking for batch policy interpretation
+A job holds many items that are processed with bounded concurrency. Callers
+poll progress, stream results as items finish, and retry only the items
+that failed. Jobs live in process memory; the oldest finished jobs are
+dropped once the job limit is reached.
+"""
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from collections import OrderedDict
+from datetime import datetime
+import asyncio
+import os
+import uuid
+
+from app.schemas import BatchItemResult, BatchItemStatus, BatchJobStatus, InterpretPolicyRequest, Policy
+
+
+class BatchJob:
+    """State of one batch job."""
+
+    def __init__(self, items: List[InterpretPolicyRequest], concurrency: int):
+        self.job_id = uuid.uuid4().hex
+        self.items = items
+        self.results = [
+            BatchItemResult(index=i, policy_name=item.policy_name)
+            for i, item in enumerate(items)
+        ]
+        self.concurrency = concurrency
+        self.created_at = datetime.utcnow()
+        self.updated_at = self.created_at
+        self.tasks: List[asyncio.Task] = []
+        self.changed = asyncio.Condition()
+        self.version = 0
+
+    def counts(self) -> Dict[str, int]:
+        counts = {status.value: 0 for status in BatchItemStatus}
+        for result in self.results:
+            counts[result.status.value] += 1
+        return counts
+
+    @property
+    def finished(self) -> bool:
+        return all(
+            result.status in (BatchItemStatus.SUCCEEDED, BatchItemStatus.FAILED)
+            for result in self.results
+        )
+
+    def status(self, include_results: bool = False) -> BatchJobStatus:
+        counts = self.counts()
+        if not self.finished:
+            state = "running"
+        elif counts[BatchItemStatus.FAILED.value]:
+            state = "completed_with_errors"
+        else:
+            state = "completed"
+        return BatchJobStatus(
+            job_id=self.job_id,
+            status=state,
+            total=len(self.results),
+            pending=counts[BatchItemStatus.PENDING.value],
+            running=counts[BatchItemStatus.RUNNING.value],
+            succeeded=counts[BatchItemStatus.SUCCEEDED.value],
+            failed=counts[BatchItemStatus.FAILED.value],
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+            results=list(self.results) if include_results else None,
+        )
+
+    async def _touch(self):
+        async with self.changed:
+            self.updated_at = datetime.utcnow()
+            self.version += 1
+            self.changed.notify_all()
+
+
+class BatchJobManager:
+    """Creates, runs and tracks batch interpretation jobs."""
+
+    def __init__(
+        self,
+        worker: Callable[[InterpretPolicyRequest], Awaitable[Policy]],
+        max_concurrency: int = 4,
+        max_jobs: int = 100,
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            worker: Interprets one item; raises to mark the item failed
+            max_concurrency: Items processed at once across all jobs
+            max_jobs: Jobs kept in memory (oldest finished jobs are dropped first)
+        """
+        self.worker = worker
+        self.max_concurrency = max_concurrency
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def submit(self, items: List[InterpretPolicyRequest], concurrency: Optional[int] = None) -> BatchJob:
+        """
+        Create a job and start processing it.
+
+        Args:
+            items: Policies to interpret
+            concurrency: Items of this job processed at once (capped by max_concurrency)
+
+        Returns:
+            The new job
+        """
+        if self._slots is None:
+            # Created lazily so it binds to the running event loop
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        job = BatchJob(items, min(concurrency or self.max_concurrency, self.max_concurrency))
+        self._jobs[job.job_id] = job
+        self._prune()
+        self._schedule(job, range(len(items)))
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        """Look up a job."""
+        return self._jobs.get(job_id)
+
+    def retry_failed(self, job: BatchJob) -> List[int]:
+        """
+        Re-run the failed items of a job.
+
+        Returns:
+            Indexes of the items that were re-queued
+        """
+        indexes = [r.index for r in job.results if r.status == BatchItemStatus.FAILED]
+        for index in indexes:
+            job.results[index].status = BatchItemStatus.PENDING
+            job.results[index].error = None
+        if indexes:
+            self._schedule(job, indexes)
+        return indexes
+
+    def _schedule(self, job: BatchJob, indexes):
+        job_slots = asyncio.Semaphore(job.concurrency)
+        job.tasks = [t for t in job.tasks if not t.done()]
+        job.tasks.extend(
+            asyncio.create_task(self._run_item(job, index, job_slots)) for index in indexes
+        )
+
+    async def _run_item(self, job: BatchJob, index: int, job_slots: asyncio.Semaphore):
+        result = job.results[index]
+        async with job_slots, self._slots:
+            result.status = BatchItemStatus.RUNNING
+            result.attempts += 1
+            await job._touch()
+            try:
+                result.policy = await self.worker(job.items[index])
+                result.status = BatchItemStatus.SUCCEEDED
+            except Exception as e:
+                result.error = str(e)
+                result.status = BatchItemStatus.FAILED
+            await job._touch()
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond max_jobs."""
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id].finished:
+                del self._jobs[job_id]
+
+    async def stream(self, job: BatchJob) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield item results as they finish, then a final job status.
+
+        Results already finished when streaming starts are sent first.
+        Retried items are sent again when they finish.
+
+        Yields:
+            {'event': 'result', 'data': BatchItemResult} and finally
+            {'event': 'done', 'data': BatchJobStatus}
+        """
+        sent: Dict[int, int] = {}
+        while True:
+            async with job.changed:
+                version = job.version
+            for result in job.results:
+                done = result.status in (BatchItemStatus.SUCCEEDED, BatchItemStatus.FAILED)
+                if done and sent.get(result.index) != result.attempts:
+                    sent[result.index] = result.attempts
+                    yield {"event": "result", "data": result}
+            if job.finished:
+                yield {"event": "done", "data": job.status()}
+                return
+            async with job.changed:
+                await job.changed.wait_for(lambda: job.version != version)
+
+
+# Singleton instance
+_manager_instance: Optional[BatchJobManager] = None
+
+
+def get_batch_job_manager(worker: Callable[[InterpretPolicyRequest], Awaitable[Policy]]) -> BatchJobManager:
+    """Get or create the singleton job manager."""
+    global _manager_instance
+
+    if _manager_instance is None:
+        _manager_instance = BatchJobManager(
+            worker,
+            max_concurrency=int(os.getenv("BATCH_INTERPRET_CONCURRENCY", "4")),
+            max_jobs=int(os.getenv("BATCH_INTERPRET_MAX_JOBS", "100")),
+        )
+
+    return _manager_instance
@@ -0,0 +1,215 @@
+"""
+Disk Cache - Persistent key/value cache backed by SQLite
+Shared by every worker process on the host and survives restarts.
+Supports per-entry TTL, LRU eviction under a byte budget and hit/miss counters.
+"""
+from typing import Any, Dict, Optional
+from pathlib import Path
+import json
+import sqlite3
+import threading
+import time
+
+
+class DiskCache:
+    """SQLite-backed cache with TTL and size-bounded LRU eviction."""
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str = "default",
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: Optional[float] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file (created if missing)
+            namespace: Logical table name so several caches can share one file
+            max_bytes: Byte budget for stored values; least recently used entries are evicted beyond it
+            default_ttl: Default time-to-live in seconds (None = never expires)
+        """
+        if not namespace.isidentifier():
+            raise ValueError(f"Invalid cache namespace: {namespace}")
+
+        self.path = Path(path)
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS {self.namespace} (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.namespace}_last_access "
+                f"ON {self.namespace} (last_access)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_stats ("
+                "namespace TEXT NOT NULL, name TEXT NOT NULL, value INTEGER NOT NULL, "
+                "PRIMARY KEY (namespace, name))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection (sqlite connections are not thread-safe)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+            # WAL lets readers in other workers proceed while one worker writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _bump(self, conn: sqlite3.Connection, name: str, amount: int = 1):
+        conn.execute(
+            "INSERT INTO cache_stats (namespace, name, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(namespace, name) DO UPDATE SET value = value + excluded.value",
+            (self.namespace, name, amount),
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The stored (JSON-decoded) value, or None on miss/expiry
+        """
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                f"SELECT value, expires_at FROM {self.namespace} WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                self._bump(conn, "misses")
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                conn.execute(f"DELETE FROM {self.namespace} WHERE key = ?", (key,))
+                self._bump(conn, "misses")
+                self._bump(conn, "expired")
+                return None
+
+            conn.execute(
+                f"UPDATE {self.namespace} SET last_access = ? WHERE key = ?",
+                (now, key),
+            )
+            self._bump(conn, "hits")
+            return json.loads(value)
+        except sqlite3.Error as e:
+            print(f"⚠ Cache read failed ({self.namespace}): {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Store a JSON-serializable value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Time-to-live in seconds (defaults to the cache's default_ttl)
+        """
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl else None
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+
+        if size > self.max_bytes:
+            return
+
+        try:
+            conn = self._connect()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.namespace} "
+                "(key, value, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, size, now, expires_at, now),
+            )
+            self._evict(conn, now)
+        except sqlite3.Error as e:
+            print(f"⚠ Cache write failed ({self.namespace}): {e}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired entries, then least recently used ones until under budget."""
+        conn.execute(
+            f"DELETE FROM {self.namespace} WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (now,),
+        )
+        total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.namespace}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for key, size in conn.execute(
+            f"SELECT key, size FROM {self.namespace} ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute(f"DELETE FROM {self.namespace} WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+
+        if evicted:
+            self._bump(conn, "evictions", evicted)
+
+    def delete(self, key: str):
+        """Remove a single entry."""
+        try:
+            self._connect().execute(f"DELETE FROM {self.namespace} WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"⚠ Cache delete failed ({self.namespace}): {e}")
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        conn = self._connect()
+        conn.execute(f"DELETE FROM {self.namespace}")
+        conn.execute("DELETE FROM cache_stats WHERE namespace = ?", (self.namespace,))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get entry count, stored bytes and hit/miss counters."""
+        try:
+            conn = self._connect()
+            entries, total = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.namespace}"
+            ).fetchone()
+            counters = dict(
+                conn.execute(
+                    "SELECT name, value FROM cache_stats WHERE namespace = ?",
+                    (self.namespace,),
+                ).fetchall()
+            )
+        except sqlite3.Error as e:
+            return {"error": str(e)}
+
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "expired": counters.get("expired", 0),
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
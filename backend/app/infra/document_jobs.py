@@ -0,0 +1,354 @@
+"""
+Document Jobs - Persistent queue for background document processing
+Large scans can take longer to OCR than a reverse proxy waits for a
+response. Uploads submitted in async mode are stored next to a job row in
+SQLite and processed by a fixed number of workers, highest priority first.
+Progress is recorded page by page, one appended row per page. Database
+calls run in threads, off the event loop. Jobs that were queued or running
+when the server stopped are picked up again on the next start (one server
+process per database file is assumed).
+"""
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.infra.uploads import SpooledUpload
+from app.schemas import DocumentJobState, DocumentJobStatus
+
+
+# on_page(page, total_pages) - page is a dict with 'page', 'method', 'characters' (and 'text')
+PageCallback = Callable[[Dict[str, Any], int], Awaitable[None]]
+# worker(job, on_page) -> result body; raises to fail the job
+JobWorker = Callable[[Dict[str, Any], PageCallback], Awaitable[Dict[str, Any]]]
+
+
+class DocumentJobQueue:
+    """SQLite-backed priority queue of document jobs with a local worker pool."""
+
+    def __init__(
+        self,
+        path: str,
+        files_dir: str,
+        worker: JobWorker,
+        concurrency: int = 2,
+        retention_seconds: float = 7 * 24 * 3600,
+        poll_seconds: float = 5.0,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            path: SQLite database file (created if missing)
+            files_dir: Directory holding the uploaded files of pending jobs
+            worker: Processes one job
+            concurrency: Jobs processed at once
+            retention_seconds: Finished jobs are deleted after this long
+            poll_seconds: Idle workers re-check the database this often
+        """
+        self.path = Path(path)
+        self.files_dir = Path(files_dir)
+        self.worker = worker
+        self.concurrency = max(1, concurrency)
+        self.retention_seconds = retention_seconds
+        self.poll_seconds = poll_seconds
+        self._local = threading.local()
+        self._workers = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._changed: Optional[asyncio.Condition] = None
+        self._version = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS document_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    filename TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    options TEXT NOT NULL,
+                    pages_total INTEGER,
+                    pages_done INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS document_jobs_queue "
+                "ON document_jobs (status, priority DESC, created_at)"
+            )
+            # Append-only per-page progress (rowid keeps completion order)
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS document_job_pages (
+                    job_id TEXT NOT NULL,
+                    page TEXT NOT NULL
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS document_job_pages_job ON document_job_pages (job_id)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection (sqlite connections are not thread-safe)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def start(self):
+        """Recover interrupted jobs and start the workers (idempotent)."""
+        if self._workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._changed = asyncio.Condition()
+
+        conn = self._connect()
+        conn.execute(
+            "DELETE FROM document_job_pages WHERE job_id IN (SELECT id FROM document_jobs WHERE status = ?)",
+            (DocumentJobState.RUNNING.value,),
+        )
+        recovered = conn.execute(
+            "UPDATE document_jobs SET status = ?, pages_done = 0, updated_at = ? WHERE status = ?",
+            (DocumentJobState.QUEUED.value, time.time(), DocumentJobState.RUNNING.value),
+        ).rowcount
+        if recovered:
+            print(f"✓ Re-queued {recovered} interrupted document job(s)")
+
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    def submit(
+        self,
+        upload: SpooledUpload,
+        options: Optional[Dict[str, Any]] = None,
+        priority: int = 0,
+    ) -> DocumentJobStatus:
+        """
+        Queue an uploaded file for processing.
+
+        The file is moved into files_dir, so it outlives the request.
+        Blocking; async callers run it in a thread.
+
+        Args:
+            upload: The spooled upload
+            options: JSON-serializable processing options passed to the worker
+            priority: Higher runs first; equal priorities run in arrival order
+
+        Returns:
+            Status of the new job
+        """
+        job_id = uuid.uuid4().hex
+        file_path = self.files_dir / f"{job_id}{Path(upload.filename).suffix.lower()}"
+        upload.move_to(str(file_path))
+
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO document_jobs (id, status, priority, filename, file_path, options, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, DocumentJobState.QUEUED.value, priority, upload.filename, str(file_path),
+             json.dumps(options or {}), now, now),
+        )
+        self._prune()
+        if self._wakeup is not None:
+            # Called from a thread; the event belongs to the loop
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return self.get(job_id)
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[DocumentJobStatus]:
+        """Look up a job's status (None if unknown). Blocking; async callers run it in a thread."""
+        conn = self._connect()
+        row = conn.execute("SELECT * FROM document_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        pages = conn.execute(
+            "SELECT page FROM document_job_pages WHERE job_id = ? ORDER BY rowid", (job_id,)
+        ).fetchall()
+        timestamp = lambda value: datetime.utcfromtimestamp(value) if value else None
+        return DocumentJobStatus(
+            job_id=row["id"],
+            status=row["status"],
+            filename=row["filename"],
+            priority=row["priority"],
+            pages_total=row["pages_total"],
+            pages_done=row["pages_done"],
+            pages=[json.loads(page["page"]) for page in pages],
+            error=row["error"],
+            result=json.loads(row["result"]) if include_result and row["result"] else None,
+            created_at=timestamp(row["created_at"]),
+            updated_at=timestamp(row["updated_at"]),
+            started_at=timestamp(row["started_at"]),
+            finished_at=timestamp(row["finished_at"]),
+        )
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Mark the next queued job as running and return it."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM document_jobs WHERE status = ? ORDER BY priority DESC, created_at LIMIT 1",
+                (DocumentJobState.QUEUED.value,),
+            ).fetchone()
+            if row is not None:
+                now = time.time()
+                conn.execute(
+                    "UPDATE document_jobs SET status = ?, started_at = ?, updated_at = ? WHERE id = ?",
+                    (DocumentJobState.RUNNING.value, now, now, row["id"]),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "filename": row["filename"],
+            "file_path": row["file_path"],
+            "options": json.loads(row["options"]),
+        }
+
+    async def _work(self):
+        while True:
+            try:
+                job = await asyncio.to_thread(self._claim)
+            except sqlite3.Error as e:
+                print(f"⚠ Document job queue unavailable: {e}")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._notify()
+            try:
+                result = await self.worker(job, lambda page, total: self._page_done(job["job_id"], page, total))
+                await asyncio.to_thread(self._finish, job, DocumentJobState.SUCCEEDED, result)
+            except Exception as e:
+                await asyncio.to_thread(self._finish, job, DocumentJobState.FAILED, None, str(e))
+            await self._notify()
+
+    async def _page_done(self, job_id: str, page: Dict[str, Any], total_pages: int):
+        """Record one finished page (the page text itself is not stored)."""
+        entry = {key: value for key, value in page.items() if key != "text"}
+        await asyncio.to_thread(self._record_page, job_id, entry, total_pages)
+        await self._notify()
+
+    def _record_page(self, job_id: str, entry: Dict[str, Any], total_pages: int):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO document_job_pages (job_id, page) VALUES (?, ?)", (job_id, json.dumps(entry))
+            )
+            conn.execute(
+                "UPDATE document_jobs SET pages_total = ?, pages_done = pages_done + 1, updated_at = ? WHERE id = ?",
+                (total_pages, time.time(), job_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _finish(self, job: Dict[str, Any], state: DocumentJobState, result=None, error=None):
+        now = time.time()
+        self._connect().execute(
+            "UPDATE document_jobs SET status = ?, result = ?, error = ?, finished_at = ?, updated_at = ? WHERE id = ?",
+            (state.value, json.dumps(result) if result is not None else None, error, now, now, job["job_id"]),
+        )
+        try:
+            os.unlink(job["file_path"])
+        except OSError:
+            pass
+
+    async def _notify(self):
+        async with self._changed:
+            self._version += 1
+            self._changed.notify_all()
+
+    def _prune(self):
+        """Delete finished jobs older than the retention period."""
+        conn = self._connect()
+        expired = (DocumentJobState.SUCCEEDED.value, DocumentJobState.FAILED.value, time.time() - self.retention_seconds)
+        conn.execute(
+            "DELETE FROM document_job_pages WHERE job_id IN "
+            "(SELECT id FROM document_jobs WHERE status IN (?, ?) AND finished_at < ?)",
+            expired,
+        )
+        conn.execute("DELETE FROM document_jobs WHERE status IN (?, ?) AND finished_at < ?", expired)
+
+    async def stream(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield a job's progress whenever it changes, then its final status.
+
+        Yields:
+            {'event': 'progress', 'data': DocumentJobStatus} (without result) and finally
+            {'event': 'done', 'data': DocumentJobStatus}
+        """
+        last_update = None
+        while True:
+            version = self._version
+            status = await asyncio.to_thread(self.get, job_id, False)
+            if status is None:
+                return
+            if status.status in (DocumentJobState.SUCCEEDED, DocumentJobState.FAILED):
+                yield {"event": "done", "data": await asyncio.to_thread(self.get, job_id)}
+                return
+            if status.updated_at != last_update:
+                last_update = status.updated_at
+                yield {"event": "progress", "data": status}
+            try:
+                async with self._changed:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(lambda: self._version != version),
+                        timeout=self.poll_seconds,
+                    )
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Get job counts by state."""
+        rows = self._connect().execute("SELECT status, COUNT(*) FROM document_jobs GROUP BY status").fetchall()
+        counts = {state.value: 0 for state in DocumentJobState}
+        counts.update({status: count for status, count in rows})
+        return {"concurrency": self.concurrency, "jobs": counts}
+
+
+# Singleton instance
+_queue_instance: Optional[DocumentJobQueue] = None
+
+
+def get_document_job_queue(worker: JobWorker) -> DocumentJobQueue:
+    """Get or create the singleton document job queue."""
+    global _queue_instance
+
+    if _queue_instance is None:
+        _queue_instance = DocumentJobQueue(
+            path=os.getenv("DOCUMENT_JOBS_PATH", ".cache/document_jobs.sqlite3"),
+            files_dir=os.getenv("DOCUMENT_JOBS_FILES_DIR", ".cache/document_jobs"),
+            worker=worker,
+            concurrency=int(os.getenv("DOCUMENT_JOBS_CONCURRENCY", "2")),
+            retention_seconds=float(os.getenv("DOCUMENT_JOBS_RETENTION_SECONDS", str(7 * 24 * 3600))),
+        )
+
+    return _queue_instance
@@ -0,0 +1,88 @@
+"""
+Extraction Cache - Content-addressed cache of document extraction results
+The same scheme PDFs are uploaded again and again. Keys are the hash of the
+uploaded bytes plus the extraction method, page range and the extractor
+settings that shape the text (OCR resolution, languages, ...). A repeat
+upload gets its text, statistics and language without re-running native
+extraction or OCR.
+"""
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+
+from app.infra.disk_cache import DiskCache
+
+
+def make_extraction_key(
+    content_hash: str,
+    extract_method: str,
+    first_page: Optional[int],
+    last_page: Optional[int],
+    settings: Dict[str, Any],
+) -> str:
+    """
+    Build the content address of an extraction.
+
+    Args:
+        content_hash: SHA-256 of the uploaded bytes
+        extract_method: 'auto', 'ocr' or 'native'
+        first_page: Requested first page (None = first)
+        last_page: Requested last page (None = last)
+        settings: Extractor settings that affect the output
+
+    Returns:
+        Hex digest key
+    """
+    material = json.dumps(
+        [content_hash, extract_method, first_page, last_page, settings],
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """Persistent, size-bounded cache of extraction results."""
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file
+            max_bytes: Byte budget; least recently used entries are evicted beyond it
+        """
+        self.store = DiskCache(path, namespace="extractions", max_bytes=max_bytes)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached extraction result or None."""
+        entry = self.store.get(key)
+        return entry if isinstance(entry, dict) else None
+
+    def set(self, key: str, entry: Dict[str, Any]):
+        """Store an extraction result."""
+        self.store.set(key, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return self.store.stats()
+
+
+# Singleton instance
+_cache_instance: Optional[ExtractionCache] = None
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Get or create the singleton extraction cache (None when disabled)."""
+    global _cache_instance
+
+    if os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+
+    if _cache_instance is None:
+        _cache_instance = ExtractionCache(
+            path=os.getenv("EXTRACTION_CACHE_PATH", ".cache/extraction_cache.sqlite3"),
+            max_bytes=int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+        )
+
+    return _cache_instance
@@ -0,0 +1,105 @@
+"""
+Interpretation Cache - Content-addressed cache of policy interpretation results
+Keys are a hash of the normalized policy text, the interpreter version and
+the extraction mode, so the same text arriving through any endpoint is
+interpreted once. Hot entries are served from an in-process LRU; the SQLite
+store makes results survive restarts and shares them between workers.
+"""
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+import hashlib
+import os
+import threading
+
+from app.infra.disk_cache import DiskCache
+from app.infra.llm_cache import normalize_prompt
+
+
+def make_interpretation_key(raw_text: str, version: str, mode: str) -> str:
+    """
+    Build the content address of an interpretation.
+
+    Args:
+        raw_text: Policy text
+        version: Interpreter version (bumping it invalidates old entries)
+        mode: Extraction mode, e.g. 'regex' or 'llm:function'
+
+    Returns:
+        Hex digest key
+    """
+    material = f"{version}\x00{mode}\x00{normalize_prompt(raw_text)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class InterpretationCache:
+    """Two-level (memory + disk) cache of interpretation results."""
+
+    def __init__(self, path: str, max_bytes: int, memory_entries: int = 512):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file
+            max_bytes: Byte budget of the disk store
+            memory_entries: Entries kept in the in-process LRU
+        """
+        self.store = DiskCache(path, namespace="interpretations", max_bytes=max_bytes)
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached interpretation (a dict of plain JSON values) or None."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        entry = self.store.get(key)
+        if isinstance(entry, dict):
+            self._remember(key, entry)
+            return entry
+        return None
+
+    def set(self, key: str, entry: Dict[str, Any]):
+        """Store an interpretation."""
+        self._remember(key, entry)
+        self.store.set(key, entry)
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get memory and disk cache statistics."""
+        stats = self.store.stats()
+        stats["memory_entries"] = len(self._memory)
+        stats["memory_hits"] = self.memory_hits
+        return stats
+
+
+# Singleton instance
+_cache_instance: Optional[InterpretationCache] = None
+
+
+def get_interpretation_cache() -> Optional[InterpretationCache]:
+    """Get or create the singleton interpretation cache (None when disabled)."""
+    global _cache_instance
+
+    if os.getenv("INTERPRETATION_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+
+    if _cache_instance is None:
+        _cache_instance = InterpretationCache(
+            path=os.getenv("INTERPRETATION_CACHE_PATH", ".cache/interpretation_cache.sqlite3"),
+            max_bytes=int(os.getenv("INTERPRETATION_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+            memory_entries=int(os.getenv("INTERPRETATION_CACHE_MEMORY_ENTRIES", "512")),
+        )
+
+    return _cache_instance
@@ -0,0 +1,166 @@
+"""
+LLM Response Cache - Persistent cache for LLM completions
+Keys are derived from model, temperature and a normalized prompt so that
+near-identical requests (extra whitespace, different casing) share one entry.
+"""
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+import re
+
+from app.infra.disk_cache import DiskCache
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapse whitespace and casefold text for cache keying."""
+    return _WHITESPACE_RE.sub(" ", text).strip().casefold()
+
+
+def prompt_to_text(prompt: Any) -> str:
+    """Flatten a string, message list or (role, content) tuples into plain text."""
+    if isinstance(prompt, str):
+        return prompt
+    if isinstance(prompt, (list, tuple)):
+        parts = []
+        for message in prompt:
+            if isinstance(message, tuple) and len(message) == 2:
+                parts.append(f"{message[0]}: {message[1]}")
+            else:
+                role = getattr(message, "type", "")
+                parts.append(f"{role}: {getattr(message, 'content', message)}")
+        return "\n".join(parts)
+    return str(prompt)
+
+
+def describe_llm(llm: Any) -> Dict[str, Any]:
+    """Get the model name and temperature an LLM instance was configured with."""
+    model = (
+        getattr(llm, "model_name", None)
+        or getattr(llm, "model", None)
+        or type(llm).__name__
+    )
+    return {"model": str(model), "temperature": getattr(llm, "temperature", None)}
+
+
+def make_cache_key(
+    model: str,
+    temperature: Optional[float],
+    prompt: Any = None,
+    template: Optional[str] = None,
+    variables: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Build a cache key for an LLM request.
+
+    When a template is given, the key is built from the normalized template
+    and each normalized variable separately, so the key does not depend on how
+    the variables were spliced into the prompt.
+
+    Args:
+        model: Model name
+        temperature: Sampling temperature
+        prompt: The prompt that will be sent (used when no template is given)
+        template: Prompt template text
+        variables: Values substituted into the template
+
+    Returns:
+        Hex digest cache key
+    """
+    if template is not None:
+        material = {
+            "template": normalize_prompt(template),
+            "variables": {
+                name: normalize_prompt(value) if isinstance(value, str) else value
+                for name, value in sorted((variables or {}).items())
+            },
+        }
+    else:
+        material = {"prompt": normalize_prompt(prompt_to_text(prompt))}
+
+    material["model"] = model
+    material["temperature"] = temperature
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Persistent cache of LLM response text."""
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.store = DiskCache(path, namespace="llm_responses", max_bytes=max_bytes, default_ttl=ttl_seconds)
+
+    def get(self, key: str) -> Optional[str]:
+        """Get cached response text for a key."""
+        entry = self.store.get(key)
+        return entry.get("content") if isinstance(entry, dict) else None
+
+    def set(self, key: str, content: str, model: str):
+        """Store response text for a key."""
+        self.store.set(key, {"content": content, "model": model})
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return self.store.stats()
+
+
+def cached_llm_invoke(
+    llm: Any,
+    prompt: Any,
+    template: Optional[str] = None,
+    variables: Optional[Dict[str, Any]] = None,
+    **kwargs,
+) -> str:
+    """
+    Invoke an LLM through the response cache.
+
+    Args:
+        llm: LLM instance exposing invoke()
+        prompt: Prompt string or message list to send
+        template: Optional prompt template used to build the key
+        variables: Optional template variables used to build the key
+        **kwargs: Extra arguments forwarded to llm.invoke()
+
+    Returns:
+        Response text
+    """
+    cache = get_llm_cache()
+    key = None
+    if cache is not None:
+        info = describe_llm(llm)
+        key = make_cache_key(info["model"], info["temperature"], prompt, template, variables)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    response = llm.invoke(prompt, **kwargs)
+    content = response.content if hasattr(response, "content") else str(response)
+
+    if cache is not None and content:
+        cache.set(key, content, info["model"])
+
+    return content
+
+
+# Singleton instance
+_cache_instance: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Get or create the singleton LLM response cache (None when disabled)."""
+    global _cache_instance
+
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+
+    if _cache_instance is None:
+        _cache_instance = LLMResponseCache(
+            path=os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3"),
+            max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+        )
+
+    return _cache_instance
@@ -0,0 +1,360 @@
+"""
+LLM Resilience - Hedged requests and a circuit breaker for LLM calls
+When upstream latency degrades, a duplicate request is sent after a
+p95-derived delay and the first answer wins. When errors or slow calls
+pile up, the breaker opens and callers fail fast so they can use their
+regex/keyword fallbacks until upstream recovers.
+"""
+from typing import Any, Dict, Iterator, List, Optional
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import asyncio
+import os
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while the circuit breaker is open."""
+    pass
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker that trips on error rate or slow-call rate."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        window_size: int = 20,
+        min_calls: int = 5,
+        error_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 15.0,
+        slow_rate_threshold: float = 0.5,
+        cooldown_seconds: float = 30.0,
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            window_size: Number of recent calls considered
+            min_calls: Calls required in the window before the breaker may trip
+            error_rate_threshold: Fraction of failed calls that opens the breaker
+            slow_call_seconds: Latency above which a successful call counts as slow
+            slow_rate_threshold: Fraction of slow calls that opens the breaker
+            cooldown_seconds: Time the breaker stays open before allowing a probe call
+        """
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.cooldown_seconds = cooldown_seconds
+
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._calls = deque(maxlen=window_size)  # (succeeded, latency)
+        self._latencies = deque(maxlen=200)  # successful call latencies, for hedging
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        """Build a breaker from LLM_BREAKER_* environment variables."""
+        return cls(
+            window_size=int(os.getenv("LLM_BREAKER_WINDOW", "20")),
+            min_calls=int(os.getenv("LLM_BREAKER_MIN_CALLS", "5")),
+            error_rate_threshold=float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5")),
+            slow_call_seconds=float(os.getenv("LLM_BREAKER_SLOW_CALL_MS", "15000")) / 1000,
+            slow_rate_threshold=float(os.getenv("LLM_BREAKER_SLOW_RATE", "0.5")),
+            cooldown_seconds=float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30")),
+        )
+
+    def allow_request(self) -> bool:
+        """Check whether a call may go upstream (claims the probe slot when half-open)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency: float):
+        """Record a successful call and its latency."""
+        with self._lock:
+            self._latencies.append(latency)
+            if self.state == self.HALF_OPEN:
+                self._close()
+                return
+            self._calls.append((True, latency))
+            self._evaluate()
+
+    def record_failure(self, latency: float):
+        """Record a failed call."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._open()
+                return
+            self._calls.append((False, latency))
+            self._evaluate()
+
+    def record_hedge(self, won: bool = False):
+        """Count a hedge request sent, or one that answered first."""
+        with self._lock:
+            if won:
+                self.hedges_won += 1
+            else:
+                self.hedges_sent += 1
+
+    def _evaluate(self):
+        if self.state != self.CLOSED or len(self._calls) < self.min_calls:
+            return
+        total = len(self._calls)
+        failures = sum(1 for ok, _ in self._calls if not ok)
+        slow = sum(1 for ok, latency in self._calls if ok and latency >= self.slow_call_seconds)
+        if failures / total >= self.error_rate_threshold or slow / total >= self.slow_rate_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+        self._probe_in_flight = False
+        print(f"⚠ LLM circuit breaker OPEN - using fallbacks for {self.cooldown_seconds:.0f}s")
+
+    def _close(self):
+        self.state = self.CLOSED
+        self._calls.clear()
+        self._probe_in_flight = False
+        print("✓ LLM circuit breaker closed - upstream recovered")
+
+    def latency_samples(self) -> int:
+        """Number of successful-call latencies recorded."""
+        return len(self._latencies)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Get a percentile (0-100) of recent successful call latencies, in seconds."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get breaker state and window statistics."""
+        with self._lock:
+            total = len(self._calls)
+            failures = sum(1 for ok, _ in self._calls if not ok)
+            state = self.state
+            hedges_sent, hedges_won = self.hedges_sent, self.hedges_won
+        p95 = self.latency_percentile(95)
+        return {
+            "state": state,
+            "window_calls": total,
+            "window_error_rate": round(failures / total, 4) if total else 0.0,
+            "p95_latency_ms": round(p95 * 1000) if p95 is not None else None,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected,
+            "hedges_sent": hedges_sent,
+            "hedges_won": hedges_won,
+        }
+
+
+class ResilientLLM:
+    """
+    Wraps an LLM with hedged requests and a circuit breaker.
+
+    Exposes the same invoke()/ainvoke() interface as the wrapped LLM and
+    forwards every other attribute (model_name, temperature, ...) to it.
+    """
+
+    # Shared pool for sync hedged calls; a losing duplicate keeps its thread
+    # until it returns, so calls only go to the pool while a thread is free
+    # (one permit per thread) and are never queued behind stale duplicates
+    _POOL_SIZE = 16
+    _executor = ThreadPoolExecutor(max_workers=_POOL_SIZE, thread_name_prefix="llm-hedge")
+    _pool_slots = threading.BoundedSemaphore(_POOL_SIZE)
+
+    def __init__(
+        self,
+        inner: Any,
+        breaker: CircuitBreaker,
+        hedging: bool = True,
+        min_hedge_delay: float = 0.5,
+        max_hedge_delay: float = 10.0,
+        default_hedge_delay: float = 3.0,
+        min_samples: int = 10,
+    ):
+        """
+        Initialize the wrapper.
+
+        Args:
+            inner: The LLM to call
+            breaker: Circuit breaker shared by all LLMs talking to the same upstream
+            hedging: Whether to send a duplicate request when the first is slow
+            min_hedge_delay: Lower bound for the hedge delay (seconds)
+            max_hedge_delay: Upper bound for the hedge delay (seconds)
+            default_hedge_delay: Delay used until enough latency samples exist
+            min_samples: Latency samples needed before the p95 is trusted
+        """
+        self.inner = inner
+        self.breaker = breaker
+        self.hedging = hedging
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.default_hedge_delay = default_hedge_delay
+        self.min_samples = min_samples
+
+    @classmethod
+    def from_env(cls, inner: Any, breaker: CircuitBreaker) -> "ResilientLLM":
+        """Wrap an LLM using LLM_HEDGE_* environment variables."""
+        return cls(
+            inner,
+            breaker,
+            hedging=os.getenv("LLM_HEDGING_ENABLED", "true").lower() in ("1", "true", "yes"),
+            min_hedge_delay=float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "500")) / 1000,
+            max_hedge_delay=float(os.getenv("LLM_HEDGE_MAX_DELAY_MS", "10000")) / 1000,
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inner, name)
+
+    def hedge_delay(self) -> float:
+        """Delay before sending the duplicate request: recent p95, clamped."""
+        if self.breaker.latency_samples() < self.min_samples:
+            return self.default_hedge_delay
+        p95 = self.breaker.latency_percentile(95) or self.default_hedge_delay
+        return min(self.max_hedge_delay, max(self.min_hedge_delay, p95))
+
+    def _begin(self) -> bool:
+        """Check the breaker; returns whether this call may be hedged."""
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("LLM circuit breaker is open")
+        # Never duplicate the single probe call of a half-open breaker
+        return self.hedging and self.breaker.state == CircuitBreaker.CLOSED
+
+    def _submit(self, prompt: Any, kwargs: Dict[str, Any]) -> Optional[Future]:
+        """Start inner.invoke on the hedge pool, or None when every pool thread is busy."""
+        if not self._pool_slots.acquire(blocking=False):
+            return None
+        future = self._executor.submit(self.inner.invoke, prompt, **kwargs)
+        future.add_done_callback(lambda _: self._pool_slots.release())
+        return future
+
+    def invoke(self, prompt: Any, **kwargs) -> Any:
+        """
+        Call the LLM synchronously with hedging and breaker accounting.
+
+        Hedging is skipped (the call runs on the caller's thread, or without
+        a duplicate) while the shared hedge pool is fully busy.
+        """
+        hedge = self._begin()
+        started = time.monotonic()
+
+        first = self._submit(prompt, kwargs) if hedge else None
+        if first is None:
+            try:
+                result = self.inner.invoke(prompt, **kwargs)
+            except Exception:
+                self.breaker.record_failure(time.monotonic() - started)
+                raise
+            self.breaker.record_success(time.monotonic() - started)
+            return result
+
+        futures: List[Future] = [first]
+        done, pending = wait(futures, timeout=self.hedge_delay())
+        if not done:
+            second = self._submit(prompt, kwargs)
+            if second is not None:
+                self.breaker.record_hedge()
+                futures.append(second)
+
+        last_error: Optional[BaseException] = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if len(futures) > 1 and future is futures[1]:
+                        self.breaker.record_hedge(won=True)
+                    self.breaker.record_success(time.monotonic() - started)
+                    return future.result()
+                last_error = future.exception()
+
+        self.breaker.record_failure(time.monotonic() - started)
+        raise last_error
+
+    def stream(self, prompt: Any, **kwargs) -> Iterator[Any]:
+        """
+        Stream from the LLM with breaker accounting (streams are never hedged).
+        
+        Closing the generator early (e.g. after the caller rejects the output)
+        counts as an upstream success: the service answered.
+        """
+        self._begin()
+        started = time.monotonic()
+        try:
+            for chunk in self.inner.stream(prompt, **kwargs):
+                yield chunk
+        except GeneratorExit:
+            self.breaker.record_success(time.monotonic() - started)
+            raise
+        except Exception:
+            self.breaker.record_failure(time.monotonic() - started)
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+
+    async def ainvoke(self, prompt: Any, **kwargs) -> Any:
+        """Call the LLM asynchronously with hedging and breaker accounting."""
+        hedge = self._begin()
+        started = time.monotonic()
+
+        if not hedge:
+            try:
+                result = await self.inner.ainvoke(prompt, **kwargs)
+            except Exception:
+                self.breaker.record_failure(time.monotonic() - started)
+                raise
+            self.breaker.record_success(time.monotonic() - started)
+            return result
+
+        tasks = [asyncio.ensure_future(self.inner.ainvoke(prompt, **kwargs))]
+        done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay())
+        if not done:
+            self.breaker.record_hedge()
+            tasks.append(asyncio.ensure_future(self.inner.ainvoke(prompt, **kwargs)))
+
+        last_error: Optional[BaseException] = None
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if len(tasks) > 1 and task is tasks[1]:
+                            self.breaker.record_hedge(won=True)
+                        self.breaker.record_success(time.monotonic() - started)
+                        return task.result()
+                    last_error = task.exception()
+        finally:
+            # Cancel the losing request
+            for task in pending:
+                task.cancel()
+
+        self.breaker.record_failure(time.monotonic() - started)
+        raise last_error
@@ -0,0 +1,124 @@
+"""
+LLM Router - Task-aware model selection
+Picks a model and output token limit per task type and input size: short,
+structured tasks go to a fast, cheap model and only long or complex inputs
+go to the larger one. Every decision is counted so routing can be tuned.
+"""
+from typing import Any, Callable, Dict, Optional
+from collections import deque
+from enum import Enum
+import os
+import threading
+import time
+
+
+class LLMTask(str, Enum):
+    """Kinds of LLM work the backend performs."""
+    RULE_EXTRACTION = "rule_extraction"
+    SIMPLIFY = "simplify"
+    CHAT = "chat"
+    GUIDANCE = "guidance"
+    SCHEME_SUGGESTION = "scheme_suggestion"
+    ELIGIBILITY = "eligibility"
+
+
+# Per-task output budget and the input size (in tokens) above which the
+# larger model is used. Structured extraction degrades first on long inputs,
+# so its threshold is the lowest.
+TASK_ROUTES: Dict[LLMTask, Dict[str, int]] = {
+    LLMTask.RULE_EXTRACTION: {"max_tokens": 800, "large_over_tokens": 3000},
+    LLMTask.SIMPLIFY: {"max_tokens": 1200, "large_over_tokens": 4000},
+    LLMTask.CHAT: {"max_tokens": 500, "large_over_tokens": 8000},
+    LLMTask.GUIDANCE: {"max_tokens": 300, "large_over_tokens": 8000},
+    LLMTask.SCHEME_SUGGESTION: {"max_tokens": 900, "large_over_tokens": 8000},
+    LLMTask.ELIGIBILITY: {"max_tokens": 600, "large_over_tokens": 8000},
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+class LLMRouter:
+    """Routes LLM requests to a model tier by task type and input size."""
+
+    def __init__(
+        self,
+        factory: Callable[[str, int], Any],
+        fast_model: str,
+        large_model: str,
+        history_size: int = 100,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            factory: Builds an LLM for (model name, max output tokens)
+            fast_model: Model for short, structured tasks
+            large_model: Model for long or complex inputs
+            history_size: Number of recent decisions kept for inspection
+        """
+        self.factory = factory
+        self.models = {"fast": fast_model, "large": large_model}
+        self._instances: Dict[tuple, Any] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._recent = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    def select(self, task: LLMTask, text: str = "", max_tokens: Optional[int] = None) -> Optional[Any]:
+        """
+        Pick an LLM for a task.
+
+        Args:
+            task: Task type
+            text: The input that will be sent (used to estimate its size)
+            max_tokens: Output budget overriding the task's (e.g. for batched prompts)
+
+        Returns:
+            An LLM instance, or None if one could not be built
+        """
+        task = LLMTask(task)
+        route = TASK_ROUTES[task]
+        input_tokens = estimate_tokens(text)
+        tier = "large" if input_tokens > route["large_over_tokens"] else "fast"
+        model = self.models[tier]
+        max_tokens = max_tokens or route["max_tokens"]
+
+        key = (model, max_tokens)
+        with self._lock:
+            llm = self._instances.get(key)
+            if llm is None:
+                llm = self.factory(model, max_tokens)
+                if llm is not None:
+                    self._instances[key] = llm
+
+            task_counts = self._counts.setdefault(task.value, {})
+            task_counts[model] = task_counts.get(model, 0) + 1
+            self._recent.append({
+                "task": task.value,
+                "tier": tier,
+                "model": model,
+                "max_tokens": max_tokens,
+                "input_tokens": input_tokens,
+                "at": time.time(),
+            })
+
+        return llm
+
+    def stats(self) -> Dict[str, Any]:
+        """Get routing counters and the most recent decisions."""
+        with self._lock:
+            return {
+                "models": dict(self.models),
+                "decisions": {task: dict(models) for task, models in self._counts.items()},
+                "recent": list(self._recent)[-10:],
+            }
+
+
+def router_models_from_env() -> Dict[str, str]:
+    """Read the fast/large model names from LLM_FAST_MODEL / LLM_LARGE_MODEL."""
+    return {
+        "fast_model": os.getenv("LLM_FAST_MODEL", "gpt-3.5-turbo"),
+        "large_model": os.getenv("LLM_LARGE_MODEL", "gpt-4o-mini"),
+    }
@@ -0,0 +1,243 @@
+"""
+Local LLM - Deterministic stand-in for ChatOpenAI
+Used for load testing and offline benchmarking: returns schema-correct
+responses for every prompt the backend sends, with simulated latency and errors.
+Select it with LLM_BACKEND=local.
+"""
+from typing import Any, Iterator, List, Optional
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from app.infra.llm_cache import prompt_to_text
+
+
+class LocalLLMError(Exception):
+    """Simulated upstream failure raised by LocalLLM."""
+    pass
+
+
+class LocalLLMMessage:
+    """Minimal stand-in for a LangChain AIMessage / AIMessageChunk."""
+
+    def __init__(self, content: str, tool_call_chunks: Optional[List[dict]] = None):
+        self.content = content
+        self.tool_call_chunks = tool_call_chunks or []
+
+    def __repr__(self):
+        return f"LocalLLMMessage(content={self.content!r})"
+
+
+class LocalLLM:
+    """Deterministic local LLM with configurable latency and error distributions."""
+
+    def __init__(
+        self,
+        model_name: str = "local-stub",
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout_ms: float = 30000.0,
+        seed: int = 0,
+    ):
+        """
+        Initialize the local LLM.
+
+        Args:
+            model_name: Name reported to callers (and used in cache keys)
+            latency_ms: Mean simulated latency per call
+            latency_jitter_ms: Standard deviation of the simulated latency
+            error_rate: Probability (0-1) of raising a simulated 429/5xx error
+            timeout_rate: Probability (0-1) of a call hanging for timeout_ms and then failing
+            timeout_ms: How long a simulated timeout takes
+            seed: Seed for the latency/error random stream (responses never depend on it)
+        """
+        self.model_name = model_name
+        self.temperature = 0
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_ms = timeout_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.call_count = 0
+
+    @classmethod
+    def from_env(cls, model_name: str = "local-stub") -> "LocalLLM":
+        """Build a LocalLLM from LOCAL_LLM_* environment variables."""
+        return cls(
+            model_name=model_name,
+            latency_ms=float(os.getenv("LOCAL_LLM_LATENCY_MS", "0")),
+            latency_jitter_ms=float(os.getenv("LOCAL_LLM_LATENCY_JITTER_MS", "0")),
+            error_rate=float(os.getenv("LOCAL_LLM_ERROR_RATE", "0")),
+            timeout_rate=float(os.getenv("LOCAL_LLM_TIMEOUT_RATE", "0")),
+            timeout_ms=float(os.getenv("LOCAL_LLM_TIMEOUT_MS", "30000")),
+            seed=int(os.getenv("LOCAL_LLM_SEED", "0")),
+        )
+
+    # ------------------------------------------------------------------
+    # LangChain-compatible interface
+    # ------------------------------------------------------------------
+
+    def invoke(self, prompt: Any, **kwargs) -> LocalLLMMessage:
+        """Generate a response synchronously."""
+        delay, failure = self._draw_outcome()
+        time.sleep(delay)
+        if failure:
+            raise LocalLLMError(failure)
+        return LocalLLMMessage(self.generate(prompt_to_text(prompt)))
+
+    async def ainvoke(self, prompt: Any, **kwargs) -> LocalLLMMessage:
+        """Generate a response asynchronously."""
+        delay, failure = self._draw_outcome()
+        await asyncio.sleep(delay)
+        if failure:
+            raise LocalLLMError(failure)
+        return LocalLLMMessage(self.generate(prompt_to_text(prompt)))
+
+    def stream(self, prompt: Any, chunk_chars: int = 16, **kwargs) -> Iterator[LocalLLMMessage]:
+        """
+        Stream a response in small chunks.
+
+        Honors the structured-output arguments the interpreter sends: with
+        `tools` the rule JSON is streamed as tool-call arguments, with
+        `response_format` as content, both wrapped as {"rules": [...]}.
+        """
+        delay, failure = self._draw_outcome()
+        time.sleep(delay)
+        if failure:
+            raise LocalLLMError(failure)
+
+        text = self.generate(prompt_to_text(prompt))
+        structured = "tools" in kwargs or "response_format" in kwargs
+        if structured and text.startswith("["):
+            text = json.dumps({"rules": json.loads(text)})
+
+        for start in range(0, len(text), chunk_chars):
+            piece = text[start:start + chunk_chars]
+            if "tools" in kwargs:
+                yield LocalLLMMessage("", [{"index": 0, "args": piece}])
+            else:
+                yield LocalLLMMessage(piece)
+
+    def _draw_outcome(self):
+        """Draw latency (seconds) and an optional failure message from the seeded stream."""
+        with self._lock:
+            self.call_count += 1
+            roll = self._rng.random()
+            latency = max(0.0, self._rng.gauss(self.latency_ms, self.latency_jitter_ms))
+
+        if roll < self.timeout_rate:
+            return self.timeout_ms / 1000, "Request timed out (simulated)"
+        if roll < self.timeout_rate + self.error_rate:
+            return latency / 1000, "Error code: 429 - Rate limit reached (simulated)"
+        return latency / 1000, None
+
+    # ------------------------------------------------------------------
+    # Deterministic responses
+    # ------------------------------------------------------------------
+
+    def generate(self, text: str) -> str:
+        """
+        Produce a deterministic response for a prompt.
+
+        Args:
+            text: Flattened prompt text
+
+        Returns:
+            Rule JSON for rule extraction prompts, a scheme array for
+            scheme suggestion prompts, and plain text otherwise
+        """
+        if "### policy " in text.lower():
+            return self._batch_rules_response(text)
+        if "extract eligibility rules" in text.lower():
+            return self._rules_response(text)
+        if "json array of schemes" in text.lower():
+            return self._schemes_response(text)
+        if text.lower().startswith("simplify this government policy"):
+            return self._simplify_response(text)
+        return self._chat_response(text)
+
+    def _rules_response(self, text: str) -> str:
+        from app.agents.policy_interpreter_agent import PolicyInterpreterAgent
+
+        match = re.search(r"Policy text:\s*(.*?)\s*Extract eligibility rules", text, re.DOTALL)
+        policy_text = match.group(1) if match else text
+        rules = PolicyInterpreterAgent()._extract_rules_with_regex(policy_text)
+        return json.dumps([
+            {"key": rule.key, "operator": rule.operator.value, "value": rule.value}
+            for rule in rules
+        ])
+
+    def _batch_rules_response(self, text: str) -> str:
+        sections = re.split(r"^### Policy (\S+)\s*$", text, flags=re.MULTILINE)
+        by_id = {}
+        # re.split yields [preamble, id1, body1, id2, body2, ...]
+        for policy_id, body in zip(sections[1::2], sections[2::2]):
+            body = body.split("\n\nExtract eligibility rules", 1)[0]
+            by_id[policy_id] = json.loads(
+                self._rules_response(f"Policy text: {body}\n\nExtract eligibility rules")
+            )
+        return json.dumps(by_id)
+
+    def _schemes_response(self, text: str) -> str:
+        def field(label: str, default: str) -> str:
+            match = re.search(rf"{label}:\s*(.+)", text)
+            return match.group(1).strip() if match else default
+
+        location = field("Location", "India")
+        category = field("Interested Category", "General")
+        income = field("Annual Income", "N/A")
+        age = field("Age", "N/A")
+        digest = self._digest(text)
+
+        schemes: List[dict] = [
+            {
+                "name": "Pradhan Mantri Jan Dhan Yojana",
+                "description": "Financial inclusion program providing bank accounts with overdraft facility",
+                "eligibility_match": f"Income: {income}, Age: {age}",
+                "how_to_apply": "Visit nearest bank branch with Aadhaar card and address proof",
+                "confidence": round(0.80 + (digest % 15) / 100, 2),
+            },
+            {
+                "name": "Ayushman Bharat - PM Jan Arogya Yojana",
+                "description": "Health insurance coverage up to ₹5 lakhs per family per year",
+                "eligibility_match": f"{location} resident",
+                "how_to_apply": "Apply online at pmjay.gov.in or visit Common Service Center",
+                "confidence": round(0.75 + (digest // 15 % 15) / 100, 2),
+            },
+            {
+                "name": f"{location.title()} {category.title()} Welfare Scheme",
+                "description": f"State scheme for the {category.lower()} sector",
+                "eligibility_match": f"State: {location}, Category: {category}",
+                "how_to_apply": f"Check {location} government portal for specific schemes",
+                "confidence": round(0.70 + (digest // 225 % 15) / 100, 2),
+            },
+        ]
+        return json.dumps(schemes, ensure_ascii=False)
+
+    def _simplify_response(self, text: str) -> str:
+        body = text.split("\n", 1)[-1].rsplit("Provide a clear explanation.", 1)[0].strip()
+        sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", body) if s.strip()]
+        summary = " ".join(sentences[:3]) or body[:300]
+        return f"In simple terms: {summary}"
+
+    def _chat_response(self, text: str) -> str:
+        user_lines = re.findall(r"^(?:User|human):\s*(.+)$", text, re.MULTILINE)
+        question = user_lines[-1].strip() if user_lines else text.strip()[:200]
+        return (
+            f"Thanks for your question about \"{question[:120]}\". "
+            "You can use \"Check Eligibility\" to see which benefits you qualify for, "
+            "or \"Understand Policies\" to interpret a policy document."
+        )
+
+    @staticmethod
+    def _digest(text: str) -> int:
+        return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
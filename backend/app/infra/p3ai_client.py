@@ -3,10 +3,13 @@ P3AI Client - Connects to Real P3AI Network
 Handles P3AI agent initialization, LLM setup, and network communication
 """
 from typing import Optional
+import asyncio
 import os
 from pathlib import Path
 import json
 from dotenv import load_dotenv
+from app.infra.llm_router import LLMRouter, LLMTask, router_models_from_env
+from app.infra.llm_resilience import CircuitBreaker, ResilientLLM
 
 # Load environment variables from .env file
 load_dotenv()
@@ -19,37 +22,139 @@ class P3AIClient:
         self.agent = None
         self.llm = None
         self.is_connected = False
+        self.readiness = "initializing"
+        self.warmup_error: Optional[str] = None
+        self._identity_path: Optional[Path] = None
+        self._secret_seed: Optional[str] = None
+        self._agent_sdk_available = False
+        self._warmup_task: Optional[asyncio.Task] = None
+        # 'openai' (default) or 'local' for the deterministic offline stand-in
+        self.llm_backend = os.getenv("LLM_BACKEND", "openai").lower()
+        # One breaker per upstream, shared by every routed model
+        self.breaker = CircuitBreaker.from_env()
         self._initialize()
     
     def _initialize(self):
-        """Initialize P3AI agent and LLM."""
-        # Try to initialize P3AI agent
+        """
+        Local, non-blocking initialization.
+        
+        Locates the identity credential and constructs the LLM client without
+        touching the network. Connecting to ZyndAI and verifying the API key
+        happen later in warm_up().
+        """
+        try:
+            import zyndai_agent.agent  # noqa: F401
+            self._agent_sdk_available = True
+        except ImportError as e:
+            # This means Python couldn't import from zyndai_agent, even if pip installed it.
+            # Common causes: wrong module path, shadowing by a local zyndai_agent.py, or env mismatch.
+            print(f"⚠ zyndai-agent import failed: {e}")
+            print("  → Verify the correct import path for the SDK and that no local file named 'zyndai_agent.py' shadows the package.")
+        
+        # Determine which credential file path we're actually using
+        env_identity_path = os.getenv("P3AI_IDENTITY_PATH")
+        identity_paths = []
+        if env_identity_path:
+            identity_paths.append(Path(env_identity_path))
+        identity_paths.extend(
+            [
+                Path("identity_credential.json"),
+                Path("backend/identity_credential.json"),
+                Path("../identity_credential.json"),
+                Path("/etc/secrets/identity_credential.json"),
+            ]
+        )
+        
+        for path in identity_paths:
+            if path.exists():
+                self._identity_path = path
+                break
+        
+        self._secret_seed = os.getenv("AGENT_SEED") or os.getenv("AGENT_SECRET_SEED")
+        
+        # Initialize LLM (works with or without P3AI); the key is verified during warm-up
+        models = router_models_from_env()
+        self.router = LLMRouter(self._build_llm, **models)
+        self.llm = self._build_llm(models["fast_model"])
+        if self.llm is not None and self.llm_backend == "local":
+            print("✓ Local stand-in LLM selected (LLM_BACKEND=local)")
+    
+    def _build_llm(self, model: str, max_tokens: Optional[int] = None) -> Optional[any]:
+        """
+        Construct an LLM client for a model (no network calls).
+        
+        Args:
+            model: Model name
+            max_tokens: Optional cap on output tokens
+        
+        Returns:
+            LLM instance wrapped with hedging and the circuit breaker,
+            or None if the backend is not configured
+        """
+        if self.llm_backend == "local":
+            from app.infra.local_llm import LocalLLM
+            
+            return ResilientLLM.from_env(LocalLLM.from_env(model_name=model), self.breaker)
+        
+        try:
+            from langchain_openai import ChatOpenAI
+            
+            openai_key = os.getenv("OPENAI_API_KEY")
+            if openai_key:
+                llm = ChatOpenAI(
+                    model=model,
+                    temperature=0,
+                    api_key=openai_key,
+                    max_tokens=max_tokens,
+                    request_timeout=30,
+                    # Hedged requests replace most client-side retries
+                    max_retries=1
+                )
+                return ResilientLLM.from_env(llm, self.breaker)
+            else:
+                print("⚠ OPENAI_API_KEY not set - LLM features disabled")
+                print("  Add to .env: OPENAI_API_KEY=your_openai_api_key")
+        
+        except ImportError:
+            print("⚠ langchain-openai package not found. Install: pip install langchain-openai")
+        except Exception as e:
+            print(f"⚠ Could not initialize LLM: {e}")
+        
+        return None
+    
+    async def warm_up(self):
+        """
+        Deferred network initialization, run in the background after the app starts serving.
+        
+        Connects to the ZyndAI network and verifies the OpenAI key off the event
+        loop. Safe to call more than once; concurrent callers share one warm-up.
+        """
+        if self._warmup_task is None:
+            self._warmup_task = asyncio.create_task(self._run_warm_up())
+        await asyncio.shield(self._warmup_task)
+    
+    async def _run_warm_up(self):
+        self.readiness = "warming"
+        try:
+            await asyncio.to_thread(self._connect_network)
+            await asyncio.to_thread(self._verify_llm)
+            self.readiness = "ready"
+        except Exception as e:
+            self.warmup_error = str(e)
+            self.readiness = "degraded"
+            print(f"⚠ P3AI client warm-up failed: {e}")
+    
+    def _connect_network(self):
+        """Normalize the identity credential and connect to the ZyndAI registry (blocking)."""
+        if not self._agent_sdk_available:
+            return
+        
+        identity_path = self._identity_path
+        secret_seed = self._secret_seed
+        
         try:
             from zyndai_agent.agent import ZyndAIAgent, AgentConfig
-            # If this import succeeds, the package is present in the environment.
-
-            # Determine which credential file path we're actually using
-            env_identity_path = os.getenv("P3AI_IDENTITY_PATH")
-            identity_paths = []
-            if env_identity_path:
-                identity_paths.append(Path(env_identity_path))
-            identity_paths.extend(
-                [
-                    Path("identity_credential.json"),
-                    Path("backend/identity_credential.json"),
-                    Path("../identity_credential.json"),
-                    Path("/etc/secrets/identity_credential.json"),
-                ]
-            )
-
-            identity_path = None
-            for path in identity_paths:
-                if path.exists():
-                    identity_path = path
-                    break
-
-            secret_seed = os.getenv("AGENT_SEED") or os.getenv("AGENT_SECRET_SEED")
-
+            
             if identity_path and secret_seed:
                 # Debug: show which credential file is actually being loaded
                 print("📄 Credential file path:", identity_path)
@@ -69,18 +174,18 @@ class P3AIClient:
                     credential["issuer"] = credential["vc"]["issuer"]
                     print("🔧 Injected top-level issuer from vc.issuer")
 
+                    # Write back normalized credential so zyndai-agent sees the fixed structure
+                    try:
+                        with identity_path.open("w") as f:
+                            json.dump(credential, f)
+                    except Exception as write_err:
+                        raise ValueError(f"Could not write normalized credential: {write_err}") from write_err
+
                 if "issuer" not in credential:
                     raise ValueError(
                         f"Invalid identity credential: top-level 'issuer' missing. Keys={list(credential.keys())}"
                     )
 
-                # Write back normalized credential so zyndai-agent sees the fixed structure
-                try:
-                    with identity_path.open("w") as f:
-                        json.dump(credential, f)
-                except Exception as write_err:
-                    raise ValueError(f"Could not write normalized credential: {write_err}") from write_err
-
                 # Configure agent to connect to real P3AI network
                 agent_config = AgentConfig(
                     default_outbox_topic=None,  # Auto-connect to other agents
@@ -127,63 +232,43 @@ class P3AIClient:
                     print("  ❌ Missing: AGENT_SEED in .env")
                 print("=" * 60)
         
-        except ImportError as e:
-            # This means Python couldn't import from zyndai_agent, even if pip installed it.
-            # Common causes: wrong module path, shadowing by a local zyndai_agent.py, or env mismatch.
-            print(f"⚠ zyndai-agent import failed: {e}")
-            print("  → Verify the correct import path for the SDK and that no local file named 'zyndai_agent.py' shadows the package.")
         except Exception as e:
             print(f"⚠ Could not initialize P3AI agent: {e}")
             print("  Running in simulation mode")
+    
+    def _verify_llm(self):
+        """Verify the OpenAI key with a test call and attach the LLM to the agent (blocking)."""
+        if self.llm is None or self.llm_backend == "local":
+            return
         
-        # Initialize LLM (works with or without P3AI)
         try:
-            from langchain_openai import ChatOpenAI
+            print("🔑 Testing OpenAI API key...")
+            self.llm.invoke("Hi")
             
-            openai_key = os.getenv("OPENAI_API_KEY")
-            if openai_key:
-                # Try GPT-3.5-turbo first (cheaper, higher rate limits)
+            # If we have a P3AI agent, set the LLM executor
+            if self.agent and self.is_connected:
                 try:
-                    self.llm = ChatOpenAI(
-                        model="gpt-3.5-turbo",
-                        temperature=0,
-                        api_key=openai_key,
-                        request_timeout=30,
-                        max_retries=2
-                    )
-                    
-                    # Test the API key with a simple call
-                    print("🔑 Testing OpenAI API key...")
-                    test_response = self.llm.invoke("Hi")
-                    
-                    # If we have a P3AI agent, set the LLM executor
-                    if self.agent and self.is_connected:
-                        try:
-                            self.agent.set_agent_executor(self.llm)
-                            print("✓ LLM (GPT-3.5-turbo) connected to P3AI agent")
-                        except Exception as e:
-                            print(f"⚠ Could not connect LLM to agent: {e}")
-                    else:
-                        print("✓ LLM (GPT-3.5-turbo) initialized (standalone mode)")
-                    
-                except Exception as api_error:
-                    print(f"❌ OpenAI API Error: {api_error}")
-                    if "429" in str(api_error):
-                        print("  → Rate limit exceeded or insufficient credits")
-                        print("  → Check your OpenAI account at: https://platform.openai.com/account/billing")
-                    elif "401" in str(api_error):
-                        print("  → Invalid API key")
-                        print("  → Get a valid key at: https://platform.openai.com/api-keys")
-                    print("  → LLM features will be disabled")
-                    self.llm = None
+                    self.agent.set_agent_executor(self.llm.inner)
+                    print(f"✓ LLM ({self.router.models['fast']}) connected to P3AI agent")
+                except Exception as e:
+                    print(f"⚠ Could not connect LLM to agent: {e}")
             else:
-                print("⚠ OPENAI_API_KEY not set - LLM features disabled")
-                print("  Add to .env: OPENAI_API_KEY=your_openai_api_key")
+                print(f"✓ LLM ({self.router.models['fast']}) initialized (standalone mode)")
         
-        except ImportError:
-            print("⚠ langchain-openai package not found. Install: pip install langchain-openai")
-        except Exception as e:
-            print(f"⚠ Could not initialize LLM: {e}")
+        except Exception as api_error:
+            print(f"❌ OpenAI API Error: {api_error}")
+            if "429" in str(api_error):
+                print("  → Rate limit exceeded or insufficient credits")
+                print("  → Check your OpenAI account at: https://platform.openai.com/account/billing")
+            elif "401" in str(api_error):
+                print("  → Invalid API key")
+                print("  → Get a valid key at: https://platform.openai.com/api-keys")
+            print("  → LLM features will be disabled")
+            self.llm = None
+    
+    def is_ready(self) -> bool:
+        """Check if warm-up has finished and the client can take traffic."""
+        return self.readiness in ("ready", "degraded")
     
     def get_agent(self) -> Optional[any]:
         """Get the P3AI agent instance."""
@@ -193,6 +278,22 @@ class P3AIClient:
         """Get the LLM instance."""
         return self.llm
     
+    def get_llm_for(self, task: LLMTask, text: str = "", max_tokens: Optional[int] = None) -> Optional[any]:
+        """
+        Get an LLM routed for a task and input size.
+        
+        Args:
+            task: Kind of work (rule extraction, chat, simplification, ...)
+            text: The input that will be sent; long inputs go to the larger model
+            max_tokens: Output budget overriding the task's default
+        
+        Returns:
+            LLM instance, or None if LLM features are disabled
+        """
+        if self.llm is None:
+            return None
+        return self.router.select(task, text, max_tokens)
+    
     def is_p3ai_available(self) -> bool:
         """Check if P3AI agent is connected to real network."""
         return self.agent is not None and self.is_connected
@@ -290,8 +391,13 @@ class P3AIClient:
             "connected": self.is_p3ai_available(),
             "mode": "Real Network" if self.is_connected else "Simulation",
             "llm_available": self.is_llm_available(),
+            "llm_backend": self.llm_backend,
+            "readiness": self.readiness,
         }
         
+        if self.warmup_error:
+            status["warmup_error"] = self.warmup_error
+        
         # Add network details if connected
         if self.agent and self.is_connected:
             try:
@@ -0,0 +1,285 @@
+"""
+Policy Dedup - MinHash/LSH index for near-duplicate policy texts
+The same scheme often arrives several times with small edits (another year,
+another state). Each ingested text gets a MinHash signature over word
+shingles. Signatures are banded into LSH buckets, so the closest earlier
+text is found without comparing against every stored policy. Its rules and
+translations can then be reused for the parts of the text that did not
+change.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from difflib import SequenceMatcher
+import hashlib
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+
+_TOKEN_RE = re.compile(r"\w+")
+_SENTENCE_RE = re.compile(r"([^.!?\n]+[.!?]*)(\s*)")
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32 (crc32 range)
+
+
+def split_sentences(text: str) -> List[Tuple[str, str]]:
+    """
+    Split text into sentences, keeping the whitespace that follows each one.
+
+    Returns:
+        List of (sentence, trailing separator); joining them restores the text
+        apart from leading whitespace and stray punctuation
+    """
+    return [(m.group(1).strip(), m.group(2)) for m in _SENTENCE_RE.finditer(text) if m.group(1).strip()]
+
+
+def diff_sentences(
+    old_text: str,
+    new_text: str,
+    key: Optional[Callable[[str], str]] = None,
+) -> Dict[str, List[str]]:
+    """
+    Compare two texts sentence by sentence.
+
+    Args:
+        old_text: Earlier text
+        new_text: Later text
+        key: Optional function mapping a sentence to the form that is compared
+            (e.g. to ignore changes that do not matter)
+
+    Returns:
+        Dict with 'unchanged', 'removed' (only in old_text) and 'added'
+        (only in new_text) sentence lists
+    """
+    old = [sentence for sentence, _ in split_sentences(old_text)]
+    new = [sentence for sentence, _ in split_sentences(new_text)]
+    key = key or (lambda sentence: sentence)
+    result: Dict[str, List[str]] = {"unchanged": [], "removed": [], "added": []}
+    matcher = SequenceMatcher(None, [key(s) for s in old], [key(s) for s in new], autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            result["unchanged"].extend(new[j1:j2])
+        else:
+            result["removed"].extend(old[i1:i2])
+            result["added"].extend(new[j1:j2])
+    return result
+
+
+def text_fingerprint(text: str) -> str:
+    """Exact-content id of a text (whitespace and case insensitive)."""
+    normalized = " ".join(_TOKEN_RE.findall(text.casefold()))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class MinHasher:
+    """Computes MinHash signatures over word shingles."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        """
+        Initialize the hasher.
+
+        Args:
+            num_perm: Signature length (number of hash permutations)
+            shingle_size: Words per shingle
+            seed: Seed for the permutation coefficients (fixed so signatures are stable)
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # a < 2**31 and shingle hashes < 2**32 keep a*x + b inside uint64
+        self._a = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2**31, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Unique crc32 hashes of the text's word shingles."""
+        tokens = _TOKEN_RE.findall(text.casefold())
+        k = self.shingle_size
+        if len(tokens) <= k:
+            grams = [" ".join(tokens)]
+        else:
+            grams = [" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)]
+        return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64))
+
+    def signature(self, text: str, block: int = 8192) -> np.ndarray:
+        """
+        MinHash signature of a text.
+
+        Args:
+            text: Text to hash
+            block: Shingles processed per step (bounds memory on long documents)
+
+        Returns:
+            uint64 array of length num_perm
+        """
+        hashes = self.shingles(text)
+        signature = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        for start in range(0, len(hashes), block):
+            chunk = hashes[start:start + block]
+            permuted = (self._a[:, None] * chunk[None, :] + self._b[:, None]) % _PRIME
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        return signature
+
+
+class NearDuplicateIndex:
+    """LSH index of policy texts with the work already done for each."""
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 32,
+        threshold: float = 0.7,
+        max_docs: int = 5000,
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            num_perm: MinHash signature length (must be divisible by bands)
+            bands: LSH bands; with r = num_perm / bands rows each, texts with
+                Jaccard similarity s become candidates with probability 1 - (1 - s^r)^bands
+            threshold: Minimum estimated Jaccard similarity for a match
+            max_docs: Stored texts; the oldest are dropped beyond this
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.max_docs = max_docs
+        self._docs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], set] = {}
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.matches = 0
+        self.candidates_checked = 0
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def add(
+        self,
+        text: str,
+        rules: Optional[List[Dict[str, Any]]] = None,
+        translations: Optional[Dict[str, Dict[str, str]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Index a text, or update the work stored for it.
+
+        Args:
+            text: Policy text
+            rules: Rule dicts extracted from it
+            translations: '<source>><target>' language codes -> {source sentence: translated sentence}
+
+        Returns:
+            The stored record
+        """
+        doc_id = text_fingerprint(text)
+        signature = None if doc_id in self._docs else self.hasher.signature(text)
+        with self._lock:
+            record = self._docs.get(doc_id)
+            if record is None:
+                if signature is None:
+                    signature = self.hasher.signature(text)
+                record = {"id": doc_id, "text": text, "signature": signature, "rules": None, "translations": {}}
+                self._docs[doc_id] = record
+                for key in self._band_keys(signature):
+                    self._buckets.setdefault(key, set()).add(doc_id)
+                while len(self._docs) > self.max_docs:
+                    self._evict()
+            if rules is not None:
+                record["rules"] = rules
+            for language, memory in (translations or {}).items():
+                record["translations"].setdefault(language, {}).update(memory)
+            return record
+
+    def _evict(self):
+        doc_id, record = self._docs.popitem(last=False)
+        for key in self._band_keys(record["signature"]):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def find(self, text: str, require: Optional[str] = None) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Find the most similar indexed text.
+
+        Args:
+            text: Policy text to look up
+            require: Only consider records that have this work stored:
+                'rules', or 'translations:<source>><target>'
+
+        Returns:
+            (record, estimated Jaccard similarity) of the best match at or
+            above the threshold, or None
+        """
+        signature = self.hasher.signature(text)
+        with self._lock:
+            self.queries += 1
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            best, best_score = None, self.threshold
+            for doc_id in candidates:
+                record = self._docs[doc_id]
+                if not self._has(record, require):
+                    continue
+                self.candidates_checked += 1
+                score = float(np.mean(record["signature"] == signature))
+                if score >= best_score:
+                    best, best_score = record, score
+
+            if best is None:
+                return None
+            self.matches += 1
+            return best, best_score
+
+    @staticmethod
+    def _has(record: Dict[str, Any], require: Optional[str]) -> bool:
+        if require is None:
+            return True
+        if require == "rules":
+            return record["rules"] is not None
+        if require.startswith("translations:"):
+            return bool(record["translations"].get(require.split(":", 1)[1]))
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Get index size and lookup counters."""
+        with self._lock:
+            return {
+                "documents": len(self._docs),
+                "buckets": len(self._buckets),
+                "threshold": self.threshold,
+                "queries": self.queries,
+                "matches": self.matches,
+                "candidates_checked": self.candidates_checked,
+            }
+
+
+# Singleton instance
+_index_instance: Optional[NearDuplicateIndex] = None
+
+
+def get_policy_index() -> Optional[NearDuplicateIndex]:
+    """Get or create the singleton near-duplicate index (None when disabled)."""
+    global _index_instance
+
+    if os.getenv("POLICY_DEDUP_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+
+    if _index_instance is None:
+        _index_instance = NearDuplicateIndex(
+            threshold=float(os.getenv("POLICY_DEDUP_THRESHOLD", "0.7")),
+            max_docs=int(os.getenv("POLICY_DEDUP_MAX_DOCS", "5000")),
+        )
+
+    return _index_instance
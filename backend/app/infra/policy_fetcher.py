@@ -5,6 +5,7 @@ Falls back to hardcoded policies if network unavailable
 from typing import List, Optional
 from app.schemas import Policy, PolicyRule, OperatorEnum
 from app.infra.p3ai_client import get_p3ai_client
+from app.infra.policy_dedup import get_policy_index
 import json
 import time
 
@@ -97,19 +98,28 @@ class PolicyFetcher:
                     
                     policies = []
                     for p_dict in policy_data.get("policies", []):
+                        rules = [
+                            PolicyRule(
+                                key=rule.get("key"),
+                                operator=OperatorEnum(rule.get("operator")),
+                                value=rule.get("value")
+                            )
+                            for rule in p_dict.get("rules", [])
+                        ]
+                        
+                        if rules and p_dict.get("raw_text") and get_policy_index() is not None:
+                            # Let uploads of near-identical text reuse the agent's rules
+                            get_policy_index().add(
+                                p_dict.get("raw_text", ""),
+                                rules=[rule.model_dump(mode="json") for rule in rules]
+                            )
+                        
                         # Convert to Policy schema
                         policy = Policy(
                             name=p_dict.get("name"),
                             raw_text=p_dict.get("raw_text", ""),
                             description=p_dict.get("description"),
-                            rules=[
-                                PolicyRule(
-                                    key=rule.get("key"),
-                                    operator=OperatorEnum(rule.get("operator")),
-                                    value=rule.get("value")
-                                )
-                                for rule in p_dict.get("rules", [])
-                            ],
+                            rules=rules,
                             benefits=p_dict.get("benefits")
                         )
                         policies.append(policy)
@@ -0,0 +1,136 @@
+"""
+Policy Versions - Persistent store of the latest interpreted version of each policy
+Keeps the segmented text and the rules extracted from every segment, so an
+amended notification can be diffed against it and only the changed
+segments re-extracted. Versions are records, not cache entries: the table
+is never evicted.
+"""
+from typing import Any, Dict, Optional
+from pathlib import Path
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class PolicyVersionStore:
+    """Latest interpretation of each policy, keyed by policy id (SQLite, non-evicting)."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = Path(path)
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Earlier releases kept versions in a DiskCache namespace of the same name
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(policy_versions)")}
+            if "key" in columns:
+                conn.execute("ALTER TABLE policy_versions RENAME TO policy_versions_legacy")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS policy_versions (
+                    policy_id TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    record TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            if "key" in columns:
+                self._migrate_legacy(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection (sqlite connections are not thread-safe)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _migrate_legacy(self, conn: sqlite3.Connection):
+        """Move the versions of the DiskCache table into policy_versions."""
+        for policy_id, value in conn.execute("SELECT key, value FROM policy_versions_legacy").fetchall():
+            record = json.loads(value)
+            if not isinstance(record, dict) or "version" not in record:
+                continue
+            version = record.pop("version")
+            updated_at = record.pop("updated_at", time.time())
+            conn.execute(
+                "INSERT OR IGNORE INTO policy_versions (policy_id, version, record, updated_at) VALUES (?, ?, ?, ?)",
+                (policy_id, version, json.dumps(record), updated_at),
+            )
+        conn.execute("DROP TABLE policy_versions_legacy")
+
+    def get(self, policy_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored version of a policy.
+
+        Returns:
+            Dict with 'version', 'interpreter_version', 'raw_text', 'segments'
+            (list of {'units': [str], 'rules': [rule dicts]}) and 'updated_at', or None
+        """
+        row = self._connect().execute(
+            "SELECT version, record, updated_at FROM policy_versions WHERE policy_id = ?", (policy_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        version, record, updated_at = row
+        return {**json.loads(record), "version": version, "updated_at": updated_at}
+
+    def put(self, policy_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a new version of a policy (the version number is incremented atomically)."""
+        record = {key: value for key, value in record.items() if key not in ("version", "updated_at")}
+        now = time.time()
+        conn = self._connect()
+        # The write lock is held from the read to the write, so concurrent
+        # amendments of one policy get consecutive version numbers
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT version FROM policy_versions WHERE policy_id = ?", (policy_id,)
+            ).fetchone()
+            version = row[0] + 1 if row else 1
+            conn.execute(
+                "INSERT OR REPLACE INTO policy_versions (policy_id, version, record, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                (policy_id, version, json.dumps(record), now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return {**record, "version": version, "updated_at": now}
+
+    def stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        policies, = self._connect().execute("SELECT COUNT(*) FROM policy_versions").fetchone()
+        return {"policies": policies, "path": str(self.path)}
+
+
+# Singleton instance
+_store_instance: Optional[PolicyVersionStore] = None
+
+
+def get_policy_version_store() -> PolicyVersionStore:
+    """Get or create the singleton policy version store."""
+    global _store_instance
+
+    if _store_instance is None:
+        _store_instance = PolicyVersionStore(
+            path=os.getenv("POLICY_VERSION_STORE_PATH", ".cache/policy_versions.sqlite3"),
+        )
+
+    return _store_instance
@@ -0,0 +1,249 @@
+"""
+Prompt Compaction - Shrinks long policy documents before they reach the LLM
+Strips OCR page markers and repeated header/footer lines, collapses
+whitespace, counts tokens locally and truncates or sections the text so
+every prompt fits a configured token budget.
+"""
+from typing import Any, Dict, List, Optional
+from collections import Counter
+import os
+import re
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+
+_PAGE_BREAK_RE = re.compile(r"^-{2,}\s*page\s+\d+\s*-{2,}$", re.IGNORECASE)
+_PAGE_MARKER_RE = re.compile(r"^page\s+\d+(?:\s+of\s+\d+)?$", re.IGNORECASE)
+# A bare number ("12", "- 12 -") is a page number only at a page edge; elsewhere it is content
+_PAGE_NUMBER_RE = re.compile(r"^-?\s*\d{1,4}\s*-?$")
+_SPACES_RE = re.compile(r"[ \t\f\v ]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_DIGITS_RE = re.compile(r"\d+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?;:])\s+")
+
+_encoders: Dict[str, Any] = {}
+
+
+def default_token_budget() -> int:
+    """Token budget for policy text in a single prompt (LLM_PROMPT_TOKEN_BUDGET)."""
+    return int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "6000"))
+
+
+def _encoder(model: Optional[str]):
+    name = model or "gpt-3.5-turbo"
+    if name not in _encoders:
+        try:
+            try:
+                _encoders[name] = tiktoken.encoding_for_model(name)
+            except KeyError:
+                _encoders[name] = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # Encoding files unavailable (e.g. offline) - use the estimate
+            _encoders[name] = None
+    return _encoders[name]
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count tokens locally.
+
+    Args:
+        text: Text to measure
+        model: Model name used to pick the tokenizer
+
+    Returns:
+        Token count (tiktoken when available, otherwise ~4 characters per token)
+    """
+    if TIKTOKEN_AVAILABLE:
+        encoder = _encoder(model)
+        if encoder is not None:
+            return len(encoder.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def strip_boilerplate(
+    text: str,
+    min_repeats: int = 3,
+    max_line_chars: int = 120,
+    edge_lines: int = 3,
+) -> str:
+    """
+    Remove page markers and repeated header/footer lines, and collapse whitespace.
+
+    When the text has page breaks ("--- Page N ---" markers from OCR or form
+    feeds), a line near the top or bottom of a page is a header/footer if the
+    same line, ignoring digits, sits at a page edge on several pages. Bare
+    numbers are dropped as page numbers only as a page's first or last line,
+    and only when they count up with the pages on several of them; numbers
+    elsewhere (e.g. values in an eligibility table) are kept. Anywhere
+    in the text, a short line repeated verbatim `min_repeats` times is also
+    dropped. The first occurrence of boilerplate is kept.
+
+    Args:
+        text: Extracted document text
+        min_repeats: Occurrences after which a line is treated as boilerplate
+        max_line_chars: Longer lines are never treated as boilerplate
+        edge_lines: Non-empty lines at each end of a page checked for headers/footers
+
+    Returns:
+        Compacted text
+    """
+    pages: List[List[str]] = [[]]
+    for raw_line in text.replace("\f", "\n\f\n").split("\n"):
+        line = _SPACES_RE.sub(" ", raw_line).strip()
+        if raw_line == "\f" or _PAGE_BREAK_RE.match(line):
+            pages.append([])
+        elif _PAGE_MARKER_RE.match(line):
+            continue
+        else:
+            pages[-1].append(line)
+    pages = [page for page in pages if any(page)]
+    needed = max(2, min(min_repeats, len(pages)))
+
+    # (page index, line index, number - page index) of numbers at page edges;
+    # real page numbers share one offset from the page index
+    edge_numbers = []
+    for p, page in enumerate(pages):
+        content = [i for i, line in enumerate(page) if line]
+        for i in {content[0], content[-1]}:
+            if _PAGE_NUMBER_RE.match(page[i]):
+                edge_numbers.append((p, i, int(_DIGITS_RE.search(page[i]).group()) - p))
+    if edge_numbers:
+        offset, _ = Counter(offset for _, _, offset in edge_numbers).most_common(1)[0]
+        page_numbers = {(p, i) for p, i, o in edge_numbers if o == offset}
+        if len({p for p, _ in page_numbers}) >= needed:
+            pages = [
+                [line for i, line in enumerate(page) if (p, i) not in page_numbers]
+                for p, page in enumerate(pages)
+            ]
+
+    def signature(line: str) -> str:
+        return _DIGITS_RE.sub("#", line.lower())
+
+    def edges(page: List[str]) -> List[str]:
+        content = [
+            line for line in page
+            if line and len(line) <= max_line_chars and not _PAGE_NUMBER_RE.match(line)
+        ]
+        return content[:edge_lines] + content[-edge_lines:]
+
+    edge_sigs = set()
+    if len(pages) >= 2:
+        page_counts = Counter(sig for page in pages for sig in {signature(line) for line in edges(page)})
+        edge_sigs = {sig for sig, count in page_counts.items() if count >= needed}
+
+    line_counts = Counter(
+        line for page in pages for line in page if line and len(line) <= max_line_chars
+    )
+
+    kept: List[str] = []
+    seen = set()
+    for page in pages:
+        page_edges = set(edges(page))
+        for line in page:
+            if not line:
+                kept.append("")
+                continue
+            if line in page_edges and signature(line) in edge_sigs:
+                marker = ("edge", signature(line))
+            elif len(line) <= max_line_chars and line_counts[line] >= min_repeats:
+                marker = ("line", line)
+            else:
+                kept.append(line)
+                continue
+            if marker not in seen:
+                seen.add(marker)
+                kept.append(line)
+        kept.append("")
+
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(kept)).strip()
+
+
+def split_sections(text: str, max_tokens: int, model: Optional[str] = None) -> List[str]:
+    """
+    Split text into sections of at most `max_tokens`, on paragraph then sentence boundaries.
+
+    Args:
+        text: Text to split
+        max_tokens: Token limit per section
+        model: Model name used to pick the tokenizer
+
+    Returns:
+        Sections in document order
+    """
+    pieces: List[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph, model) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE_END_RE.split(paragraph):
+            if count_tokens(sentence, model) <= max_tokens:
+                pieces.append(sentence)
+            else:
+                # A single oversized "sentence" (e.g. OCR run-on): hard split by characters
+                step = max(1, max_tokens * 4)
+                pieces.extend(sentence[i:i + step] for i in range(0, len(sentence), step))
+
+    sections: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        piece_tokens = count_tokens(piece, model)
+        if current and current_tokens + piece_tokens > max_tokens:
+            sections.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        sections.append("\n\n".join(current))
+    return sections
+
+
+def compact_for_prompt(
+    text: str,
+    budget_tokens: Optional[int] = None,
+    model: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Prepare document text for an LLM prompt within a token budget.
+
+    Args:
+        text: Raw document text
+        budget_tokens: Maximum tokens of document text (defaults to LLM_PROMPT_TOKEN_BUDGET)
+        model: Model name used to pick the tokenizer
+
+    Returns:
+        Dict with 'text' (compacted, truncated on a section boundary if needed),
+        'sections' (the full compacted text split into budget-sized sections),
+        'original_tokens', 'tokens' and 'truncated'
+    """
+    budget = budget_tokens or default_token_budget()
+    original_tokens = count_tokens(text, model)
+    compacted = strip_boilerplate(text)
+    tokens = count_tokens(compacted, model)
+
+    if tokens <= budget:
+        return {
+            "text": compacted,
+            "sections": [compacted],
+            "original_tokens": original_tokens,
+            "tokens": tokens,
+            "truncated": False,
+        }
+
+    sections = split_sections(compacted, budget, model)
+    head = sections[0] if sections else ""
+    return {
+        "text": head,
+        "sections": sections,
+        "original_tokens": original_tokens,
+        "tokens": count_tokens(head, model),
+        "truncated": True,
+    }
@@ -0,0 +1,87 @@
+"""
+Uploads - Stream uploaded files to temporary files with a size limit
+The upload is copied to disk in fixed-size chunks, so a large upload costs
+one chunk of memory instead of its full size. Extraction backends then read
+the file by path, without further copies.
+"""
+from typing import AsyncIterator, Optional
+from contextlib import asynccontextmanager
+from pathlib import Path
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+
+from fastapi import UploadFile
+
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the size limit."""
+    pass
+
+
+class SpooledUpload:
+    """An upload stored in a temporary file."""
+
+    def __init__(self, path: str, filename: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+
+    def move_to(self, destination: str):
+        """Move the file elsewhere so it outlives the upload block."""
+        shutil.move(self.path, destination)
+        self.path = destination
+
+
+@asynccontextmanager
+async def spool_upload(file: UploadFile, max_bytes: Optional[int] = None) -> AsyncIterator[SpooledUpload]:
+    """
+    Stream an upload into a temporary file, deleted when the block exits.
+
+    The file keeps the upload's suffix, since extraction picks the backend
+    (and pdf2image/PIL sniff the format) from it.
+
+    Args:
+        file: The uploaded file
+        max_bytes: Size limit (default UPLOAD_MAX_BYTES)
+
+    Yields:
+        SpooledUpload with the temporary path, size and SHA-256 of the content
+
+    Raises:
+        UploadTooLargeError: If the upload is larger than max_bytes
+    """
+    max_bytes = max_bytes or UPLOAD_MAX_BYTES
+    filename = file.filename or "upload"
+
+    # Reject early when the size is already known
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(f"File exceeds the {max_bytes} byte upload limit")
+
+    fd, path = tempfile.mkstemp(suffix=Path(filename).suffix.lower())
+    try:
+        size = 0
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"File exceeds the {max_bytes} byte upload limit")
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+
+        yield SpooledUpload(path, filename, size, digest.hexdigest())
+    finally:
+        # Gone already if the upload was moved out (e.g. queued as a job)
+        if os.path.exists(path):
+            os.unlink(path)
@@ -1,7 +1,14 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers import citizens, eligibility, policies, documents, translation, chat, impact, simple_eligibility, policy_interpretation
 from app.infra.p3ai_client import get_p3ai_client
+from app.infra.llm_cache import get_llm_cache
+from app.infra.interpretation_cache import get_interpretation_cache
+from app.agents.policy_interpreter_agent import interpretation_stats
+from app.infra.policy_dedup import get_policy_index
+from app.infra.extraction_cache import get_extraction_cache
 
 # Debug helper to verify zyndai-agent is actually importable in the running environment.
 try:
@@ -36,6 +43,20 @@ async def startup_event():
     print("🚀 Policy Navigator Backend Started")
     print("=" * 60)
     
+    # Network connection and LLM key check run in the background so the
+    # server starts accepting requests immediately; /ready reports when done.
+    app.state.p3ai_warmup = asyncio.create_task(_warm_up_p3ai_client())
+    
+    # Background document jobs (resumes jobs interrupted by the last shutdown)
+    documents.get_document_jobs().start()
+
+
+async def _warm_up_p3ai_client():
+    """Warm up the P3AI client and report the resulting connection state."""
+    client = get_p3ai_client()
+    await client.warm_up()
+    
+    print("=" * 60)
     if client.agent and client.is_connected:
         try:
             agent_did = getattr(client.agent, 'did', 'N/A')
@@ -48,6 +69,7 @@ async def startup_event():
     
     print(f"✓ LLM Available: {client.llm is not None}")
     print(f"✓ ZyndAI Available: {client.is_p3ai_available()}")
+    print(f"✓ Readiness: {client.readiness}")
     print("=" * 60)
 
 # Include routers
@@ -77,11 +99,21 @@ async def health_check():
     """Detailed health check."""
     try:
         client = get_p3ai_client()
+        llm_cache = get_llm_cache()
+        interpretation_cache = get_interpretation_cache()
         return {
             "status": "healthy",
             "llm_available": client.is_llm_available(),
             "p3ai_available": client.is_p3ai_available(),
-            "connection_status": client.get_connection_status()
+            "connection_status": client.get_connection_status(),
+            "llm_cache": llm_cache.stats() if llm_cache else {"enabled": False},
+            "interpretation_cache": interpretation_cache.stats() if interpretation_cache else {"enabled": False},
+            "interpretation": interpretation_stats(),
+            "policy_dedup": get_policy_index().stats() if get_policy_index() else {"enabled": False},
+            "extraction_cache": get_extraction_cache().stats() if get_extraction_cache() else {"enabled": False},
+            "document_jobs": documents.get_document_jobs().stats(),
+            "llm_routing": client.router.stats(),
+            "llm_circuit": client.breaker.stats()
         }
     except Exception as e:
         return {
@@ -91,6 +123,18 @@ async def health_check():
             "p3ai_available": False
         }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe - returns 503 until the P3AI client has finished warming up."""
+    client = get_p3ai_client()
+    body = {
+        "ready": client.is_ready(),
+        "readiness": client.readiness,
+        "llm_available": client.is_llm_available(),
+        "p3ai_available": client.is_p3ai_available()
+    }
+    return JSONResponse(status_code=200 if client.is_ready() else 503, content=body)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -10,6 +10,7 @@ from app.agents.credential_issuer_agent import CredentialIssuerAgent
 from app.agents.advocacy_agent import AdvocacyAgent
 from app.agents.citizen_agent import CitizenAgent
 from app.infra.p3ai_client import get_p3ai_client
+from app.infra.llm_router import LLMTask
 
 router = APIRouter()
 
@@ -107,7 +108,7 @@ async def get_advocacy(request: AdvocacyRequest):
     """
     try:
         client = get_p3ai_client()
-        llm = client.get_llm()
+        llm = client.get_llm_for(LLMTask.GUIDANCE)
         
         if not llm:
             raise HTTPException(
@@ -3,21 +3,177 @@ Documents Router - Handles document upload and processing
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, Dict, Optional
+import json
+import os
 import uuid
 
-from app.agents.document_processor_agent import document_processor_agent
-from app.agents.policy_interpreter_agent import policy_interpreter_agent
+from app.agents.document_processor_agent import PageCallback, document_processor_agent
+from app.agents.policy_interpreter_agent import PolicyInterpreterAgent
+from app.infra.p3ai_client import get_p3ai_client
+from app.infra.llm_router import LLMTask
+from app.infra.document_jobs import DocumentJobQueue, get_document_job_queue
+from app.infra.extraction_cache import get_extraction_cache, make_extraction_key
+from app.infra.uploads import UploadTooLargeError, spool_upload
+from app.schemas import DocumentJobStatus
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
+# Extract rules from early pages while later pages are still being OCR'd
+PIPELINED_INTERPRETATION = os.getenv("PIPELINED_INTERPRETATION", "true").lower() in ("1", "true", "yes")
+
+
+async def _process_upload(
+    file_path: str,
+    filename: str,
+    extract_method: str = "auto",
+    interpret_policy: bool = False,
+    first_page: Optional[int] = None,
+    last_page: Optional[int] = None,
+    content_hash: Optional[str] = None,
+    on_page: Optional[PageCallback] = None
+) -> Dict[str, Any]:
+    """
+    Extract (and optionally interpret) a stored upload
+    
+    With a content_hash, extraction results are looked up in (and saved to)
+    the extraction cache; cache hits report no per-page progress.
+    
+    When the document is extracted and interpreted, pages are fed to the
+    interpreter as they finish (see PagedInterpretation), so interpretation
+    overlaps extraction instead of waiting for the whole text.
+    
+    Returns:
+        The /upload response body
+    
+    Raises:
+        ValueError: If no text could be extracted
+    """
+    extracted = None
+    paged = None
+    extraction_key = None
+    if content_hash:
+        extraction_key = make_extraction_key(
+            content_hash, extract_method, first_page, last_page,
+            document_processor_agent.extraction_settings()
+        )
+    cache = get_extraction_cache() if extraction_key else None
+    if cache:
+        extracted = await run_in_threadpool(cache.get, extraction_key)
+    
+    try:
+        if extracted is None:
+            page_callback = on_page
+            if interpret_policy and PIPELINED_INTERPRETATION:
+                # Sections are prompt-sized, below the large-model routing threshold
+                llm = get_p3ai_client().get_llm_for(LLMTask.RULE_EXTRACTION)
+                paged = await run_in_threadpool(
+                    PolicyInterpreterAgent(llm=llm).start_paged, max(1, first_page or 1), extraction_key
+                )
+                
+                async def page_callback(page: Dict[str, Any], total_pages: int):
+                    await run_in_threadpool(paged.add_page, page["page"], page.get("text", ""))
+                    if on_page:
+                        await on_page(page, total_pages)
+            
+            result = await document_processor_agent.process_document(
+                file_path=file_path,
+                filename=filename,
+                extract_method=extract_method,
+                first_page=first_page,
+                last_page=last_page,
+                on_page=page_callback
+            )
+            
+            if not result["success"]:
+                raise ValueError(result.get("error", "Failed to process document"))
+            
+            extracted = {
+                "text": result["text"],
+                "extraction_method": result["method"],
+                "file_format": result["format"],
+                "pages": result.get("pages"),
+                # Get document statistics
+                "statistics": await document_processor_agent.get_document_stats(result["text"]),
+                # Language from the page scripts seen during extraction; langdetect
+                # only when there were too few letters to tell
+                "detected_language": result.get("language") or await document_processor_agent.detect_document_language(result["text"])
+            }
+            
+            # Failed OCR yields empty text or page errors; do not pin those in the cache
+            failed_pages = any("error" in page for page in extracted["pages"] or [])
+            if cache and extracted["text"].strip() and not failed_pages:
+                await run_in_threadpool(cache.set, extraction_key, extracted)
+            extracted["cached"] = False
+        else:
+            extracted["cached"] = True
+        
+        extracted_text = extracted["text"]
+        response_data = {"success": True, "filename": filename, **extracted}
+        
+        # Optionally interpret as policy
+        if interpret_policy and extracted_text.strip():
+            try:
+                policy_name = filename.replace('.pdf', '').replace('.docx', '')
+                if paged:
+                    policy_result = await run_in_threadpool(paged.finish, extracted_text, policy_name)
+                else:
+                    llm = get_p3ai_client().get_llm_for(LLMTask.RULE_EXTRACTION, extracted_text)
+                    agent = PolicyInterpreterAgent(llm=llm)
+                    policy_result = await run_in_threadpool(agent.handle, {
+                        "raw_text": extracted_text,
+                        "policy_name": policy_name
+                    })
+                if "error" in policy_result:
+                    response_data["policy_interpretation_error"] = policy_result["error"]
+                else:
+                    response_data["policy"] = jsonable_encoder(policy_result["policy"])
+                    # Lets /translate/policy skip detecting the source language again
+                    if extracted["detected_language"] != "unknown":
+                        response_data["policy"]["language"] = extracted["detected_language"]
+            except Exception as e:
+                response_data["policy_interpretation_error"] = str(e)
+        elif paged:
+            paged.cancel()
+    except BaseException:
+        # Including cancellation: queued sections must not keep calling the
+        # LLM for a request that has already failed
+        if paged:
+            paged.cancel()
+        raise
+    
+    return response_data
+
+
+async def _run_document_job(job: Dict[str, Any], on_page: PageCallback) -> Dict[str, Any]:
+    """Process one queued upload (document job queue worker)."""
+    return await _process_upload(job["file_path"], job["filename"], on_page=on_page, **job["options"])
+
+
+def get_document_jobs() -> DocumentJobQueue:
+    """The document job queue, processing uploads with _run_document_job."""
+    return get_document_job_queue(_run_document_job)
+
+
+async def _get_document_job(job_id: str, include_result: bool = True) -> DocumentJobStatus:
+    status = await run_in_threadpool(get_document_jobs().get, job_id, include_result)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Document job {job_id} not found")
+    return status
+
 
 @router.post("/upload")
 async def upload_document(
     file: UploadFile = File(...),
     extract_method: str = Form("auto"),
-    interpret_policy: bool = Form(False)
+    interpret_policy: bool = Form(False),
+    first_page: Optional[int] = Form(None),
+    last_page: Optional[int] = Form(None),
+    async_mode: bool = Form(False),
+    priority: int = Form(0)
 ):
     """
     Upload and process a document
@@ -26,63 +182,70 @@ async def upload_document(
         file: Document file (PDF, image, DOCX)
         extract_method: 'auto', 'ocr', or 'native'
         interpret_policy: Whether to automatically interpret as policy
+        first_page: First PDF page to extract (1-based, optional)
+        last_page: Last PDF page to extract (inclusive, optional)
+        async_mode: Queue the document and return a job ID immediately
+            (poll /documents/jobs/{job_id} or stream /documents/jobs/{job_id}/stream)
+        priority: Queue priority in async mode (higher runs first)
     
     Returns:
-        Extracted text and optional policy interpretation
+        Extracted text and optional policy interpretation, or the queued job (202)
     """
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Process document
-        result = await document_processor_agent.process_document(
-            file_content=content,
-            filename=file.filename,
-            extract_method=extract_method
-        )
-        
-        if not result["success"]:
-            raise HTTPException(status_code=400, detail=result.get("error", "Failed to process document"))
-        
-        extracted_text = result["text"]
-        
-        # Get document statistics
-        stats = await document_processor_agent.get_document_stats(extracted_text)
-        
-        # Detect language
-        language = await document_processor_agent.detect_document_language(extracted_text)
-        
-        response_data = {
-            "success": True,
-            "filename": file.filename,
-            "text": extracted_text,
-            "extraction_method": result["method"],
-            "file_format": result["format"],
-            "statistics": stats,
-            "detected_language": language
-        }
-        
-        # Optionally interpret as policy
-        if interpret_policy and extracted_text.strip():
-            try:
-                policy_result = await policy_interpreter_agent.interpret_policy(
-                    raw_text=extracted_text,
-                    policy_name=file.filename.replace('.pdf', '').replace('.docx', '')
-                )
-                response_data["policy"] = policy_result
-            except Exception as e:
-                response_data["policy_interpretation_error"] = str(e)
+        # Stream the upload to a temporary file and process it from there
+        async with spool_upload(file) as upload:
+            if async_mode:
+                job = await run_in_threadpool(get_document_jobs().submit, upload, {
+                    "extract_method": extract_method,
+                    "interpret_policy": interpret_policy,
+                    "first_page": first_page,
+                    "last_page": last_page,
+                    "content_hash": upload.sha256
+                }, priority)
+                return JSONResponse(status_code=202, content=jsonable_encoder(job))
+            
+            response_data = await _process_upload(
+                upload.path, file.filename, extract_method, interpret_policy, first_page, last_page,
+                content_hash=upload.sha256
+            )
         
         return JSONResponse(content=response_data)
         
+    except HTTPException:
+        raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/jobs/{job_id}", response_model=DocumentJobStatus)
+async def get_document_job(job_id: str, include_result: bool = True):
+    """Get status, per-page progress and (when finished) the result of a document job."""
+    return await _get_document_job(job_id, include_result)
+
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_document_job(job_id: str):
+    """Stream a document job's progress as server-sent events until it finishes."""
+    await _get_document_job(job_id, include_result=False)
+    
+    async def events():
+        async for message in get_document_jobs().stream(job_id):
+            payload = json.dumps(message["data"].model_dump(mode="json"))
+            yield f"event: {message['event']}\ndata: {payload}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @router.post("/extract-text")
 async def extract_text_from_upload(
     file: UploadFile = File(...),
-    method: str = Form("auto")
+    method: str = Form("auto"),
+    first_page: Optional[int] = Form(None),
+    last_page: Optional[int] = Form(None)
 ):
     """
     Extract text from uploaded document without policy interpretation
@@ -90,32 +253,35 @@ async def extract_text_from_upload(
     Args:
         file: Document file
         method: Extraction method ('auto', 'ocr', 'native')
+        first_page: First PDF page to extract (1-based, optional)
+        last_page: Last PDF page to extract (inclusive, optional)
     
     Returns:
         Extracted text and metadata
     """
     try:
-        content = await file.read()
-        
-        result = await document_processor_agent.process_document(
-            file_content=content,
-            filename=file.filename,
-            extract_method=method
-        )
-        
-        if not result["success"]:
-            raise HTTPException(status_code=400, detail=result.get("error"))
-        
-        stats = await document_processor_agent.get_document_stats(result["text"])
+        async with spool_upload(file) as upload:
+            result = await _process_upload(
+                upload.path, file.filename, method,
+                first_page=first_page, last_page=last_page, content_hash=upload.sha256
+            )
         
         return {
             "success": True,
             "text": result["text"],
-            "method": result["method"],
+            "method": result["extraction_method"],
+            "pages": result["pages"],
             "filename": file.filename,
-            "statistics": stats
+            "statistics": result["statistics"],
+            "cached": result["cached"]
         }
         
+    except HTTPException:
+        raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -133,6 +299,6 @@ async def get_supported_formats():
         "features": {
             "ocr": "Optical Character Recognition for images and scanned PDFs",
             "native": "Direct text extraction from digital documents",
-            "auto": "Automatic selection of best extraction method"
+            "auto": "Native text per page, OCR only for pages without a usable text layer"
         }
     }
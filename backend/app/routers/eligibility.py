@@ -6,6 +6,7 @@ from app.schemas import (
 from app.agents.benefit_matching_agent import BenefitMatchingAgent
 from app.agents.credential_issuer_agent import CredentialIssuerAgent
 from app.infra.p3ai_client import get_p3ai_client
+from app.infra.llm_router import LLMTask
 
 router = APIRouter()
 
@@ -17,7 +18,7 @@ async def match_benefits(request: EligibilityCheckRequest):
     """
     try:
         client = get_p3ai_client()
-        llm = client.get_llm()
+        llm = client.get_llm_for(LLMTask.GUIDANCE)
         
         # Issue credentials for the citizen first
         credential_agent = CredentialIssuerAgent()
@@ -58,7 +59,7 @@ async def check_single_eligibility(request: EligibilityCheckRequest):
         from app.agents.eligibility_agent import EligibilityAgent
         from app.agents.credential_issuer_agent import CredentialIssuerAgent
         client = get_p3ai_client()
-        llm = client.get_llm()
+        llm = client.get_llm_for(LLMTask.ELIGIBILITY)
 
         # Issue credentials
         credential_agent = CredentialIssuerAgent()
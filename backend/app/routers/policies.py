@@ -1,12 +1,20 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from typing import List
+import json
 from app.schemas import (
+    BatchInterpretRequest,
+    BatchJobStatus,
     InterpretPolicyRequest,
     InterpretPolicyResponse,
     Policy
 )
+from app.infra.batch_jobs import get_batch_job_manager
 from app.agents.policy_interpreter_agent import PolicyInterpreterAgent
+from app.agents.interpretation_batcher import get_interpretation_batcher
 from app.infra.p3ai_client import get_p3ai_client
+from app.infra.llm_router import LLMTask
 from app.infra.policy_fetcher import get_policy_fetcher
 
 router = APIRouter()
@@ -19,7 +27,7 @@ async def interpret_policy(request: InterpretPolicyRequest):
     """
     try:
         client = get_p3ai_client()
-        llm = client.get_llm()
+        llm = client.get_llm_for(LLMTask.RULE_EXTRACTION, request.raw_text)
         
         if not llm:
             raise HTTPException(
@@ -27,19 +35,28 @@ async def interpret_policy(request: InterpretPolicyRequest):
                 detail="LLM service not available. Please configure OPENAI_API_KEY."
             )
         
-        agent = PolicyInterpreterAgent(llm=llm)
+        agent = PolicyInterpreterAgent(llm=llm, batcher=get_interpretation_batcher())
         
-        result = agent.handle({
+        # Run off the event loop so concurrent requests can share a batch
+        result = await run_in_threadpool(agent.handle, {
             "raw_text": request.raw_text,
-            "policy_name": request.policy_name or "Untitled Policy"
+            "policy_name": request.policy_name or "Untitled Policy",
+            "policy_id": request.policy_id
         })
         
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         
+        message = f"Policy interpreted successfully. {result['rules_count']} rules extracted."
+        if request.policy_id:
+            message += (
+                f" Version {result['version']}: {result['segments_reextracted']} of "
+                f"{result['sections']} segments re-extracted."
+            )
+        
         return InterpretPolicyResponse(
             policy=result["policy"],
-            message=f"Policy interpreted successfully. {result['rules_count']} rules extracted."
+            message=message
         )
     
     except HTTPException:
@@ -48,6 +65,77 @@ async def interpret_policy(request: InterpretPolicyRequest):
         raise HTTPException(status_code=500, detail=f"Error interpreting policy: {str(e)}")
 
 
+async def _interpret_batch_item(item: InterpretPolicyRequest) -> Policy:
+    """Interpret one batch item; raises so the job marks the item failed."""
+    llm = get_p3ai_client().get_llm_for(LLMTask.RULE_EXTRACTION, item.raw_text)
+    if not llm:
+        raise RuntimeError("LLM service not available")
+    
+    agent = PolicyInterpreterAgent(llm=llm, batcher=get_interpretation_batcher())
+    result = await run_in_threadpool(agent.handle, {
+        "raw_text": item.raw_text,
+        "policy_name": item.policy_name or "Untitled Policy",
+        "policy_id": item.policy_id
+    })
+    if "error" in result:
+        raise ValueError(result["error"])
+    return result["policy"]
+
+
+def _get_batch_job(job_id: str):
+    job = get_batch_job_manager(_interpret_batch_item).get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job {job_id} not found")
+    return job
+
+
+@router.post("/interpret/batch", response_model=BatchJobStatus, status_code=202)
+async def interpret_policies_batch(request: BatchInterpretRequest):
+    """
+    Interpret many policies as one background job.
+    
+    Returns the job ID and progress; poll /interpret/batch/{job_id} or stream
+    /interpret/batch/{job_id}/stream for results.
+    """
+    if not get_p3ai_client().is_llm_available():
+        raise HTTPException(
+            status_code=503,
+            detail="LLM service not available. Please configure OPENAI_API_KEY."
+        )
+    
+    manager = get_batch_job_manager(_interpret_batch_item)
+    job = manager.submit(request.items, request.max_concurrency)
+    return job.status()
+
+
+@router.get("/interpret/batch/{job_id}", response_model=BatchJobStatus)
+async def get_batch_job(job_id: str, include_results: bool = True):
+    """Get progress (and, by default, per-item results) of a batch job."""
+    return _get_batch_job(job_id).status(include_results=include_results)
+
+
+@router.get("/interpret/batch/{job_id}/stream")
+async def stream_batch_job(job_id: str):
+    """Stream item results as server-sent events as they complete."""
+    job = _get_batch_job(job_id)
+    manager = get_batch_job_manager(_interpret_batch_item)
+    
+    async def events():
+        async for message in manager.stream(job):
+            payload = json.dumps(message["data"].model_dump(mode="json"))
+            yield f"event: {message['event']}\ndata: {payload}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@router.post("/interpret/batch/{job_id}/retry", response_model=BatchJobStatus)
+async def retry_batch_job(job_id: str):
+    """Re-run only the failed items of a batch job."""
+    job = _get_batch_job(job_id)
+    get_batch_job_manager(_interpret_batch_item).retry_failed(job)
+    return job.status()
+
+
 @router.get("/sample", response_model=List[Policy])
 async def get_sample_policies():
     """
@@ -1,5 +1,8 @@
 from fastapi import APIRouter, HTTPException, Request
 from app.infra.p3ai_client import get_p3ai_client
+from app.infra.llm_cache import cached_llm_invoke
+from app.infra.llm_router import LLMTask
+from app.infra.prompt_compaction import compact_for_prompt
 
 router = APIRouter()
 
@@ -19,24 +22,27 @@ async def simplify_policy(request: Request):
         print(f"Policy text length: {len(policy_text)}")
         print(f"Policy text preview: {policy_text[:100]}...")
         
+        # Drop OCR boilerplate and fit the document into the token budget
+        prepared = compact_for_prompt(policy_text)
+        
         client = get_p3ai_client()
-        llm = client.get_llm()
+        llm = client.get_llm_for(LLMTask.SIMPLIFY, prepared["text"])
         
         if not llm:
             return {"error": "LLM not available"}
         
         prompt = f"""Simplify this government policy into simple language:
 
-{policy_text}
+{prepared["text"]}
 
 Provide a clear explanation."""
 
-        response = llm.invoke(prompt)
-        simplified_text = response.content if hasattr(response, 'content') else str(response)
+        simplified_text = cached_llm_invoke(llm, prompt)
         
         return {
             "success": True,
-            "interpretation": simplified_text
+            "interpretation": simplified_text,
+            "truncated": prepared["truncated"]
         }
         
     except Exception as e:
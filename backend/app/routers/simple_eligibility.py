@@ -5,9 +5,27 @@ Simple Eligibility Router - Direct LLM-based scheme matching
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.infra.p3ai_client import get_p3ai_client
+from app.infra.llm_cache import cached_llm_invoke
+from app.infra.llm_router import LLMTask
 
 router = APIRouter()
 
+SIMPLE_CHECK_PROMPT = """You are a government scheme advisor for India. Based on the following citizen profile, suggest 3-5 relevant government schemes they may be eligible for.
+
+Citizen Profile:
+- Age: {age} years
+- Annual Income: ₹{income}
+- Location: {location}
+- Interested Category: {category}
+
+For each scheme, provide:
+1. Scheme name
+2. Brief description (1 sentence)
+3. Eligibility criteria match
+4. How to apply
+
+Format your response as a JSON array of schemes with fields: name, description, eligibility_match, how_to_apply, confidence (0-1)"""
+
 
 class SimpleEligibilityRequest(BaseModel):
     age: int
@@ -22,33 +40,22 @@ async def simple_eligibility_check(request: SimpleEligibilityRequest):
     Simple eligibility check using LLM to generate relevant schemes
     """
     try:
-        client = get_p3ai_client()
-        llm = client.get_llm()
-        
-        prompt = f"""You are a government scheme advisor for India. Based on the following citizen profile, suggest 3-5 relevant government schemes they may be eligible for.
-
-Citizen Profile:
-- Age: {request.age} years
-- Annual Income: ₹{request.income}
-- Location: {request.location}
-- Interested Category: {request.category}
-
-For each scheme, provide:
-1. Scheme name
-2. Brief description (1 sentence)
-3. Eligibility criteria match
-4. How to apply
+        variables = {
+            "age": request.age,
+            "income": request.income,
+            "location": request.location,
+            "category": request.category,
+        }
+        prompt = SIMPLE_CHECK_PROMPT.format(**variables)
 
-Format your response as a JSON array of schemes with fields: name, description, eligibility_match, how_to_apply, confidence (0-1)"""
+        client = get_p3ai_client()
+        llm = client.get_llm_for(LLMTask.SCHEME_SUGGESTION, prompt)
 
-        response = llm.invoke(prompt)
+        content = cached_llm_invoke(llm, prompt, template=SIMPLE_CHECK_PROMPT, variables=variables)
         
         # Parse LLM response
         import json
         try:
-            # Try to extract JSON from response
-            content = response.content if hasattr(response, 'content') else str(response)
-            
             # Find JSON array in the response
             start_idx = content.find('[')
             end_idx = content.rfind(']') + 1
@@ -20,6 +20,7 @@ class TranslateRequest(BaseModel):
 class PolicyTranslateRequest(BaseModel):
     policy: Dict
     target_language: str
+    source_language: Optional[str] = None
 
 
 class DetectLanguageRequest(BaseModel):
@@ -86,6 +87,7 @@ async def translate_policy(request: PolicyTranslateRequest):
     Args:
         policy: Policy dictionary with text fields
         target_language: Target language code
+        source_language: Policy language (default: the policy's 'language' field, else detected)
     
     Returns:
         Translated policy
@@ -93,7 +95,8 @@ async def translate_policy(request: PolicyTranslateRequest):
     try:
         result = await translation_agent.translate_policy(
             policy_data=request.policy,
-            target_language=request.target_language
+            target_language=request.target_language,
+            source_language=request.source_language
         )
         
         if not result["success"]:
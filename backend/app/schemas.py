@@ -43,6 +43,10 @@ class InterpretPolicyRequest(BaseModel):
     """Request to interpret a policy text."""
     raw_text: str = Field(..., description="Raw policy text to interpret")
     policy_name: Optional[str] = Field(None, description="Optional name for the policy")
+    policy_id: Optional[str] = Field(
+        None,
+        description="Optional stable policy id; the text is then interpreted as an amendment of the stored version"
+    )
 
 
 class InterpretPolicyResponse(BaseModel):
@@ -51,6 +55,67 @@ class InterpretPolicyResponse(BaseModel):
     message: str = "Policy interpreted successfully"
 
 
+class BatchItemStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class BatchInterpretRequest(BaseModel):
+    """Request to interpret many policy texts as one job."""
+    items: List[InterpretPolicyRequest] = Field(..., min_length=1, description="Policies to interpret")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="Items interpreted at once (capped by the server)")
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of one item of a batch job."""
+    index: int = Field(..., description="Position of the item in the request")
+    policy_name: Optional[str] = None
+    status: BatchItemStatus = BatchItemStatus.PENDING
+    policy: Optional[Policy] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+
+class BatchJobStatus(BaseModel):
+    """Progress of a batch interpretation job."""
+    job_id: str
+    status: str = Field(..., description="running, completed or completed_with_errors")
+    total: int
+    pending: int
+    running: int
+    succeeded: int
+    failed: int
+    created_at: datetime
+    updated_at: datetime
+    results: Optional[List[BatchItemResult]] = None
+
+
+class DocumentJobState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class DocumentJobStatus(BaseModel):
+    """Progress of a background document processing job."""
+    job_id: str
+    status: DocumentJobState
+    filename: str
+    priority: int = 0
+    pages_total: Optional[int] = Field(None, description="Pages to extract, once known")
+    pages_done: int = 0
+    pages: List[Dict[str, Any]] = Field(default=[], description="Finished pages: page, method, characters")
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = Field(None, description="Same body as a synchronous upload")
+    created_at: datetime
+    updated_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 class CitizenCredential(BaseModel):
     """Represents a verifiable credential for a citizen."""
     type: str = Field(..., description="Credential type (e.g., 'income', 'residence', 'student')")
@@ -0,0 +1,131 @@
+"""
+OCR Preprocessing Benchmark
+Times Tesseract per page on raw images and on preprocessed ones (grayscale,
+deskew, downscale to the target text height, adaptive binarization). For
+the synthetic pages, where the text is known, it also reports the share of
+words recognized.
+
+Without arguments, synthetic A4-sized pages are generated: large text, a
+few degrees of skew and uneven lighting, like a phone photo of a notice.
+Image files and PDFs can be given instead (PDF pages are rendered at --dpi).
+
+Run from the backend directory:
+    python benchmarks/ocr_preprocess_bench.py [--pages 3] [files ...]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.agents.ocr_preprocess import preprocess  # noqa: E402
+
+try:
+    import pytesseract
+    pytesseract.get_tesseract_version()
+    TESSERACT_AVAILABLE = True
+except Exception:
+    TESSERACT_AVAILABLE = False
+
+
+WORDS = (
+    "scheme applicant eligible income annual family resident state student "
+    "scholarship disability certificate document verification benefit "
+    "application district officer government notification assistance"
+).split()
+
+
+def synthetic_page(seed: int, skew: float = 3.0, font_size: int = 96):
+    """A skewed, unevenly lit page of large text; returns (image, text)."""
+    rng = random.Random(seed)
+    width, height = 2480, 3508  # A4 at 300 DPI
+    font = ImageFont.load_default(size=font_size)
+    page = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(page)
+    lines = []
+    for y in range(200, height - 200, int(font_size * 1.9)):
+        line = " ".join(rng.choice(WORDS) for _ in range(8))
+        draw.text((180, y), line, fill=30, font=font)
+        lines.append(line)
+
+    page = page.rotate(skew, resample=Image.BILINEAR, fillcolor=255)
+    # Lighting falls off towards one corner
+    gradient = np.linspace(1.0, 0.55, width, dtype=np.float32)[None, :] * np.linspace(1.0, 0.8, height, dtype=np.float32)[:, None]
+    pixels = np.asarray(page, dtype=np.float32) * gradient
+    return Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).convert("RGB"), "\n".join(lines)
+
+
+def load_pages(paths, dpi: int):
+    for path in paths:
+        if path.lower().endswith(".pdf"):
+            from pdf2image import convert_from_path
+            for image in convert_from_path(path, dpi=dpi):
+                yield os.path.basename(path), image, None
+        else:
+            yield os.path.basename(path), Image.open(path), None
+
+
+def word_recall(expected: str, recognized: str) -> float:
+    expected_words = re.findall(r"\w+", expected.lower())
+    recognized_words = set(re.findall(r"\w+", recognized.lower()))
+    return sum(word in recognized_words for word in expected_words) / max(1, len(expected_words))
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="Images or PDFs (default: synthetic pages)")
+    parser.add_argument("--pages", type=int, default=3, help="Synthetic pages to generate")
+    parser.add_argument("--dpi", type=int, default=300, help="Rasterization DPI for PDF inputs")
+    parser.add_argument("--font-size", type=int, default=96, help="Text size of synthetic pages (pixels)")
+    args = parser.parse_args()
+
+    if args.files:
+        pages = load_pages(args.files, args.dpi)
+    else:
+        pages = ((f"synthetic-{i + 1}", *synthetic_page(i, random.Random(i).uniform(-4, 4), args.font_size)) for i in range(args.pages))
+
+    if not TESSERACT_AVAILABLE:
+        print("⚠ Tesseract not found: timing preprocessing only")
+
+    print("=" * 96)
+    print(f"{'page':<16}{'size':>12}{'skew':>7}{'scale':>7}{'prep ms':>9}{'raw ms':>9}{'prep+ocr ms':>13}{'speedup':>9}{'recall raw/prep':>19}")
+    print("=" * 96)
+
+    totals = [0.0, 0.0]
+    for name, image, expected in pages:
+        (cleaned, info), prep_ms = timed(preprocess, image)
+        raw_ms = ocr_ms = 0.0
+        recall = ""
+        if TESSERACT_AVAILABLE:
+            raw_text, raw_ms = timed(pytesseract.image_to_string, image)
+            prep_text, ocr_ms = timed(pytesseract.image_to_string, cleaned)
+            totals[0] += raw_ms
+            totals[1] += prep_ms + ocr_ms
+            if expected:
+                recall = f"{word_recall(expected, raw_text):.0%} / {word_recall(expected, prep_text):.0%}"
+
+        speedup = f"{raw_ms / (prep_ms + ocr_ms):.2f}x" if raw_ms else ""
+        print(
+            f"{name:<16}{f'{image.width}x{image.height}':>12}{info['skew']:>7}{info['scale']:>7}"
+            f"{prep_ms:>9.0f}{raw_ms:>9.0f}{prep_ms + ocr_ms:>13.0f}{speedup:>9}{recall:>19}"
+        )
+
+    if totals[1]:
+        print("-" * 96)
+        print(f"Total OCR time: raw {totals[0]:.0f} ms, preprocessed {totals[1]:.0f} ms ({totals[0] / totals[1]:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
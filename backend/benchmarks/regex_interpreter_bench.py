@@ -0,0 +1,133 @@
+"""
+Regex Interpreter Benchmark
+Times the single-pass rule scanner on growing inputs to show linear scaling,
+next to the previous multi-pass extractor (one re.search per pattern with
+unbounded '.*?' gaps). The old extractor stopped at the first match of each
+pattern. The scanner reports every match, because the match spans are part
+of its result.
+
+Run from the backend directory:
+    python benchmarks/regex_interpreter_bench.py [--max-mb 8]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.agents.regex_rule_scanner import rule_scanner  # noqa: E402
+
+
+# Patterns of the previous extractor, each run as a separate search over the lowered text
+LEGACY_PATTERNS = [
+    r'income\s+(?:must\s+)?(?:not\s+)?(?:exceed|exceeding?)\s+[₹$]?\s*(\d[\d,]+)',
+    r'income\s+(?:below|less\s+than|under)\s+[₹$]?\s*(\d[\d,]+)',
+    r'(?:permanent\s+)?resident\s+of\s+(\w+)',
+    r'(?:enrolled|full-time)\s+student|must\s+be\s+(?:a\s+)?student',
+    r'disability\s+(?:percentage\s+)?(?:should\s+be|must\s+be|of)?\s*(?:at\s+least)\s+(\d+)\s*(?:percent|%)',
+    r'age\s+(?:must\s+be\s+)?between\s+(\d+)\s+and\s+(\d+)',
+    r'(?:minimum\s+age|age\s+(?:at\s+least|minimum|above)).*?(\d+)\s*years?',
+    r'(?:maximum\s+age|age\s+(?:below|under|less\s+than|maximum)).*?(\d+)\s*years?',
+    r'age\s+(?:above|over|greater\s+than)\s+(\d+)',
+]
+
+POLICY_PARAGRAPH = (
+    "The scheme provides financial assistance to eligible households. "
+    "Applicants must be a permanent resident of Kerala and the annual family "
+    "income must not exceed 2,50,000. The applicant must be an enrolled student "
+    "and the age must be between 18 and 25 years. Documents must be self-attested.\n"
+)
+
+# PDF text extraction often yields one long line. Cue words with no "N years"
+# after them make the old unbounded '.*?' gaps run to the end of the text from
+# every occurrence
+ADVERSARIAL_LINE = "minimum age criteria apply as notified; maximum age relaxation for reserved categories. "
+
+
+# Phrasings the scanner must handle, with the rules it should return
+EXPECTED_RULES = [
+    ("Minimum age as on 01.04.2024 is 18 years", {("age", ">=", 18)}),
+    ("Maximum age (as of 2024) 35 years", {("age", "<=", 35)}),
+    ("Minimum age 21 years. Maximum age 40 years.", {("age", ">=", 21), ("age", "<=", 40)}),
+    ("The age must be between 18 and 25 years", {("age", ">=", 18), ("age", "<=", 25)}),
+    ("Family income must not exceed 2,50,000", {("income", "<=", 250000)}),
+    # A suppressed minimum age does not suppress 'age above'
+    ("Age between 18 and 25. Minimum age 18 years. Age above 21.",
+     {("age", ">=", 18), ("age", "<=", 25), ("age", ">", 21)}),
+]
+
+
+def check_expected_rules() -> bool:
+    ok = True
+    for text, expected in EXPECTED_RULES:
+        found = {(rule.key, rule.operator.value, rule.value) for rule in rule_scanner.scan(text)["rules"]}
+        if found != expected:
+            ok = False
+            print(f"✗ {text!r}: expected {sorted(expected)}, got {sorted(found)}")
+    print(f"{'✓' if ok else '⚠'} Expected rules: {len(EXPECTED_RULES)} phrasings checked")
+    return ok
+
+
+def legacy_extract(text: str) -> int:
+    text_lower = text.lower()
+    return sum(1 for pattern in LEGACY_PATTERNS if re.search(pattern, text_lower))
+
+
+def scanner_extract(text: str) -> int:
+    return len(rule_scanner.scan(text)["rules"])
+
+
+def build_text(unit: str, size_bytes: int) -> str:
+    return unit * max(1, size_bytes // len(unit))
+
+
+def time_call(func, text: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-mb", type=float, default=8, help="Largest input size in MB")
+    parser.add_argument("--legacy-max-kb", type=float, default=64,
+                        help="Largest adversarial input given to the legacy extractor (it is quadratic)")
+    args = parser.parse_args()
+
+    check_expected_rules()
+
+    sizes = []
+    size = 64 * 1024
+    while size <= args.max_mb * 1024 * 1024:
+        sizes.append(size)
+        size *= 2
+
+    print("=" * 72)
+    print(f"{'input':<12}{'size':>10}{'scanner ms':>14}{'ns/char':>10}{'legacy ms':>14}")
+    print("=" * 72)
+
+    for label, unit in (("policy", POLICY_PARAGRAPH), ("adversarial", ADVERSARIAL_LINE)):
+        for size in sizes:
+            text = build_text(unit, size)
+            scanner = time_call(scanner_extract, text)
+
+            legacy = ""
+            if label == "policy" or size <= args.legacy_max_kb * 1024:
+                legacy = f"{time_call(legacy_extract, text, repeat=1) * 1000:.1f}"
+
+            print(
+                f"{label:<12}{len(text) / 1024 / 1024:>8.2f}MB"
+                f"{scanner * 1000:>14.1f}{scanner / len(text) * 1e9:>10.1f}{legacy:>14}"
+            )
+        print("-" * 72)
+
+    print("Linear scaling shows up as a roughly constant ns/char column.")
+
+
+if __name__ == "__main__":
+    main()